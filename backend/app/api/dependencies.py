@@ -0,0 +1,89 @@
+"""
+API Dependencies - Shared Access Control for API Routes
+
+This module provides the FastAPI dependencies that route modules use to
+restrict endpoints by user tier and to rate limit callers.
+
+Author: Rip Jonesy
+"""
+
+from typing import Any, Callable, Dict
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.core.rate_limiter import rate_limiter
+from app.core.security import get_current_user
+from app.models.mswap_models import UserTier
+
+# Tier hierarchy, lowest first
+TIER_LEVELS: Dict[UserTier, int] = {
+    UserTier.FREE: 0,
+    UserTier.LILBEAN: 1,
+    UserTier.CLAWBACK: 2,
+    UserTier.BIGCHONK: 3,
+    UserTier.MEOWTRIX: 4,
+}
+
+# Requests allowed per user and window (in seconds), by tier
+TIER_RATE_LIMITS: Dict[UserTier, Dict[str, int]] = {
+    UserTier.FREE: {"limit": 50, "window": 60},  # 50 requests per minute
+    UserTier.LILBEAN: {"limit": 100, "window": 60},  # 100 requests per minute
+    UserTier.CLAWBACK: {"limit": 200, "window": 60},  # 200 requests per minute
+    UserTier.BIGCHONK: {"limit": 500, "window": 60},  # 500 requests per minute
+    UserTier.MEOWTRIX: {"limit": 1000, "window": 60},  # 1000 requests per minute
+}
+
+
+def get_user_tier(user: Dict[str, Any]) -> UserTier:
+    """
+    Get the subscription tier of an authenticated user.
+
+    Args:
+        user: Authenticated user
+
+    Returns:
+        Tier of the user, FREE if it is missing or unknown
+    """
+    try:
+        return UserTier(user.get("tier", UserTier.FREE))
+    except ValueError:
+        return UserTier.FREE
+
+
+def require_tier(min_tier: UserTier) -> Callable[..., Dict[str, Any]]:
+    """
+    Build a dependency that requires a minimum user tier.
+
+    Args:
+        min_tier: Lowest tier allowed to use the endpoint
+
+    Returns:
+        Dependency returning the authenticated user
+    """
+
+    def _check_tier(user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
+        user_tier = get_user_tier(user)
+
+        if TIER_LEVELS.get(user_tier, 0) < TIER_LEVELS.get(min_tier, 0):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"This feature requires {min_tier.value} tier or higher",
+            )
+
+        return user
+
+    return _check_tier
+
+
+async def apply_rate_limit(
+    request: Request, user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Apply rate limiting based on user tier."""
+    user_id = user.get("user_id") or user.get("id")
+    user_tier = get_user_tier(user)
+
+    limits = TIER_RATE_LIMITS.get(user_tier, TIER_RATE_LIMITS[UserTier.FREE])
+
+    # Apply rate limiting
+    await rate_limiter(request, user_id, limits["limit"], limits["window"])
+    return user
@@ -0,0 +1,314 @@
+"""
+AI API Routes - AutoModel Processing Endpoints
+
+This module exposes the AutoModel system over HTTP so the frontend and
+background workers can run AI tasks without talking to providers directly.
+
+Key Features:
+- Batched processing of many requests with per-provider concurrency limits
+- Token streaming over Server-Sent Events for interactive use
+- Latency percentiles per provider, model and task
+- Semantic cache hit-rate statistics
+- Scheduling by priority and user tier, with queue-time statistics
+
+Author: Rip Jonesy
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from app.api.dependencies import TIER_LEVELS, apply_rate_limit, get_user_tier, require_tier
+from app.core.config import get_settings
+from app.core.security import get_current_user
+from app.automodel import ModelPriority, ProviderType, TaskType
+from app.automodel.automodel import AutoModel, BatchItemResult, ProcessRequest
+from app.models.mswap_models import UserTier
+
+logger = logging.getLogger("chatchonk.api.ai")
+
+# Initialize router
+router = APIRouter(prefix="/ai", tags=["AI"])
+
+# Upper bound on the number of items accepted in a single batch call
+MAX_BATCH_SIZE = 1000
+
+# Upper bound on the processing time a client may ask for, in seconds
+MAX_REQUEST_TIMEOUT = 300.0
+
+# Lowest tier whose interactive calls may use the capacity reserved for HIGH
+# priority; CRITICAL is kept for internal callers
+INTERACTIVE_PRIORITY_TIER = UserTier.CLAWBACK
+
+
+# === Request/Response Models ===
+class AIProcessRequest(BaseModel):
+    """
+    AI processing request accepted from API clients.
+
+    Fields that steer caching and scheduling (cache key, priority, user ID and
+    tier) are not part of the public API; the server sets them.
+    """
+
+    task_type: TaskType
+    content: Union[str, Dict[str, Any], List[Dict[str, Any]]]
+    provider: Optional[ProviderType] = None
+    model_id: Optional[str] = None
+    max_tokens: Optional[int] = Field(None, gt=0)
+    temperature: Optional[float] = 0.7
+    top_p: Optional[float] = 0.95
+    frequency_penalty: Optional[float] = 0.0
+    presence_penalty: Optional[float] = 0.0
+    stop_sequences: Optional[List[str]] = None
+    session_id: Optional[str] = None
+    template_id: Optional[str] = None
+    template_vars: Optional[Dict[str, Any]] = None
+    use_cache: bool = True
+    metadata: Optional[Dict[str, Any]] = None
+    timeout: Optional[float] = Field(None, gt=0, le=MAX_REQUEST_TIMEOUT)
+
+
+class BatchProcessRequest(BaseModel):
+    """Batch processing request."""
+
+    requests: List[AIProcessRequest] = Field(..., description="Requests to process")
+    provider_concurrency: Optional[Dict[ProviderType, int]] = Field(
+        None,
+        description=(
+            "Per-provider limits on concurrent calls; capped at the server's "
+            "per-provider limit"
+        ),
+    )
+    max_in_flight: Optional[int] = Field(
+        None,
+        ge=1,
+        le=MAX_BATCH_SIZE,
+        description="Maximum number of items processed at once",
+    )
+
+
+class BatchProcessResponse(BaseModel):
+    """Batch processing response."""
+
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
+
+# === Helpers ===
+def _request_priority(user_tier: UserTier, interactive: bool) -> ModelPriority:
+    """
+    Get the scheduling priority of an API request.
+
+    Batch work runs at LOW priority so it never competes with interactive
+    calls. Interactive calls run at HIGH priority from the Clawback tier up and
+    at MEDIUM priority below it.
+
+    Args:
+        user_tier: Verified tier of the user
+        interactive: Whether a user is waiting on the response
+
+    Returns:
+        Priority for the scheduler
+    """
+    if not interactive:
+        return ModelPriority.LOW
+    if TIER_LEVELS[user_tier] >= TIER_LEVELS[INTERACTIVE_PRIORITY_TIER]:
+        return ModelPriority.HIGH
+    return ModelPriority.MEDIUM
+
+
+def _provider_concurrency(
+    requested: Optional[Dict[ProviderType, int]],
+) -> Dict[ProviderType, int]:
+    """
+    Clamp the per-provider limits a client asked for to the server's limit.
+
+    Clients may lower the concurrency of their batch, never raise it past the
+    limit the server applies to every batch.
+
+    Args:
+        requested: Per-provider limits from the request body
+
+    Returns:
+        Limits between 1 and the server's per-provider limit
+    """
+    server_limit = getattr(
+        get_settings(),
+        "AUTOMODEL_PROVIDER_CONCURRENCY",
+        AutoModel.DEFAULT_PROVIDER_CONCURRENCY,
+    )
+    return {
+        provider: max(1, min(limit, server_limit))
+        for provider, limit in (requested or {}).items()
+    }
+
+
+def _build_request(
+    request: AIProcessRequest, user: Dict[str, Any], interactive: bool
+) -> ProcessRequest:
+    """
+    Build the AutoModel request for an API request of an authenticated user.
+
+    The user ID, tier and priority are set by the server from the verified
+    session and the endpoint, never from the request body, so clients cannot
+    claim a larger share of provider capacity. Sessions are scoped to the user,
+    so a client cannot read or extend another user's conversation by guessing
+    its session ID.
+
+    Args:
+        request: Request from the API body
+        user: Authenticated user
+        interactive: Whether a user is waiting on the response
+
+    Returns:
+        Request for AutoModel
+    """
+    user_tier = get_user_tier(user)
+    user_id = user.get("user_id") or user.get("id")
+
+    # Unset fields are left out so that templates can fill them in
+    fields = request.model_dump(exclude={"content"}, exclude_unset=True)
+    if request.session_id:
+        fields["session_id"] = f"{user_id}:{request.session_id}"
+
+    # The content was validated with the API request
+    return ProcessRequest.trusted(
+        request.content,
+        **fields,
+        priority=_request_priority(user_tier, interactive),
+        user_id=user_id,
+        user_tier=user_tier,
+    )
+
+
+# === Processing Endpoints ===
+@router.post("/process/batch", response_model=BatchProcessResponse)
+async def process_batch(
+    batch: BatchProcessRequest,
+    user: Dict[str, Any] = Depends(require_tier(UserTier.LILBEAN)),
+    _: Dict[str, Any] = Depends(apply_rate_limit),
+):
+    """
+    Process many AI requests in one call.
+
+    Items are fanned out concurrently, bounded per provider, and results are
+    returned in request order. Failures are reported per item instead of
+    failing the whole batch. Clients may lower the per-provider limits but not
+    raise them above the server's. Batches are available from the LilBean tier
+    up.
+    """
+    if not batch.requests:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batch must contain at least one request",
+        )
+    if len(batch.requests) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch size exceeds the limit of {MAX_BATCH_SIZE} requests",
+        )
+
+    try:
+        results = await AutoModel.process_batch(
+            [_build_request(request, user, interactive=False) for request in batch.requests],
+            provider_concurrency=_provider_concurrency(batch.provider_concurrency),
+            max_in_flight=batch.max_in_flight,
+        )
+    except Exception as e:
+        logger.error(f"Batch processing failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to process batch: An unexpected error occurred",
+        )
+
+    succeeded = sum(1 for result in results if result.success)
+    logger.info(
+        f"Processed batch of {len(results)} requests for user {user.get('user_id')} "
+        f"({succeeded} succeeded)"
+    )
+    return BatchProcessResponse(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
+
+
+@router.post("/process/stream")
+async def process_stream(
+    body: AIProcessRequest,
+    user: Dict[str, Any] = Depends(apply_rate_limit),
+):
+    """
+    Process an AI request and stream the output as Server-Sent Events.
+
+    Each event carries a JSON-encoded chunk with the text generated since the
+    previous event. The last chunk includes the finish reason and token usage,
+    and the stream ends with a "[DONE]" event. Errors raised after the stream
+    has started are reported as an "error" event.
+    """
+    request = _build_request(body, user, interactive=True)
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for chunk in AutoModel.stream_request(request):
+                yield f"data: {chunk.model_dump_json()}\n\n"
+        except Exception as e:
+            logger.error(f"Streaming failed: {e}", exc_info=True)
+            error = {"detail": "Streaming failed: An unexpected error occurred"}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    logger.info(f"Streaming {request.task_type} request for user {user.get('user_id')}")
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# === Metrics Endpoints ===
+@router.get("/metrics/performance")
+async def get_performance_summary(
+    user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Get request counts and latency percentiles per provider, model and task.
+
+    Percentiles (p50/p95/p99, in seconds) cover the most recent requests kept
+    in the AutoModel metrics buffer.
+    """
+    summary = AutoModel.get_performance_summary()
+    return {"groups": list(summary.values()), "total_groups": len(summary)}
+
+
+@router.get("/metrics/semantic-cache")
+async def get_semantic_cache_stats(
+    user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Get the size and hit rate of the AutoModel semantic cache.
+
+    Hits are requests answered from the cached response of a near-duplicate
+    earlier request.
+    """
+    return AutoModel.get_semantic_cache_stats()
+
+
+@router.get("/metrics/scheduler")
+async def get_scheduler_stats(
+    user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Get provider slot usage, queue depth and queue times of the scheduler.
+
+    Queue-time percentiles (in seconds) are reported per provider and request
+    priority.
+    """
+    return AutoModel.get_scheduler_stats()
@@ -18,7 +18,7 @@ from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from pydantic import BaseModel, ValidationError
-from app.core.security import get_current_user
+from app.api.dependencies import apply_rate_limit, get_user_tier, require_tier
 from app.core.rate_limiter import rate_limiter
 
 from app.models.mswap_models import (
@@ -40,53 +40,6 @@ router = APIRouter(prefix="/modelswapper", tags=["ModelSwapper"])
 modelswapper_service = ModelSwapperService()
 
 
-async def require_tier(min_tier: UserTier):
-    """Dependency to require minimum user tier."""
-
-    def _check_tier(user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
-        user_tier = UserTier(user.get("tier", UserTier.FREE))
-
-        # Define tier hierarchy
-        tier_levels = {
-            UserTier.FREE: 0,
-            UserTier.LILBEAN: 1,
-            UserTier.CLAWBACK: 2,
-            UserTier.BIGCHONK: 3,
-            UserTier.MEOWTRIX: 4,
-        }
-
-        if tier_levels.get(user_tier, 0) < tier_levels.get(min_tier, 0):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"This feature requires {min_tier.value} tier or higher",
-            )
-
-        return user
-
-    return _check_tier
-
-
-async def apply_rate_limit(request: Request, user: Dict[str, Any] = Depends(get_current_user)):
-    """Apply rate limiting based on user tier."""
-    user_id = user["user_id"]
-    user_tier = UserTier(user.get("tier", UserTier.FREE))
-    
-    # Define rate limits based on user tier
-    tier_limits = {
-        UserTier.FREE: {"limit": 50, "window": 60},  # 50 requests per minute
-        UserTier.LILBEAN: {"limit": 100, "window": 60},  # 100 requests per minute
-        UserTier.CLAWBACK: {"limit": 200, "window": 60},  # 200 requests per minute
-        UserTier.BIGCHONK: {"limit": 500, "window": 60},  # 500 requests per minute
-        UserTier.MEOWTRIX: {"limit": 1000, "window": 60},  # 1000 requests per minute
-    }
-    
-    limits = tier_limits.get(user_tier, tier_limits[UserTier.FREE])
-    
-    # Apply rate limiting
-    await rate_limiter(request, user_id, limits["limit"], limits["window"])
-    return user
-
-
 # === Response Models ===
 class HealthResponse(BaseModel):
     """Health check response."""
@@ -144,7 +97,7 @@ async def select_model(
     try:
         # Set user context in request
         request.user_id = user["user_id"]
-        request.user_tier = UserTier(user.get("tier", UserTier.FREE))
+        request.user_tier = get_user_tier(user)
 
         response = await modelswapper_service.select_best_model(request)
 
@@ -29,20 +29,6 @@ Author: Rip Jonesy
 
 from enum import Enum
 
-# Forward imports from submodules
-from .model_registry import ModelRegistry
-from .task_router import TaskRouter
-from .providers.base import BaseProvider
-from .providers.huggingface import HuggingFaceProvider
-from .providers.openai import OpenAIProvider
-from .providers.anthropic import AnthropicProvider
-from .providers.mistral import MistralProvider
-from .providers.deepseek import DeepseekProvider
-from .providers.qwen import QwenProvider
-from .providers.openrouter import OpenRouterProvider
-from .automodel import AutoModel
-
-
 # === Task Types ===
 class TaskType(str, Enum):
     """Types of AI tasks supported by the AutoModel system."""
@@ -118,6 +104,12 @@ class ProcessingError(AutoModelError):
     pass
 
 
+class DeadlineExceededError(AutoModelError):
+    """Raised when a request cannot finish within its time budget."""
+
+    pass
+
+
 # Export public API
 __all__ = [
     # Main classes
@@ -144,7 +136,23 @@ __all__ = [
     "TaskNotSupportedError",
     "ProviderApiError",
     "ProcessingError",
+    "DeadlineExceededError",
 ]
 
 # Version
 __version__ = "0.1.0"
+
+
+# Forward imports from submodules. These come last because the submodules
+# import the types and exceptions above from this package
+from .model_registry import ModelRegistry
+from .task_router import TaskRouter
+from .providers.base import BaseProvider
+from .providers.huggingface import HuggingFaceProvider
+from .providers.openai import OpenAIProvider
+from .providers.anthropic import AnthropicProvider
+from .providers.mistral import MistralProvider
+from .providers.deepseek import DeepseekProvider
+from .providers.qwen import QwenProvider
+from .providers.openrouter import OpenRouterProvider
+from .automodel import AutoModel
@@ -8,21 +8,43 @@ providers, model selection, and task routing to provide a simple, consistent API
 Author: Rip Jonesy
 """
 
+import asyncio
+import contextlib
+import hashlib
+import json
 import logging
 import time
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 
 from app.core.config import get_settings
+from app.core.token_estimator import get_token_estimator
 from app.services.cache_service import get_cache_service, CacheService
+from app.models.mswap_models import UserTier
 from app.services.modelswapper_service import ModelSwapperService
 
 from .model_registry import ModelRegistry
-from .providers.base import BaseProvider
-from .task_router import TaskRouter
+from .providers.base import BaseProvider, StreamChunk
+from .chunking import (
+    CHUNKABLE_TASKS,
+    build_reduce_prompt,
+    estimate_content_tokens,
+    estimate_tokens,
+    group_partial_results,
+    is_chunkable,
+    split_content,
+)
+from .media import MediaContent, media_digest, media_from_content
+from .metrics_store import MetricsRingBuffer
+from . import semantic_cache
+from .scheduler import INTERACTIVE_PRIORITIES, RequestScheduler
+from .semantic_cache import SemanticCache
+from .session_store import SessionStore
+from .template_cache import TEMPLATE_PARAMETERS, TemplateCache
+from .task_router import TaskRouter, is_retryable_error, mark_call_started
 from . import (
     TaskType,
     ProviderType,
@@ -31,6 +53,9 @@ from . import (
     ModelNotFoundError,
     TaskNotSupportedError,
     ProcessingError,
+    ProviderApiError,
+    DeadlineExceededError,
+    deadline,
 )
 
 # Configure logging
@@ -58,6 +83,60 @@ class ProcessRequest(BaseModel):
     cache_key: Optional[str] = None
     use_cache: bool = True
     metadata: Optional[Dict[str, Any]] = None
+    user_id: Optional[str] = None
+    user_tier: Optional[UserTier] = None
+    timeout: Optional[float] = None
+
+    @classmethod
+    def trusted(cls, content: Any, **fields: Any) -> "ProcessRequest":
+        """
+        Build a request without deep-validating its content.
+
+        All other fields are validated as usual, but the content only has its
+        shape checked. Validating a large chat export copies every message,
+        which costs far more than the rest of the request, and the content
+        passed to AutoModel has either been validated by the API layer already
+        or was built by AutoModel itself.
+
+        Args:
+            content: Text, a dict or a list of dicts
+            **fields: The remaining request fields
+
+        Returns:
+            The request
+
+        Raises:
+            ValueError: If a field is invalid or the content has another shape
+        """
+        if isinstance(content, str):
+            # Text is cheap to validate
+            return cls(content=content, **fields)
+        request = cls(content="", **fields)
+        request.content = _check_content_shape(content)
+        return request
+
+
+def _given(**params: Any) -> Dict[str, Any]:
+    """
+    Keep the generation parameters a caller actually passed.
+
+    Parameters left at None are not set on the request, so a template can
+    still fill them in; see AutoModel._generation_params.
+    """
+    return {name: value for name, value in params.items() if value is not None}
+
+
+def _check_content_shape(content: Any) -> Any:
+    """Check that content is text, a dict or a list of dicts, without copying it."""
+    if isinstance(content, (str, dict)):
+        return content
+    if isinstance(content, list):
+        for item in content:
+            if not isinstance(item, dict):
+                break
+        else:
+            return content
+    raise ValueError("content must be text, a dict or a list of dicts")
 
 
 class ProcessResponse(BaseModel):
@@ -75,6 +154,16 @@ class ProcessResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 
+class BatchItemResult(BaseModel):
+    """Outcome of a single request within a batch."""
+
+    index: int
+    success: bool
+    response: Optional[ProcessResponse] = None
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+
+
 class PerformanceMetrics(BaseModel):
     """Model for tracking AI model performance."""
 
@@ -88,6 +177,10 @@ class PerformanceMetrics(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
+# Precompiled (de)serializer for cached responses
+_RESPONSE_ADAPTER = TypeAdapter(ProcessResponse)
+
+
 # === AutoModel Class ===
 class AutoModel:
     """
@@ -123,8 +216,31 @@ class AutoModel:
     _task_router: Optional[TaskRouter] = None
     _cache_service: Optional[CacheService] = None
     _modelswapper_service: Optional[ModelSwapperService] = None
-    _active_sessions: Dict[str, Dict[str, Any]] = {}
-    _performance_metrics: List[PerformanceMetrics] = []
+    _active_sessions: SessionStore = SessionStore()
+    _template_cache: TemplateCache = TemplateCache()
+    _performance_metrics: MetricsRingBuffer = MetricsRingBuffer()
+    # Admission of provider calls by priority and tenant
+    _scheduler: RequestScheduler = RequestScheduler()
+    # Near-duplicate lookup tier; None when disabled or NumPy is not installed
+    _semantic_cache: Optional[SemanticCache] = None
+    _in_flight: Dict[str, asyncio.Future] = {}
+    # Latency percentile after which interactive calls are hedged; None when
+    # hedging is disabled
+    _hedge_percentile: Optional[float] = None
+    _hedge_budget: int = 1
+
+    # Bump when the cache key layout changes so stale entries are not reused
+    CACHE_KEY_VERSION: int = 2
+
+    # Batch processing defaults
+    DEFAULT_PROVIDER_CONCURRENCY: int = 8
+    DEFAULT_BATCH_IN_FLIGHT: int = 64
+
+    # Long-content chunking defaults
+    DEFAULT_CHUNK_CONCURRENCY: int = 4
+    CHUNK_BUDGET_RATIO: float = 0.8
+    # Overall time budget of a request in seconds, unless the request sets one
+    DEFAULT_REQUEST_TIMEOUT: float = 120.0
 
     @classmethod
     async def initialize(cls) -> None:
@@ -163,6 +279,27 @@ class AutoModel:
             "openrouter": {
                 "api_key": getattr(settings, "OPENROUTER_API_KEY", None)
             },
+            "startup_timeout": getattr(settings, "AUTOMODEL_STARTUP_TIMEOUT", 5.0),
+            "provider_init_timeout": getattr(
+                settings, "AUTOMODEL_PROVIDER_INIT_TIMEOUT", 30.0
+            ),
+            "lazy_providers": getattr(
+                settings, "AUTOMODEL_LAZY_PROVIDERS", [ProviderType.OPENROUTER]
+            ),
+            "latency_half_life": getattr(settings, "AUTOMODEL_LATENCY_HALF_LIFE", 15.0),
+            "latency_window": getattr(settings, "AUTOMODEL_LATENCY_WINDOW", 60.0),
+            "circuit_breaker": {
+                "failure_threshold": getattr(
+                    settings, "AUTOMODEL_CIRCUIT_FAILURE_THRESHOLD", 5
+                ),
+                "error_rate_threshold": getattr(
+                    settings, "AUTOMODEL_CIRCUIT_ERROR_RATE", 0.5
+                ),
+                "open_seconds": getattr(settings, "AUTOMODEL_CIRCUIT_OPEN_SECONDS", 30.0),
+                "half_open_trials": getattr(
+                    settings, "AUTOMODEL_CIRCUIT_HALF_OPEN_TRIALS", 1
+                ),
+            },
         }
         cls._model_registry = ModelRegistry(config)
         await cls._model_registry.initialize()
@@ -174,6 +311,60 @@ class AutoModel:
         settings = get_settings()
         cls._cache_service = get_cache_service()
 
+        # Initialize the bounded session store
+        cls._active_sessions = SessionStore(
+            max_sessions=getattr(settings, "AUTOMODEL_MAX_SESSIONS", 10000),
+            max_total_bytes=getattr(
+                settings, "AUTOMODEL_SESSION_MAX_TOTAL_BYTES", 64 * 1024 * 1024
+            ),
+            max_session_bytes=getattr(
+                settings, "AUTOMODEL_SESSION_MAX_BYTES", 256 * 1024
+            ),
+            ttl_seconds=getattr(settings, "AUTOMODEL_SESSION_TTL", 3600),
+        )
+
+        # Initialize the template cache
+        cls._template_cache = TemplateCache(getattr(settings, "TEMPLATES_DIR", None))
+        # Parse all templates up front, off the event loop
+        await asyncio.to_thread(cls._template_cache.list_templates)
+
+        # Initialize the performance metrics ring buffer
+        cls._performance_metrics = MetricsRingBuffer(
+            capacity=getattr(settings, "AUTOMODEL_METRICS_CAPACITY", 10000)
+        )
+
+        # Initialize the provider request scheduler
+        cls._scheduler = RequestScheduler(
+            default_capacity=getattr(settings, "AUTOMODEL_SCHEDULER_CONCURRENCY", 32),
+            provider_capacity=getattr(
+                settings, "AUTOMODEL_SCHEDULER_PROVIDER_CONCURRENCY", None
+            ),
+            interactive_reserve=getattr(
+                settings, "AUTOMODEL_SCHEDULER_INTERACTIVE_RESERVE", 0.25
+            ),
+        )
+
+        # Hedge slow interactive calls against the next candidate, if enabled
+        cls._hedge_percentile = None
+        if getattr(settings, "AUTOMODEL_HEDGING", False):
+            cls._hedge_percentile = getattr(settings, "AUTOMODEL_HEDGE_PERCENTILE", 95.0)
+        cls._hedge_budget = getattr(settings, "AUTOMODEL_HEDGE_BUDGET", 1)
+
+        # Initialize the optional semantic cache tier
+        cls._semantic_cache = None
+        if getattr(settings, "AUTOMODEL_SEMANTIC_CACHE", False):
+            if semantic_cache.is_available():
+                cls._semantic_cache = SemanticCache(
+                    max_entries=getattr(
+                        settings, "AUTOMODEL_SEMANTIC_CACHE_MAX_ENTRIES", 5000
+                    ),
+                    threshold=getattr(
+                        settings, "AUTOMODEL_SEMANTIC_CACHE_THRESHOLD", 0.97
+                    ),
+                )
+            else:
+                logger.warning("Semantic cache requires numpy; it is disabled")
+
         # Initialize ModelSwapper service
         cls._modelswapper_service = ModelSwapperService()
 
@@ -225,10 +416,10 @@ class AutoModel:
         provider: Optional[ProviderType] = None,
         model_id: Optional[str] = None,
         max_tokens: Optional[int] = None,
-        temperature: Optional[float] = 0.7,
-        top_p: Optional[float] = 0.95,
-        frequency_penalty: Optional[float] = 0.0,
-        presence_penalty: Optional[float] = 0.0,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        frequency_penalty: Optional[float] = None,
+        presence_penalty: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
         session_id: Optional[str] = None,
         template_id: Optional[str] = None,
@@ -237,12 +428,17 @@ class AutoModel:
         cache_key: Optional[str] = None,
         use_cache: bool = True,
         metadata: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None,
+        user_tier: Optional[UserTier] = None,
+        timeout: Optional[float] = None,
     ) -> ProcessResponse:
         """
         Process content using AI models.
 
         This is the main method for all AI processing in ChatChonk. It handles
-        provider selection, model routing, caching, and error handling.
+        provider selection, model routing, caching, and error handling. When a
+        model is rate limited, fails with a server error or times out, the
+        request fails over to the next ranked candidate.
 
         Args:
             task_type: Type of AI task to perform
@@ -250,18 +446,23 @@ class AutoModel:
             provider: Optional specific provider to use
             model_id: Optional specific model ID to use
             max_tokens: Maximum tokens to generate
-            temperature: Sampling temperature (0.0-1.0)
-            top_p: Nucleus sampling parameter (0.0-1.0)
-            frequency_penalty: Frequency penalty (0.0-2.0)
-            presence_penalty: Presence penalty (0.0-2.0)
+            temperature: Sampling temperature (0.0-1.0), 0.7 by default
+            top_p: Nucleus sampling parameter (0.0-1.0), 0.95 by default
+            frequency_penalty: Frequency penalty (0.0-2.0), 0.0 by default
+            presence_penalty: Presence penalty (0.0-2.0), 0.0 by default
             stop_sequences: Sequences to stop generation
             session_id: Optional session ID for multi-turn conversations
             template_id: Optional template ID for structured outputs
             template_vars: Optional variables for template rendering
-            priority: Priority level for model selection
+            priority: Priority level for model selection and provider scheduling
             cache_key: Optional custom cache key
             use_cache: Whether to use cache for this request
             metadata: Optional additional metadata
+            user_id: Optional ID of the user, for fair scheduling between users
+            user_tier: Optional subscription tier of the user, which weights
+                the user's share of provider capacity
+            timeout: Optional overall time budget in seconds, covering cache
+                lookup, routing, queueing and every provider attempt
 
         Returns:
             ProcessResponse: The processed result
@@ -271,24 +472,28 @@ class AutoModel:
             ProviderNotAvailableError: When a requested provider is not available
             ModelNotFoundError: When a requested model is not found
             TaskNotSupportedError: When a task is not supported by the selected model
-            ProviderApiError: When there's an error from the provider's API
+            ProviderApiError: When every candidate model failed
             ProcessingError: When there's an error during processing
+            DeadlineExceededError: When the request cannot finish within its
+                time budget
         """
         # Ensure system is initialized
         await cls.ensure_initialized()
 
         # Create request object
-        request = ProcessRequest(
+        request = ProcessRequest.trusted(
+            content,
             task_type=task_type,
-            content=content,
             provider=provider,
             model_id=model_id,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            top_p=top_p,
-            frequency_penalty=frequency_penalty,
-            presence_penalty=presence_penalty,
-            stop_sequences=stop_sequences,
+            **_given(
+                max_tokens=max_tokens,
+                temperature=temperature,
+                top_p=top_p,
+                frequency_penalty=frequency_penalty,
+                presence_penalty=presence_penalty,
+                stop_sequences=stop_sequences,
+            ),
             session_id=session_id,
             template_id=template_id,
             template_vars=template_vars,
@@ -296,205 +501,1177 @@ class AutoModel:
             cache_key=cache_key,
             use_cache=use_cache,
             metadata=metadata or {},
+            user_id=user_id,
+            user_tier=user_tier,
+            timeout=timeout,
         )
 
+        return await cls._process_request(request)
+
+    @classmethod
+    async def _process_request(
+        cls,
+        request: ProcessRequest,
+        provider_limiter: Optional[Callable[[ProviderType], asyncio.Semaphore]] = None,
+    ) -> ProcessResponse:
+        """
+        Process an already validated request.
+
+        Args:
+            request: The processing request
+            provider_limiter: Optional callable returning the semaphore that bounds
+                concurrent calls to a given provider
+
+        Returns:
+            ProcessResponse: The processed result
+        """
+        # Every stage below honors the request's deadline
+        with deadline.scope(cls._request_budget(request)):
+            return await cls._process_request_within_deadline(
+                request, provider_limiter
+            )
+
+    @classmethod
+    def _request_budget(cls, request: ProcessRequest) -> Optional[float]:
+        """
+        Get the overall time budget of a request.
+
+        Args:
+            request: The processing request
+
+        Returns:
+            Budget in seconds, or None for no deadline
+        """
+        if request.timeout is not None:
+            return request.timeout
+        return getattr(
+            get_settings(), "AUTOMODEL_REQUEST_TIMEOUT", cls.DEFAULT_REQUEST_TIMEOUT
+        )
+
+    @classmethod
+    async def _process_request_within_deadline(
+        cls,
+        request: ProcessRequest,
+        provider_limiter: Optional[Callable[[ProviderType], asyncio.Semaphore]] = None,
+    ) -> ProcessResponse:
+        """Process a request under an already established deadline."""
         # Generate request ID
         request_id = str(uuid.uuid4())
-        logger.info(f"Processing request {request_id} for task {task_type}")
+        logger.info(f"Processing request {request_id} for task {request.task_type}")
+
+        cache_key = cls._build_cache_key(request) if request.use_cache else None
+
+        # Session requests depend on (and update) per-session state, so they are
+        # never coalesced with other requests
+        if cache_key is None or request.session_id:
+            return await cls._execute_request(
+                request, request_id, cache_key, provider_limiter
+            )
+
+        # Share the result of an identical request that is already in flight
+        while cache_key in cls._in_flight:
+            in_flight = cls._in_flight[cache_key]
+            logger.info(f"Coalescing request {request_id} with in-flight request")
+            try:
+                response = await deadline.wait(
+                    asyncio.shield(in_flight), "waiting for an identical request"
+                )
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us: retry (possibly as leader)
+                if in_flight.cancelled():
+                    continue
+                raise
+            # Callers may modify their response (such as its metadata), so every
+            # follower gets a copy of its own
+            return response.model_copy(update={"request_id": request_id}, deep=True)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        cls._in_flight[cache_key] = future
+        try:
+            response = await cls._execute_request(
+                request, request_id, cache_key, provider_limiter
+            )
+            future.set_result(response)
+            # Followers copy the shared response only once they resume, by which
+            # time this caller may have modified the one it gets
+            return response.model_copy(deep=True)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting on it
+            future.exception()
+            raise
+        finally:
+            cls._in_flight.pop(cache_key, None)
+
+    @classmethod
+    async def _execute_request(
+        cls,
+        request: ProcessRequest,
+        request_id: str,
+        cache_key: Optional[str],
+        provider_limiter: Optional[Callable[[ProviderType], asyncio.Semaphore]] = None,
+    ) -> ProcessResponse:
+        """
+        Execute a request: cache lookup, routing, provider call and bookkeeping.
+
+        Args:
+            request: The processing request
+            request_id: ID assigned to this request
+            cache_key: Cache key, or None when caching is disabled for the request
+            provider_limiter: Optional callable returning the semaphore that bounds
+                concurrent calls to a given provider
+
+        Returns:
+            ProcessResponse: The processed result
+        """
+        task_type = request.task_type
+        content = request.content
+        session_id = request.session_id
+
+        # Try to get from cache if enabled
+        if cache_key and cls._cache_service:
+            cache_result = await deadline.wait(
+                cls._try_cache(cache_key), "cache lookup"
+            )
+            if cache_result:
+                logger.info(f"Cache hit for request {request_id}")
+                if session_id:
+                    cls._record_session_turn(session_id, content, cache_result.content)
+                return cache_result
+
+        # Fall back to a near-duplicate of an earlier request
+        semantic_entry = None
+        if cache_key and cls._cache_service and cls._semantic_cache:
+            semantic_entry = await cls._semantic_entry(request)
+            if semantic_entry:
+                cache_result = await cls._try_semantic_cache(*semantic_entry)
+                if cache_result:
+                    logger.info(f"Semantic cache hit for request {request_id}")
+                    return cache_result
+
+        # Start timing
+        start_time = time.time()
+
+        try:
+            # Get session context if session_id is provided
+            session_context = (
+                cls._get_session_context(session_id) if session_id else None
+            )
+
+            # Rank the candidate models once; failures fail over down the list
+            candidates = await deadline.wait(
+                cls._rank_candidates(request), "routing"
+            )
+
+            # Content that does not fit the best model is processed with map-reduce
+            if cls._needs_chunking(request, candidates[0]):
+                model = candidates[0]
+                response = await cls._process_chunked(
+                    request,
+                    request_id,
+                    cls._model_registry.get_provider(model.provider),
+                    model,
+                    provider_limiter,
+                )
+                response.processing_time = time.time() - start_time
+                if cache_key and cls._cache_service:
+                    await cls._cache_response(cache_key, response)
+                    if semantic_entry:
+                        cls._semantic_cache.add(*semantic_entry, cache_key)
+
+                # The map and reduce requests are not tracked on their own
+                cls._track_performance(
+                    provider=response.provider,
+                    model_id=response.model_id,
+                    task_type=task_type,
+                    success=True,
+                    processing_time=response.processing_time,
+                    tokens_used=response.tokens_used,
+                )
+                logger.info(
+                    f"Request {request_id} processed successfully in "
+                    f"{response.processing_time:.2f}s using "
+                    f"{response.provider}/{response.model_id} "
+                    f"({response.metadata['chunks']} chunks)"
+                )
+                return response
+
+            # Fallbacks too small for the content would only reject it
+            candidates = candidates[:1] + [
+                model
+                for model in candidates[1:]
+                if not cls._needs_chunking(request, model)
+            ]
+
+            # Apply template if template_id is provided
+            template_params: Dict[str, Any] = {}
+            if request.template_id:
+                content, template_params = await cls._apply_template(
+                    request.template_id, content, request.template_vars
+                )
+            generation_params = cls._generation_params(request, template_params)
+
+            async def attempt(
+                provider_instance: BaseProvider, model: Any
+            ) -> Tuple[BaseProvider, Any, Any, float]:
+                # Bounded by the provider's concurrency limit and admitted by
+                # the scheduler according to priority and tenant. Latency is
+                # timed from admission, so our own queues do not make the
+                # model look slow
+                limiter = (
+                    provider_limiter(provider_instance.provider_type)
+                    if provider_limiter
+                    else None
+                )
+                call_start = None
+                try:
+                    async with limiter or contextlib.nullcontext(), cls._scheduler.slot(
+                        provider_instance.provider_type,
+                        request.priority,
+                        request.user_id,
+                        request.user_tier,
+                    ):
+                        mark_call_started()
+                        call_start = time.time()
+                        provider_response = await provider_instance.process(
+                            task_type=task_type,
+                            model_id=model.id,
+                            content=content,
+                            session_context=session_context,
+                            **generation_params,
+                        )
+                except Exception as e:
+                    if call_start is not None:
+                        cls._track_performance(
+                            provider=provider_instance.provider_type,
+                            model_id=model.id,
+                            task_type=task_type,
+                            success=False,
+                            processing_time=time.time() - call_start,
+                            error=str(e),
+                        )
+                    raise
+                return provider_instance, model, provider_response, time.time() - call_start
+
+            # The deadline bounds the queueing as well as each call. Slow
+            # interactive calls are hedged against the next candidate
+            if (
+                cls._hedge_percentile is not None
+                and request.priority in INTERACTIVE_PRIORITIES
+            ):
+                provider_instance, model, provider_response, call_time = (
+                    await cls._task_router.execute_hedged(
+                        task_type,
+                        candidates,
+                        attempt,
+                        cls._hedge_percentile,
+                        cls._hedge_budget,
+                        should_failover=is_retryable_error,
+                    )
+                )
+            else:
+                provider_instance, model, provider_response, call_time = (
+                    await cls._task_router.execute_with_failover(
+                        task_type, candidates, attempt, should_failover=is_retryable_error
+                    )
+                )
+
+            # Calibrate local token estimates against the provider's usage
+            cls._calibrate_token_estimates(
+                provider_instance,
+                task_type,
+                content,
+                session_context,
+                provider_response.tokens_used,
+                provider_response.metadata,
+            )
+
+            # Add this turn to the session history
+            if session_id:
+                cls._record_session_turn(
+                    session_id, request.content, provider_response.content
+                )
+
+            # Calculate processing time
+            processing_time = time.time() - start_time
+
+            # Create response
+            response = ProcessResponse(
+                request_id=request_id,
+                task_type=task_type,
+                provider=provider_instance.provider_type,
+                model_id=model.id,
+                content=provider_response.content,
+                tokens_used=provider_response.tokens_used,
+                processing_time=processing_time,
+                cached=False,
+                session_id=session_id,
+                metadata=request.metadata,
+            )
+
+            # Cache the response if caching is enabled
+            if cache_key and cls._cache_service:
+                await cls._cache_response(cache_key, response)
+                if semantic_entry:
+                    cls._semantic_cache.add(*semantic_entry, cache_key)
+
+            # Track the provider's latency; map and reduce requests count
+            # towards the request they are part of
+            if not (request.metadata or {}).get("chunk_role"):
+                cls._track_performance(
+                    provider=provider_instance.provider_type,
+                    model_id=model.id,
+                    task_type=task_type,
+                    success=True,
+                    processing_time=call_time,
+                    tokens_used=provider_response.tokens_used,
+                )
+
+            logger.info(
+                f"Request {request_id} processed successfully in "
+                f"{processing_time:.2f}s using {provider_instance.provider_type}/{model.id}"
+            )
+
+            return response
+
+        except Exception as e:
+            # Failed attempts were tracked per model; just log the error
+            logger.error(
+                f"Error processing request {request_id}: {str(e)}",
+                exc_info=True
+            )
+            raise
+
+    @classmethod
+    async def stream(
+        cls,
+        task_type: TaskType,
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        provider: Optional[ProviderType] = None,
+        model_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        frequency_penalty: Optional[float] = None,
+        presence_penalty: Optional[float] = None,
+        stop_sequences: Optional[List[str]] = None,
+        session_id: Optional[str] = None,
+        template_id: Optional[str] = None,
+        template_vars: Optional[Dict[str, Any]] = None,
+        priority: ModelPriority = ModelPriority.MEDIUM,
+        cache_key: Optional[str] = None,
+        use_cache: bool = True,
+        metadata: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None,
+        user_tier: Optional[UserTier] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream generated content as the model produces it.
+
+        Takes the same arguments as process(). Content deltas are yielded as soon
+        as the provider sends them; the final chunk carries the finish reason,
+        token usage and request metadata. Providers without a streaming API yield
+        their full result as a single final chunk.
+
+        The assembled response is cached like a regular process() result, and a
+        cache hit is returned as a single final chunk.
+
+        The request's deadline covers everything up to the first chunk (cache
+        lookup, routing, queueing and the provider's time to respond); once
+        the stream has started it runs to completion. Until the first chunk
+        arrives, failures fail over to the next ranked candidate as in
+        process().
+
+        Example:
+            async for chunk in AutoModel.stream(
+                task_type=TaskType.CHAT,
+                content="Explain the Cornell note-taking method",
+            ):
+                print(chunk.content, end="")
+
+        Yields:
+            StreamChunk objects
+        """
+        request = ProcessRequest.trusted(
+            content,
+            task_type=task_type,
+            provider=provider,
+            model_id=model_id,
+            **_given(
+                max_tokens=max_tokens,
+                temperature=temperature,
+                top_p=top_p,
+                frequency_penalty=frequency_penalty,
+                presence_penalty=presence_penalty,
+                stop_sequences=stop_sequences,
+            ),
+            session_id=session_id,
+            template_id=template_id,
+            template_vars=template_vars,
+            priority=priority,
+            cache_key=cache_key,
+            use_cache=use_cache,
+            metadata=metadata or {},
+            user_id=user_id,
+            user_tier=user_tier,
+            timeout=timeout,
+        )
+
+        async for chunk in cls.stream_request(request):
+            yield chunk
+
+    @classmethod
+    async def stream_request(
+        cls, request: ProcessRequest
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream a request that has already been validated.
+
+        Behaves like stream(), for callers that hold a ProcessRequest already
+        (such as the API layer), so it is not taken apart and validated again.
+
+        Args:
+            request: The processing request
+
+        Yields:
+            StreamChunk objects
+        """
+        # Ensure system is initialized
+        await cls.ensure_initialized()
+
+        task_type = request.task_type
+        content = request.content
+        session_id = request.session_id
+        template_id = request.template_id
+        template_vars = request.template_vars
+        use_cache = request.use_cache
+
+        request_id = str(uuid.uuid4())
+        logger.info(f"Streaming request {request_id} for task {task_type}")
+
+        # The deadline is applied per stage, since a context variable must not
+        # stay set across the yields of this generator
+        budget = cls._request_budget(request)
+        deadline_at = None if budget is None else time.monotonic() + budget
+
+        def budget_left() -> Optional[float]:
+            return None if deadline_at is None else deadline_at - time.monotonic()
+
+        # Serve from cache if possible
+        cache_key = cls._build_cache_key(request) if use_cache else None
+        if cache_key and cls._cache_service:
+            with deadline.scope(budget_left()):
+                cached = await deadline.wait(cls._try_cache(cache_key), "cache lookup")
+            if cached:
+                logger.info(f"Cache hit for streaming request {request_id}")
+                if session_id:
+                    cls._record_session_turn(session_id, content, cached.content)
+                yield StreamChunk(
+                    content=(
+                        cached.content
+                        if isinstance(cached.content, str)
+                        else json.dumps(cached.content)
+                    ),
+                    model_id=cached.model_id,
+                    finish_reason="completed",
+                    tokens_used=cached.tokens_used,
+                    metadata={
+                        "request_id": request_id,
+                        "provider": cached.provider.value,
+                        "cached": True,
+                    },
+                )
+                return
+
+        start_time = time.time()
+
+        session_context = cls._get_session_context(session_id) if session_id else None
+        template_params: Dict[str, Any] = {}
+        with deadline.scope(budget_left()):
+            if template_id:
+                content, template_params = await cls._apply_template(
+                    template_id, content, template_vars
+                )
+            candidates = await deadline.wait(cls._rank_candidates(request), "routing")
+        generation_params = cls._generation_params(request, template_params)
+
+        with deadline.scope(budget_left()):
+            provider_instance, model, chunks, chunk, call_start = await cls._open_stream(
+                request, candidates, content, session_context, generation_params
+            )
+
+        parts: List[str] = []
+        final_chunk: Optional[StreamChunk] = None
+        try:
+            while chunk is not None:
+                if chunk.content:
+                    parts.append(chunk.content)
+                if chunk.finish_reason:
+                    final_chunk = chunk
+                else:
+                    yield chunk
+                chunk = await anext(chunks, None)
+        except Exception as e:
+            cls._track_performance(
+                provider=provider_instance.provider_type,
+                model_id=model.id,
+                task_type=task_type,
+                success=False,
+                processing_time=time.time() - call_start,
+                error=str(e),
+            )
+            logger.error(
+                f"Error streaming request {request_id}: {str(e)}", exc_info=True
+            )
+            raise
+        finally:
+            # Release the provider slot even if the consumer stopped early
+            await chunks.aclose()
+
+        processing_time = time.time() - start_time
+        final_chunk = final_chunk or StreamChunk(
+            model_id=model.id, finish_reason="completed"
+        )
+        cls._calibrate_token_estimates(
+            provider_instance,
+            task_type,
+            content,
+            session_context,
+            final_chunk.tokens_used,
+            final_chunk.metadata,
+        )
+        final_chunk.metadata.update(
+            {
+                "request_id": request_id,
+                "provider": provider_instance.provider_type.value,
+                "processing_time": processing_time,
+                "cached": False,
+            }
+        )
+
+        if session_id:
+            cls._record_session_turn(session_id, request.content, "".join(parts))
+
+        # Cache the assembled response so regular calls can reuse it
+        if cache_key and cls._cache_service:
+            await cls._cache_response(
+                cache_key,
+                ProcessResponse(
+                    request_id=request_id,
+                    task_type=task_type,
+                    provider=provider_instance.provider_type,
+                    model_id=model.id,
+                    content="".join(parts),
+                    tokens_used=final_chunk.tokens_used,
+                    processing_time=processing_time,
+                    session_id=session_id,
+                    metadata=request.metadata,
+                ),
+            )
+
+        cls._track_performance(
+            provider=provider_instance.provider_type,
+            model_id=model.id,
+            task_type=task_type,
+            success=True,
+            processing_time=time.time() - call_start,
+            tokens_used=final_chunk.tokens_used,
+        )
+
+        logger.info(
+            f"Streaming request {request_id} completed in {processing_time:.2f}s "
+            f"using {provider_instance.provider_type}/{model.id}"
+        )
+        yield final_chunk
+
+    @classmethod
+    async def _open_stream(
+        cls,
+        request: ProcessRequest,
+        candidates: List[Any],
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        session_context: Optional[Dict[str, Any]],
+        generation_params: Dict[str, Any],
+    ) -> Tuple[BaseProvider, Any, AsyncIterator[StreamChunk], Optional[StreamChunk], float]:
+        """
+        Start streaming from the best candidate that produces a first chunk.
+
+        Nothing has reached the caller before the first chunk, so errors that
+        another candidate may not have fail over to the next one, as in
+        process(). Waiting for the first chunk is bounded by the deadline.
+
+        Args:
+            request: The processing request
+            candidates: Candidate models, best first
+            content: Content to send, with any template applied
+            session_context: Context from previous interactions
+            generation_params: Generation parameters for the provider
+
+        Returns:
+            Tuple of provider, model, the open chunk stream (to be closed by the
+            caller), its first chunk (None if it was empty) and the time the
+            provider slot was granted
+
+        Raises:
+            DeadlineExceededError: If the deadline passes first
+            ProviderApiError: If every candidate failed
+        """
+        last_error: Optional[Exception] = None
+        for model in candidates:
+            provider_instance = cls._model_registry.get_provider(model.provider)
+            if not provider_instance:
+                continue
+
+            admitted_at: List[float] = []
+            chunks = cls._stream_with_slot(
+                provider_instance,
+                model.id,
+                request,
+                content,
+                session_context,
+                generation_params,
+                on_admitted=admitted_at.append,
+            )
+            try:
+                chunk = await deadline.wait(
+                    anext(chunks, None),
+                    f"first chunk from {provider_instance.provider_type.value}/{model.id}",
+                )
+            except BaseException as e:
+                await chunks.aclose()
+                if not isinstance(e, Exception):
+                    raise
+                if admitted_at:
+                    cls._track_performance(
+                        provider=provider_instance.provider_type,
+                        model_id=model.id,
+                        task_type=request.task_type,
+                        success=False,
+                        processing_time=time.time() - admitted_at[0],
+                        error=str(e),
+                    )
+                if isinstance(e, DeadlineExceededError) or not is_retryable_error(e):
+                    raise
+                last_error = e
+                logger.warning(f"Streaming failed with {model.name}: {str(e)}")
+                continue
+
+            return provider_instance, model, chunks, chunk, admitted_at[0]
+
+        raise ProviderApiError(
+            f"All models failed for streaming task {request.task_type}. "
+            f"Last error: {str(last_error)}"
+        ) from last_error
+
+    @classmethod
+    async def _stream_with_slot(
+        cls,
+        provider_instance: BaseProvider,
+        model_id: str,
+        request: ProcessRequest,
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        session_context: Optional[Dict[str, Any]],
+        generation_params: Dict[str, Any],
+        on_admitted: Optional[Callable[[float], None]] = None,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream from a provider while holding a scheduler slot.
+
+        Args:
+            provider_instance: Provider to stream from
+            model_id: ID of the model to use
+            request: The processing request
+            content: Content to send, with any template applied
+            session_context: Context from previous interactions
+            generation_params: Generation parameters for the provider
+            on_admitted: Optional callback given the time the slot was granted,
+                so latency can be measured without our own queueing
+
+        Yields:
+            StreamChunk objects from the provider
+        """
+        async with cls._scheduler.slot(
+            provider_instance.provider_type,
+            request.priority,
+            request.user_id,
+            request.user_tier,
+        ):
+            if on_admitted:
+                on_admitted(time.time())
+            async for chunk in provider_instance.stream(
+                task_type=request.task_type,
+                model_id=model_id,
+                content=content,
+                session_context=session_context,
+                **generation_params,
+            ):
+                yield chunk
+
+    @classmethod
+    def _calibrate_token_estimates(
+        cls,
+        provider: BaseProvider,
+        task_type: TaskType,
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        session_context: Optional[Dict[str, Any]],
+        tokens_used: Optional[int],
+        usage: Optional[Dict[str, Any]],
+    ) -> None:
+        """
+        Feed the usage reported by a provider back into the token estimator.
+
+        The reported prompt tokens cover the whole prompt, so the estimate does
+        too: the provider's system prompt, template instructions and session
+        history as well as the content.
+
+        Args:
+            provider: Provider that processed the request
+            task_type: Type of task
+            content: Content that was sent to the provider, template applied
+            session_context: Session context that was sent with the content
+            tokens_used: Total tokens reported by the provider
+            usage: Response metadata with "prompt_tokens" or "input_tokens"
+        """
+        usage = usage or {}
+        prompt_tokens = usage.get("prompt_tokens") or usage.get("input_tokens")
+        if not prompt_tokens or not tokens_used or media_from_content(content):
+            # Media is billed by resolution or duration, not by text tokens
+            return
+
+        estimator = get_token_estimator()
+        messages = provider.prompt_messages(task_type, content, session_context)
+        estimator.observe(
+            provider.provider_type,
+            estimated_prompt_tokens=estimator.estimate_messages(messages),
+            actual_prompt_tokens=prompt_tokens,
+            completion_tokens=max(0, tokens_used - prompt_tokens),
+        )
+
+    @classmethod
+    def _chunk_token_budget(cls, request: ProcessRequest, model: Any) -> int:
+        """
+        Get the maximum number of input tokens per chunk for a model.
+
+        Args:
+            request: The processing request
+            model: The model the request was routed to
+
+        Returns:
+            Token budget for the content of a single chunk
+        """
+        # The request's template is applied to every chunk, so its system
+        # prompt and output limit count against the budget
+        template = (
+            cls._template_cache.get(request.template_id) if request.template_id else None
+        )
+        template_tokens = 0
+        max_tokens = request.max_tokens
+        if template:
+            system_prompt = template.render_system_prompt(request.template_vars)
+            if system_prompt:
+                template_tokens = estimate_tokens(system_prompt, model.provider)
+            max_tokens = max_tokens or template.parameters.get("max_tokens")
+
+        reserved_output = max_tokens or min(4096, model.max_tokens // 4)
+        budget = (
+            model.max_tokens - reserved_output - template_tokens
+        ) * cls.CHUNK_BUDGET_RATIO
+        return max(256, int(budget))
+
+    @classmethod
+    def _needs_chunking(cls, request: ProcessRequest, model: Any) -> bool:
+        """
+        Check whether a request must be split to fit the model's context window.
+
+        Args:
+            request: The processing request
+            model: The model the request was routed to
+
+        Returns:
+            True if the content is too long and the task supports map-reduce
+        """
+        if request.task_type not in CHUNKABLE_TASKS or request.session_id:
+            return False
+        # Map and reduce requests are never split again
+        if (request.metadata or {}).get("chunk_role"):
+            return False
+        if not is_chunkable(request.content):
+            return False
+        return estimate_content_tokens(
+            request.content, model.provider
+        ) > cls._chunk_token_budget(request, model)
+
+    @classmethod
+    async def _process_chunked(
+        cls,
+        request: ProcessRequest,
+        request_id: str,
+        provider_instance: BaseProvider,
+        model: Any,
+        provider_limiter: Optional[Callable[[ProviderType], asyncio.Semaphore]] = None,
+    ) -> ProcessResponse:
+        """
+        Process long content with a parallel map-reduce pass.
+
+        The content is split on message boundaries into chunks that fit the
+        model. Chunks are processed concurrently as regular requests pinned to
+        the same model, so each chunk result is cached under its own key and
+        unchanged chunks of an edited conversation are served from cache. The
+        partial results are then combined in a reduce request.
+
+        The template is not applied to the request itself: every map and reduce
+        request applies it once, so each part is processed with the template's
+        instructions. The chunk budget leaves room for them.
+
+        Args:
+            request: The processing request
+            request_id: ID assigned to this request
+            provider_instance: Provider the request was routed to
+            model: Model the request was routed to
+            provider_limiter: Optional callable returning the semaphore that bounds
+                concurrent calls to a given provider
+
+        Returns:
+            ProcessResponse with the reduced result
+        """
+        budget = cls._chunk_token_budget(request, model)
+        chunks = split_content(request.content, budget, model.provider)
+        logger.info(
+            f"Request {request_id}: processing {len(chunks)} chunks with {model.id}"
+        )
+
+        base_request = request.model_copy(
+            update={
+                "provider": provider_instance.provider_type,
+                "model_id": model.id,
+                "cache_key": None,
+            }
+        )
+        concurrency = asyncio.Semaphore(
+            getattr(
+                get_settings(),
+                "AUTOMODEL_CHUNK_CONCURRENCY",
+                cls.DEFAULT_CHUNK_CONCURRENCY,
+            )
+        )
+
+        async def run_part(content: Any, role: str) -> ProcessResponse:
+            async with concurrency:
+                return await cls._process_request(
+                    base_request.model_copy(
+                        update={"content": content, "metadata": {"chunk_role": role}}
+                    ),
+                    provider_limiter,
+                )
+
+        def reduce_prompt(results: List[Any]) -> str:
+            return build_reduce_prompt(request.task_type, results)
+
+        # Map: process every chunk concurrently
+        partials = await asyncio.gather(*(run_part(chunk, "map") for chunk in chunks))
+
+        # Reduce hierarchically until the partial results fit into one request
+        results = [partial.content for partial in partials]
+        reduce_responses: List[ProcessResponse] = []
+        while (
+            len(results) > 1
+            and estimate_tokens(reduce_prompt(results), model.provider) > budget
+        ):
+            batches = group_partial_results(results, budget, model.provider)
+            if len(batches) >= len(results):
+                # Individual results are too large to group; reduce them as-is
+                break
+            level = await asyncio.gather(
+                *(run_part(reduce_prompt(batch), "reduce") for batch in batches)
+            )
+            reduce_responses.extend(level)
+            results = [response.content for response in level]
+
+        reduced = await run_part(reduce_prompt(results), "reduce")
+
+        tokens_used = sum(
+            response.tokens_used or 0
+            for response in [*partials, *reduce_responses, reduced]
+        )
+        metadata = dict(request.metadata or {})
+        metadata["chunks"] = len(chunks)
+        metadata["chunk_cache_hits"] = sum(1 for p in partials if p.cached)
+        return reduced.model_copy(
+            update={
+                "request_id": request_id,
+                "tokens_used": tokens_used or None,
+                "cached": False,
+                "metadata": metadata,
+            }
+        )
+
+    @classmethod
+    async def _rank_candidates(cls, request: ProcessRequest) -> List[Any]:
+        """
+        Rank the models a request may run on, best first.
+
+        A requested provider and model pin the request to that model. If the
+        pinned model cannot serve the request, the request is routed like any
+        other instead.
+
+        Args:
+            request: The processing request
+
+        Returns:
+            Non-empty list of candidate models
+
+        Raises:
+            ModelNotFoundError: When no suitable model is found
+        """
+        assert cls._model_registry is not None, "Model registry not initialized"
+        assert cls._task_router is not None, "Task router not initialized"
+
+        # If specific provider and model are requested, use them
+        if request.provider and request.model_id:
+            try:
+                return [await cls._pinned_model(request)]
+            except (
+                ProviderNotAvailableError,
+                ModelNotFoundError,
+                TaskNotSupportedError,
+            ) as e:
+                logger.warning(f"{str(e)}; routing the request instead")
+
+        # Otherwise, use task router to rank the suitable models
+        candidates = await cls._task_router.rank_candidates(
+            task_type=request.task_type,
+            priority=request.priority,
+            preferred_providers=[request.provider] if request.provider else None,
+        )
+
+        if not candidates:
+            raise ModelNotFoundError(
+                f"No suitable model found for task {request.task_type}"
+            )
+
+        return candidates
+
+    @classmethod
+    async def _pinned_model(cls, request: ProcessRequest) -> Any:
+        """
+        Get the model a request pins with its provider and model ID.
+
+        Args:
+            request: The processing request
 
-        # Try to get from cache if enabled
-        if use_cache and cls._cache_service:
-            cache_result = await cls._try_cache(request)
-            if cache_result:
-                logger.info(f"Cache hit for request {request_id}")
-                return cache_result
+        Returns:
+            The requested model
 
-        # Start timing
-        start_time = time.time()
+        Raises:
+            ProviderNotAvailableError: When the requested provider is not available
+            ModelNotFoundError: When the requested model is not found
+            TaskNotSupportedError: When the task is not supported by the model
+        """
+        provider = await cls._model_registry.ensure_provider(request.provider)
+        if not provider:
+            raise ProviderNotAvailableError(
+                f"Provider {request.provider} is not available"
+            )
 
-        try:
-            # Get session context if session_id is provided
-            session_context = (
-                cls._get_session_context(session_id) if session_id else None
+        model = provider.get_model(request.model_id)
+        if not model:
+            raise ModelNotFoundError(
+                f"Model {request.model_id} not found for provider {request.provider}"
             )
 
-            # Apply template if template_id is provided
-            if template_id:
-                content = await cls._apply_template(template_id, content, template_vars)
+        if not provider.supports_task(model.id, request.task_type):
+            raise TaskNotSupportedError(
+                f"Task {request.task_type} not supported by {request.provider}/{request.model_id}"
+            )
 
-            # Route to appropriate provider and model
-            provider_instance, model = await cls._route_request(request)
+        return model
 
-            # Process the request
-            provider_response = await provider_instance.process(
-                task_type=task_type,
-                model_id=model.id,
-                content=content,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                top_p=top_p,
-                frequency_penalty=frequency_penalty,
-                presence_penalty=presence_penalty,
-                stop_sequences=stop_sequences,
-                session_context=session_context,
-            )
+    @classmethod
+    def _build_cache_key(cls, request: ProcessRequest) -> str:
+        """
+        Build the cache key for a request.
 
-            # Update session context if session_id is provided
-            if session_id and provider_response.session_context:
-                cls._update_session_context(
-                    session_id, provider_response.session_context
-                )
+        The key is a SHA-256 digest of the canonical request parameters, so it
+        is stable across worker processes and restarts. The same key is used for
+        cache reads, cache writes and coalescing of identical in-flight requests.
 
-            # Calculate processing time
-            processing_time = time.time() - start_time
+        Args:
+            request: The processing request
 
-            # Create response
-            response = ProcessResponse(
-                request_id=request_id,
-                task_type=task_type,
-                provider=provider_instance.provider_type,
-                model_id=model.id,
-                content=provider_response.content,
-                tokens_used=provider_response.tokens_used,
-                processing_time=processing_time,
-                cached=False,
-                session_id=session_id,
-                metadata=metadata,
-            )
+        Returns:
+            The cache key (without the "automodel:" namespace prefix)
+        """
+        if request.cache_key:
+            return request.cache_key
 
-            # Cache the response if caching is enabled
-            if use_cache and cls._cache_service:
-                await cls._cache_response(request, response)
+        # Canonical JSON gives the same digest in every worker process, unlike
+        # hash(), and keeps the key short regardless of the content size
+        digest = cls._digest_key_material(cls._cache_key_material(request))
+        return f"{request.task_type.value}:{digest}"
 
-            # Track performance metrics
-            cls._track_performance(
-                provider=provider_instance.provider_type,
-                model_id=model.id,
-                task_type=task_type,
-                success=True,
-                processing_time=processing_time,
-                tokens_used=provider_response.tokens_used,
-            )
+    @classmethod
+    def _cache_key_material(cls, request: ProcessRequest) -> Dict[str, Any]:
+        """
+        Collect everything that can change the generated output of a request.
 
-            logger.info(
-                f"Request {request_id} processed successfully in "
-                f"{processing_time:.2f}s using {provider_instance.provider_type}/{model.id}"
-            )
+        Args:
+            request: The processing request
 
-            return response
+        Returns:
+            Dictionary of the request's output-relevant parameters
+        """
+        return {
+            "v": cls.CACHE_KEY_VERSION,
+            "task_type": request.task_type.value,
+            "content": request.content,
+            "provider": request.provider.value if request.provider else None,
+            "model_id": request.model_id,
+            "max_tokens": request.max_tokens,
+            "temperature": request.temperature,
+            "top_p": request.top_p,
+            "frequency_penalty": request.frequency_penalty,
+            "presence_penalty": request.presence_penalty,
+            "stop_sequences": request.stop_sequences,
+            "template_id": request.template_id,
+            "template_version": cls._template_version(request.template_id),
+            "template_vars": request.template_vars,
+            "session_context": (
+                cls._get_session_context(request.session_id)
+                if request.session_id
+                else None
+            ),
+        }
 
-        except Exception as e:
-            # Calculate processing time for failed requests
-            processing_time = time.time() - start_time
+    @classmethod
+    def _template_version(cls, template_id: Optional[str]) -> Optional[str]:
+        """
+        Get the version of a template, so edited templates get new cache keys.
 
-            # Track performance metrics for failed requests
-            if provider and model_id:
-                cls._track_performance(
-                    provider=provider,
-                    model_id=model_id,
-                    task_type=task_type,
-                    success=False,
-                    processing_time=processing_time,
-                    error=str(e),
-                )
+        Args:
+            template_id: The template ID, if the request uses one
 
-            # Log the error
-            logger.error(
-                f"Error processing request {request_id}: {str(e)}",
-                exc_info=True
-            )
+        Returns:
+            Digest of the template's prompt and parameters, or None without a
+            (known) template
+        """
+        if not template_id:
+            return None
+        template = cls._template_cache.get(template_id)
+        return template.version if template else None
 
-            # Handle different error types
-            if isinstance(
-                e,
-                (ProviderNotAvailableError, ModelNotFoundError, TaskNotSupportedError),
-            ):
-                # Try fallback if specific provider/model was requested but not available
-                if (provider or model_id) and not getattr(request, "is_fallback", False):
-                    logger.info(
-                        f"Attempting fallback for request {request_id}"
-                    )
-                    fallback_request = request.copy()
-                    fallback_request.provider = None
-                    fallback_request.model_id = None
-                    fallback_request.is_fallback = True  # Mark as fallback to prevent infinite recursion
-                    try:
-                        return await cls.process(
-                            **fallback_request.dict(exclude={"is_fallback"})
-                        )
-                    except Exception as fallback_e:
-                        logger.error(
-                            f"Fallback failed for request {request_id}: {str(fallback_e)}"
-                        )
+    @classmethod
+    def _digest_key_material(cls, key_material: Dict[str, Any]) -> str:
+        """
+        Compute the SHA-256 digest of canonical JSON key material.
 
-            # Re-raise the original exception
-            raise
+        Args:
+            key_material: Key material built by _cache_key_material
+
+        Returns:
+            Hex digest
+        """
+        canonical = json.dumps(
+            key_material,
+            sort_keys=True,
+            separators=(",", ":"),
+            default=cls._cache_key_default,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
     @classmethod
-    async def _route_request(cls, request: ProcessRequest) -> Tuple[BaseProvider, Any]:
+    async def _semantic_entry(
+        cls, request: ProcessRequest
+    ) -> Optional[Tuple[str, Any]]:
         """
-        Route a request to the appropriate provider and model.
+        Get the semantic cache namespace and embedding of a request.
+
+        Requests are only compared within a namespace of identical parameters
+        (task type, template, model and generation settings), so a hit differs
+        from the original request in its content alone.
 
         Args:
             request: The processing request
 
         Returns:
-            Tuple of provider instance and model
+            Tuple of (namespace, embedding), or None if the request is not
+            eligible for the semantic cache
+        """
+        if request.session_id:
+            # Session history makes every turn unique
+            return None
+        text = semantic_cache.content_text(request.content)
+        if not text:
+            return None
 
-        Raises:
-            ProviderNotAvailableError: When a requested provider is not available
-            ModelNotFoundError: When a requested model is not found
-            TaskNotSupportedError: When a task is not supported by the selected model
+        key_material = cls._cache_key_material(request)
+        del key_material["content"]
+        namespace = cls._digest_key_material(key_material)
+        # Long exports take a while to embed, so keep it off the event loop
+        vector = await asyncio.to_thread(cls._semantic_cache.embed, text)
+        return namespace, vector
+
+    @classmethod
+    async def _try_semantic_cache(
+        cls, namespace: str, vector: Any
+    ) -> Optional[ProcessResponse]:
         """
-        assert cls._model_registry is not None, "Model registry not initialized"
-        assert cls._task_router is not None, "Task router not initialized"
+        Try to get the cached response of a near-duplicate request.
 
-        # If specific provider and model are requested, use them
-        if request.provider and request.model_id:
-            provider = cls._model_registry.get_provider(request.provider)
-            if not provider:
-                raise ProviderNotAvailableError(
-                    f"Provider {request.provider} is not available"
-                )
+        Args:
+            namespace: Semantic cache namespace of the request
+            vector: Embedding of the request
 
-            model = provider.get_model(request.model_id)
-            if not model:
-                raise ModelNotFoundError(
-                    f"Model {request.model_id} not found for provider {request.provider}"
-                )
+        Returns:
+            Cached response with its similarity in the metadata, or None
+        """
+        match = cls._semantic_cache.lookup(namespace, vector)
+        if not match:
+            return None
 
-            if not provider.supports_task(model.id, request.task_type):
-                raise TaskNotSupportedError(
-                    f"Task {request.task_type} not supported by {request.provider}/{request.model_id}"
-                )
+        cache_key, similarity = match
+        response = await cls._try_cache(cache_key)
+        if not response:
+            # The response expired from the cache
+            cls._semantic_cache.invalidate(cache_key)
+            return None
 
-            return provider, model
+        response.metadata = {
+            **(response.metadata or {}),
+            "semantic_similarity": similarity,
+        }
+        return response
 
-        # Otherwise, use task router to find the best model
-        model = await cls._task_router.get_model_recommendation(
-            task_type=request.task_type, priority=request.priority
-        )
+    @staticmethod
+    def _cache_key_default(value: Any) -> str:
+        """
+        Serialize values JSON cannot encode for the cache key.
 
-        if not model:
-            raise ModelNotFoundError(
-                f"No suitable model found for task {request.task_type}"
-            )
+        Binary media is keyed by its digest, so large blobs are never
+        converted to a string representation.
 
-        provider = cls._model_registry.get_provider(model.provider)
-        if not provider:
-            raise ProviderNotAvailableError(
-                f"Provider {model.provider} is not available"
-            )
+        Args:
+            value: Value to serialize
 
-        return provider, model
+        Returns:
+            String standing in for the value in the key material
+        """
+        if isinstance(value, MediaContent):
+            return value.cache_token()
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return f"sha256:{media_digest(value)}"
+        return str(value)
 
     @classmethod
-    async def _try_cache(cls, request: ProcessRequest) -> Optional[ProcessResponse]:
+    async def _try_cache(cls, cache_key: str) -> Optional[ProcessResponse]:
         """
         Try to get a response from cache.
 
         Args:
-            request: The processing request
+            cache_key: Cache key built by _build_cache_key
 
         Returns:
             Cached response or None if not found
@@ -502,25 +1679,6 @@ class AutoModel:
         if not cls._cache_service:
             return None
 
-        # Generate cache key if not provided
-        cache_key = request.cache_key
-        if not cache_key:
-            # Create a deterministic cache key from request parameters
-            key_parts = [
-                str(request.task_type),
-                (
-                    str(request.content)
-                    if isinstance(request.content, str)
-                    else str(hash(str(request.content)))
-                ),
-                str(request.provider) if request.provider else "",
-                str(request.model_id) if request.model_id else "",
-                str(request.max_tokens) if request.max_tokens else "",
-                str(request.temperature) if request.temperature else "",
-                str(request.template_id) if request.template_id else "",
-            ]
-            cache_key = ":".join(key_parts)
-
         # Try to get from cache
         cached_data = await cls._cache_service.get(f"automodel:{cache_key}")
         if not cached_data:
@@ -528,7 +1686,7 @@ class AutoModel:
 
         try:
             # Create response from cached data
-            response = ProcessResponse.parse_raw(cached_data)
+            response = _RESPONSE_ADAPTER.validate_json(cached_data)
             response.cached = True
             return response
         except ValidationError:
@@ -536,44 +1694,27 @@ class AutoModel:
             return None
 
     @classmethod
-    async def _cache_response(
-        cls, request: ProcessRequest, response: ProcessResponse
-    ) -> None:
+    async def _cache_response(cls, cache_key: str, response: ProcessResponse) -> None:
         """
         Cache a response for future use.
 
         Args:
-            request: The processing request
+            cache_key: Cache key built by _build_cache_key
             response: The response to cache
         """
         if not cls._cache_service:
             return
 
-        # Generate cache key if not provided
-        cache_key = request.cache_key
-        if not cache_key:
-            # Create a deterministic cache key from request parameters
-            key_parts = [
-                str(request.task_type),
-                (
-                    str(request.content)
-                    if isinstance(request.content, str)
-                    else str(hash(str(request.content)))
-                ),
-                str(request.provider) if request.provider else "",
-                str(request.model_id) if request.model_id else "",
-                str(request.max_tokens) if request.max_tokens else "",
-                str(request.temperature) if request.temperature else "",
-                str(request.template_id) if request.template_id else "",
-            ]
-            cache_key = ":".join(key_parts)
-
         # Cache the response
         settings = get_settings()
         ttl = (
             settings.CACHE_TTL if hasattr(settings, "CACHE_TTL") else 3600
         )  # Default 1 hour
-        await cls._cache_service.set(f"automodel:{cache_key}", response.json(), ttl=ttl)
+        await cls._cache_service.set(
+            f"automodel:{cache_key}",
+            _RESPONSE_ADAPTER.dump_json(response).decode(),
+            ttl=ttl,
+        )
 
     @classmethod
     def _get_session_context(cls, session_id: str) -> Dict[str, Any]:
@@ -586,18 +1727,58 @@ class AutoModel:
         Returns:
             Session context or empty dict if not found
         """
-        return cls._active_sessions.get(session_id, {})
+        return cls._active_sessions.get(session_id) or {}
 
     @classmethod
-    def _update_session_context(cls, session_id: str, context: Dict[str, Any]) -> None:
+    def _record_session_turn(
+        cls,
+        session_id: str,
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        response_content: Any,
+    ) -> None:
         """
-        Update context for a chat session.
+        Append a request and its response to the history of a chat session.
+
+        Providers send the history ahead of the next request's content. System
+        messages are instructions rather than conversation and are left out,
+        and media is recorded by its prompt only. When the history outgrows the
+        per-session limit, its oldest turns are dropped.
 
         Args:
             session_id: The session ID
-            context: The new context
+            content: Content of the request, before any template was applied
+            response_content: Content of the model's response
         """
-        cls._active_sessions[session_id] = context
+        media = media_from_content(content)
+        if media:
+            turn = [{"role": "user", "content": media.prompt}]
+        elif isinstance(content, str):
+            turn = [{"role": "user", "content": content}]
+        else:
+            messages = (
+                content["messages"]
+                if isinstance(content, dict) and "messages" in content
+                else content if isinstance(content, list) else [content]
+            )
+            turn = [
+                message
+                if isinstance(message, dict) and "role" in message and "content" in message
+                else {"role": "user", "content": str(message)}
+                for message in messages
+            ]
+            turn = [message for message in turn if message["role"] != "system"]
+
+        turn.append(
+            {
+                "role": "assistant",
+                "content": (
+                    response_content
+                    if isinstance(response_content, str)
+                    else json.dumps(response_content)
+                ),
+            }
+        )
+        cls._active_sessions.append_messages(session_id, turn)
 
     @classmethod
     async def create_session(cls) -> str:
@@ -608,7 +1789,7 @@ class AutoModel:
             New session ID
         """
         session_id = str(uuid.uuid4())
-        cls._active_sessions[session_id] = {}
+        cls._active_sessions.create(session_id)
         return session_id
 
     @classmethod
@@ -619,8 +1800,17 @@ class AutoModel:
         Args:
             session_id: The session ID to delete
         """
-        if session_id in cls._active_sessions:
-            del cls._active_sessions[session_id]
+        cls._active_sessions.delete(session_id)
+
+    @classmethod
+    def get_session_stats(cls) -> Dict[str, Any]:
+        """
+        Get memory and eviction statistics for active sessions.
+
+        Returns:
+            Dictionary with session counts, byte usage and eviction counts
+        """
+        return cls._active_sessions.get_stats()
 
     @classmethod
     def _track_performance(
@@ -645,8 +1835,8 @@ class AutoModel:
             tokens_used: Number of tokens used
             error: Error message if unsuccessful
         """
-        # Create metrics object
-        metrics = PerformanceMetrics(
+        # Record in the ring buffer (overwrites the oldest entry when full)
+        cls._performance_metrics.append(
             provider=provider,
             model_id=model_id,
             task_type=task_type,
@@ -656,11 +1846,6 @@ class AutoModel:
             error=error,
         )
 
-        # Add to metrics list (with size limit)
-        cls._performance_metrics.append(metrics)
-        if len(cls._performance_metrics) > 1000:  # Limit to last 1000 metrics
-            cls._performance_metrics = cls._performance_metrics[-1000:]
-
         # TODO: In a production system, we would persist these metrics to a database
 
     @classmethod
@@ -685,26 +1870,54 @@ class AutoModel:
         Returns:
             List of performance metrics
         """
-        # Filter metrics based on criteria
-        filtered_metrics = cls._performance_metrics
+        # The ring buffer returns matching rows newest first
+        rows = cls._performance_metrics.query(
+            provider=provider,
+            model_id=model_id,
+            task_type=task_type,
+            success=success,
+            limit=limit,
+        )
+        return [
+            PerformanceMetrics(
+                **{**row, "timestamp": datetime.utcfromtimestamp(row["timestamp"])}
+            )
+            for row in rows
+        ]
+
+    @classmethod
+    def get_performance_summary(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Get request counts and latency percentiles per provider/model/task.
 
-        if provider:
-            filtered_metrics = [m for m in filtered_metrics if m.provider == provider]
+        Returns:
+            Dictionary keyed by "provider/model_id/task_type" with request
+            counts, error rate, tokens used and p50/p95/p99 latency in seconds
+        """
+        return cls._performance_metrics.summary()
 
-        if model_id:
-            filtered_metrics = [m for m in filtered_metrics if m.model_id == model_id]
+    @classmethod
+    def get_scheduler_stats(cls) -> Dict[str, Any]:
+        """
+        Get slot usage, queue depth and queue times of the request scheduler.
 
-        if task_type:
-            filtered_metrics = [m for m in filtered_metrics if m.task_type == task_type]
+        Returns:
+            Dictionary keyed by provider with capacity, active and waiting
+            requests, and per-priority queue-time percentiles in seconds
+        """
+        return cls._scheduler.get_stats()
 
-        if success is not None:
-            filtered_metrics = [m for m in filtered_metrics if m.success == success]
+    @classmethod
+    def get_semantic_cache_stats(cls) -> Dict[str, Any]:
+        """
+        Get hit-rate and size statistics of the semantic cache.
 
-        # Sort by timestamp (newest first) and limit
-        sorted_metrics = sorted(
-            filtered_metrics, key=lambda m: m.timestamp, reverse=True
-        )
-        return sorted_metrics[:limit]
+        Returns:
+            Dictionary of statistics, with "enabled" False when the tier is off
+        """
+        if not cls._semantic_cache:
+            return {"enabled": False}
+        return {"enabled": True, **cls._semantic_cache.get_stats()}
 
     @classmethod
     async def process_with_models(
@@ -713,6 +1926,7 @@ class AutoModel:
         content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
         model_configs: List[Dict[str, Any]],
         compare_results: bool = False,
+        max_concurrency: Optional[int] = None,
         **kwargs,
     ) -> Union[ProcessResponse, List[ProcessResponse]]:
         """
@@ -727,7 +1941,10 @@ class AutoModel:
                 - temperature: Optional temperature override
                 - max_tokens: Optional max_tokens override
                 - name: Optional friendly name for this config
-            compare_results: If True, return all results; if False, return first successful
+            compare_results: If True, return all results; if False, return the first
+                result to succeed and cancel the remaining configs
+            max_concurrency: Maximum number of configs processed at once
+                (default: all of them)
             **kwargs: Additional parameters for processing
 
         Returns:
@@ -748,82 +1965,194 @@ class AutoModel:
         """
         await cls.ensure_initialized()
 
-        results = []
-        errors = []
+        if not model_configs:
+            raise ProcessingError("No model configurations provided")
 
-        for i, config in enumerate(model_configs):
-            try:
-                # Extract config parameters
-                provider = config.get("provider")
-                model_id = config.get("model_id")
-                config_name = config.get("name", f"{provider}/{model_id}")
-
-                # Override parameters from config
-                process_kwargs = kwargs.copy()
-                if "temperature" in config:
-                    process_kwargs["temperature"] = config["temperature"]
-                if "max_tokens" in config:
-                    process_kwargs["max_tokens"] = config["max_tokens"]
+        limit = max(1, max_concurrency or len(model_configs))
+        semaphore = asyncio.Semaphore(limit)
+        errors: Dict[int, Dict[str, Any]] = {}
 
-                logger.info(f"Processing with model config: {config_name}")
+        def config_name_for(config: Dict[str, Any]) -> str:
+            return config.get(
+                "name", f"{config.get('provider')}/{config.get('model_id')}"
+            )
 
-                # Process with this specific model
-                result = await cls.process(
-                    task_type=task_type,
-                    content=content,
-                    provider=ProviderType(provider) if provider else None,
-                    model_id=model_id,
-                    **process_kwargs,
-                )
+        async def run_config(i: int, config: Dict[str, Any]) -> ProcessResponse:
+            # Extract config parameters
+            provider = config.get("provider")
+            model_id = config.get("model_id")
+            config_name = config_name_for(config)
 
-                # Add config info to metadata
-                result.metadata = result.metadata or {}
-                result.metadata["config_name"] = config_name
-                result.metadata["config_index"] = i
+            # Override parameters from config
+            process_kwargs = kwargs.copy()
+            if "temperature" in config:
+                process_kwargs["temperature"] = config["temperature"]
+            if "max_tokens" in config:
+                process_kwargs["max_tokens"] = config["max_tokens"]
 
-                results.append(result)
+            async with semaphore:
+                logger.info(f"Processing with model config: {config_name}")
+                try:
+                    # Process with this specific model
+                    result = await cls.process(
+                        task_type=task_type,
+                        content=content,
+                        provider=ProviderType(provider) if provider else None,
+                        model_id=model_id,
+                        **process_kwargs,
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    errors[i] = {
+                        "config": config,
+                        "config_name": config_name,
+                        "error": str(e),
+                    }
+                    logger.error(
+                        f"Failed to process with config {config_name}: {str(e)}"
+                    )
+                    raise
 
-                # If not comparing results, return first successful result
-                if not compare_results:
-                    return result
+            # Add config info to metadata
+            result.metadata = result.metadata or {}
+            result.metadata["config_name"] = config_name
+            result.metadata["config_index"] = i
+            return result
 
-            except Exception as e:
-                error_info = {
-                    "config": config,
-                    "config_name": config.get(
-                        "name", f"{config.get('provider')}/{config.get('model_id')}"
-                    ),
-                    "error": str(e),
-                }
-                errors.append(error_info)
-                logger.error(
-                    f"Failed to process with config {error_info['config_name']}: {str(e)}"
-                )
+        def all_failed_error() -> ProcessingError:
+            error_summary = "; ".join(
+                f"{errors[i]['config_name']}: {errors[i]['error']}" for i in sorted(errors)
+            )
+            return ProcessingError(f"All model configurations failed: {error_summary}")
 
-                # If not comparing results and this was the only config, raise the error
-                if not compare_results and len(model_configs) == 1:
-                    raise
+        tasks = [
+            asyncio.create_task(run_config(i, config))
+            for i, config in enumerate(model_configs)
+        ]
 
-        # If comparing results, return all successful results
+        # If comparing results, run every config and return all successful results
         if compare_results:
-            if not results and errors:
-                # All configs failed
-                error_summary = "; ".join(
-                    [f"{e['config_name']}: {e['error']}" for e in errors]
-                )
-                raise ProcessingError(
-                    f"All model configurations failed: {error_summary}"
-                )
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+            results = [
+                outcome for outcome in outcomes if isinstance(outcome, ProcessResponse)
+            ]
+            if not results:
+                raise all_failed_error()
             return results
 
-        # If not comparing and we get here, all configs failed
-        if errors:
-            error_summary = "; ".join(
-                [f"{e['config_name']}: {e['error']}" for e in errors]
+        # Otherwise return the first successful result and cancel the rest
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    return await next_done
+                except Exception:
+                    # If this was the only config, raise the error as-is
+                    if len(model_configs) == 1:
+                        raise
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        # If we get here, all configs failed
+        raise all_failed_error()
+
+    @classmethod
+    async def process_batch(
+        cls,
+        requests: List[ProcessRequest],
+        provider_concurrency: Optional[Dict[ProviderType, int]] = None,
+        max_in_flight: Optional[int] = None,
+    ) -> List[BatchItemResult]:
+        """
+        Process many requests concurrently with per-provider concurrency limits.
+
+        Each request is routed independently. Calls to a given provider are bounded
+        by that provider's limit, so a large batch saturates every provider quota
+        without exceeding any of them. A failing item never aborts the batch.
+
+        Args:
+            requests: Requests to process
+            provider_concurrency: Optional per-provider limits on concurrent calls;
+                providers not listed use the configured default
+            max_in_flight: Maximum number of items in the pipeline at once
+                (cache lookup, routing and provider call). Never more than the
+                available providers can take at once, since an item's time
+                budget starts when it enters the pipeline
+
+        Returns:
+            One BatchItemResult per request, in the same order as the input
+
+        Example:
+            results = await AutoModel.process_batch(
+                [
+                    ProcessRequest(task_type=TaskType.SUMMARIZATION, content=text)
+                    for text in conversations
+                ],
+                provider_concurrency={ProviderType.OPENAI: 16},
             )
-            raise ProcessingError(f"All model configurations failed: {error_summary}")
+        """
+        await cls.ensure_initialized()
+
+        if not requests:
+            return []
+
+        settings = get_settings()
+        default_limit = getattr(
+            settings,
+            "AUTOMODEL_PROVIDER_CONCURRENCY",
+            cls.DEFAULT_PROVIDER_CONCURRENCY,
+        )
+        limits = provider_concurrency or {}
+        semaphores: Dict[ProviderType, asyncio.Semaphore] = {}
+
+        def provider_limiter(provider_type: ProviderType) -> asyncio.Semaphore:
+            if provider_type not in semaphores:
+                semaphores[provider_type] = asyncio.Semaphore(
+                    max(1, limits.get(provider_type, default_limit))
+                )
+            return semaphores[provider_type]
+
+        # Items beyond what the providers can take would only spend their time
+        # budget waiting on the limiters above
+        in_flight_limit = max_in_flight or cls.DEFAULT_BATCH_IN_FLIGHT
+        provider_capacity = sum(
+            max(1, limits.get(provider_type, default_limit))
+            for provider_type in cls._model_registry.get_available_providers()
+        )
+        if provider_capacity:
+            in_flight_limit = min(in_flight_limit, provider_capacity)
+        in_flight = asyncio.Semaphore(max(1, in_flight_limit))
+
+        async def run_item(index: int, request: ProcessRequest) -> BatchItemResult:
+            async with in_flight:
+                try:
+                    response = await cls._process_request(
+                        request, provider_limiter=provider_limiter
+                    )
+                    return BatchItemResult(index=index, success=True, response=response)
+                except Exception as e:
+                    return BatchItemResult(
+                        index=index,
+                        success=False,
+                        error=str(e),
+                        error_type=type(e).__name__,
+                    )
+
+        logger.info(f"Processing batch of {len(requests)} requests")
+        start_time = time.time()
+
+        results = await asyncio.gather(
+            *(run_item(i, request) for i, request in enumerate(requests))
+        )
 
-        raise ProcessingError("No model configurations provided")
+        failed = sum(1 for result in results if not result.success)
+        logger.info(
+            f"Batch of {len(requests)} requests completed in "
+            f"{time.time() - start_time:.2f}s ({failed} failed)"
+        )
+        return list(results)
 
     @classmethod
     async def get_available_models(
@@ -877,6 +2206,9 @@ class AutoModel:
                     "total_requests": metrics.get("total_requests", 0),
                     "success_rate": 1.0 - metrics.get("error_rate", 0.0),
                     "average_response_time": metrics.get("average_response_time", 0.0),
+                    "p95_response_time": cls._model_registry.get_latency_percentile(
+                        model.id, 95, min_samples=1
+                    ),
                     "last_used": metrics.get("last_used"),
                 }
 
@@ -925,7 +2257,7 @@ class AutoModel:
                         logger.warning(f"Unknown provider: {pref['provider']}")
 
                 # Update fallback chain for this task
-                cls._task_router._fallback_chains[task_type] = provider_order
+                cls._task_router.set_fallback_chain(task_type, provider_order)
 
         logger.info(
             f"Updated task model preferences for {len(task_preferences)} task types"
@@ -937,28 +2269,57 @@ class AutoModel:
         template_id: str,
         content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
         template_vars: Optional[Dict[str, Any]] = None,
-    ) -> Union[str, Dict[str, Any]]:
+    ) -> Tuple[Union[str, Dict[str, Any], List[Dict[str, Any]]], Dict[str, Any]]:
         """
         Apply a template to content.
 
+        Templates are parsed once and served from the template cache; a
+        template is only re-read when its file changes.
+
         Args:
             template_id: The template ID
             content: The content to process
             template_vars: Variables for template rendering
 
         Returns:
-            Processed content with template applied
+            Tuple of (content with the template's system prompt applied,
+            generation parameters defined by the template)
 
         Raises:
             ValueError: When template is not found
         """
-        # TODO: Implement template application
-        # This would integrate with the template system
-        # For now, just return the original content
-        logger.warning(
-            f"Template application not implemented yet for template {template_id}"
-        )
-        return content
+        template = cls._template_cache.get(template_id)
+        if not template:
+            raise ValueError(f"Template {template_id} not found")
+
+        if not template.has_system_prompt:
+            logger.warning(f"Template {template_id} does not define a system prompt")
+
+        return template.apply(content, template_vars), template.parameters
+
+    @classmethod
+    def _generation_params(
+        cls, request: ProcessRequest, template_params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Resolve the generation parameters for the provider call.
+
+        Template parameters fill in any value the request did not set; values
+        set explicitly on the request take precedence, even when they equal
+        the defaults.
+
+        Args:
+            request: The processing request
+            template_params: Generation parameters defined by the template
+
+        Returns:
+            Dictionary of generation parameters for the provider
+        """
+        params = {name: getattr(request, name) for name in TEMPLATE_PARAMETERS}
+        for name, value in template_params.items():
+            if name not in request.model_fields_set:
+                params[name] = value
+        return params
 
     @classmethod
     async def process_media(
@@ -972,9 +2333,14 @@ class AutoModel:
         """
         Process media content (images, audio, video).
 
+        The media is passed by reference: it is hashed for the cache key and
+        base64-encoded for the provider in fixed-size slices while the request
+        is sent, without copying the whole buffer.
+
         Args:
             media_type: MIME type of the media
-            media_content: Binary content of the media
+            media_content: Binary content of the media (bytes, bytearray or
+                memoryview)
             task_type: Type of media analysis to perform
             prompt: Optional text prompt to guide the analysis
             **kwargs: Additional parameters for processing
@@ -985,18 +2351,23 @@ class AutoModel:
         Raises:
             TaskNotSupportedError: When media processing is not supported
             ProcessingError: When there's an error during processing
+            DeadlineExceededError: When the request cannot finish within its
+                time budget
         """
         # Ensure system is initialized
         await cls.ensure_initialized()
 
-        # Start timing
-
         try:
-            # Create content object with media data
+            # Wrap the media without copying it
+            media = MediaContent(media_type, media_content, prompt or "")
+            if kwargs.get("use_cache", True) and not kwargs.get("cache_key"):
+                # Hash large media off the event loop before the cache lookup
+                await asyncio.to_thread(lambda: media.digest)
+
             content = {
                 "media_type": media_type,
-                "media_content": media_content,
-                "prompt": prompt or "",
+                "media": media,
+                "prompt": media.prompt,
             }
 
             # Process with appropriate model (vision models for images, etc.)
@@ -1006,6 +2377,9 @@ class AutoModel:
                 **kwargs,
             )
 
+        except DeadlineExceededError:
+            raise
+
         except Exception as e:
             # Log the error
             logger.error(f"Error processing media: {str(e)}", exc_info=True)
@@ -0,0 +1,236 @@
+"""
+Capability Index - Precomputed Task to Model Lookup for Routing
+
+This module indexes registered models so candidate selection does not scan
+every model (hundreds with OpenRouter's catalog) on each request. Each model
+gets a slot number, and sets of models are Python integers used as bitsets:
+
+- one bitset per task type of the models supporting it
+- one bitset per provider, plus a bitset of models whose provider is healthy
+- one bitset per boolean capability (vision, functions, streaming)
+
+Context size and cost are kept in compact ``array`` columns; the bitsets of
+models meeting a numeric requirement are computed once per threshold and
+cached until the set of models changes. A candidate query is a handful of
+integer ANDs followed by decoding the surviving bits.
+
+The index has a version that changes whenever a query could return a
+different result, so callers can cache what they derive from it.
+
+Author: Rip Jonesy
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.automodel import ProviderType, TaskType
+from app.automodel.providers import Model
+
+# Capability flags
+VISION = 1
+FUNCTIONS = 2
+STREAMING = 4
+
+# Requirement keys mapped to the capability flag they demand
+_FLAG_REQUIREMENTS = {
+    "supports_vision": VISION,
+    "supports_functions": FUNCTIONS,
+    "supports_streaming": STREAMING,
+}
+
+# Requirement keys compared against the numeric columns
+_THRESHOLD_REQUIREMENTS = ("min_max_tokens", "max_cost_per_1k_tokens")
+
+
+def _iter_bits(mask: int) -> Iterable[int]:
+    """Iterate over the positions of the set bits of a bitset."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class CapabilityIndex:
+    """Bitset index of models by task type, provider health and capability."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._models: List[Model] = []
+        self._slots: Dict[str, int] = {}
+
+        self._max_tokens = array("q")
+        # Cost per 1k tokens; 0 when unknown, which no cost limit excludes
+        self._costs = array("d")
+
+        self._task_masks: Dict[TaskType, int] = {}
+        self._provider_masks: Dict[ProviderType, int] = {}
+        self._flag_masks: Dict[int, int] = {VISION: 0, FUNCTIONS: 0, STREAMING: 0}
+        self._available_mask = 0
+        self._healthy_mask = 0
+        self._healthy_providers: Set[ProviderType] = set()
+
+        # Bitsets of models meeting a numeric requirement, by (key, threshold)
+        self._threshold_masks: Dict[Tuple[str, float], int] = {}
+
+        # Changes whenever candidates() may return a different result
+        self.version = 0
+
+    def __len__(self) -> int:
+        """Number of indexed models."""
+        return len(self._models)
+
+    def add(self, model: Model) -> None:
+        """
+        Index a model, replacing an earlier entry with the same ID.
+
+        Args:
+            model: Model to index
+        """
+        slot = self._slots.get(model.id)
+        if slot is None:
+            slot = len(self._models)
+            self._slots[model.id] = slot
+            self._models.append(model)
+            self._max_tokens.append(0)
+            self._costs.append(0.0)
+        else:
+            self._clear_slot(slot)
+            self._models[slot] = model
+
+        bit = 1 << slot
+        flags = (
+            (VISION if model.supports_vision else 0)
+            | (FUNCTIONS if model.supports_functions else 0)
+            | (STREAMING if model.supports_streaming else 0)
+        )
+        self._max_tokens[slot] = model.max_tokens
+        self._costs[slot] = model.cost_per_1k_tokens or 0.0
+
+        for task_type in model.supported_tasks:
+            self._task_masks[task_type] = self._task_masks.get(task_type, 0) | bit
+        self._provider_masks[model.provider] = (
+            self._provider_masks.get(model.provider, 0) | bit
+        )
+        for flag in self._flag_masks:
+            if flags & flag:
+                self._flag_masks[flag] |= bit
+        if model.is_available:
+            self._available_mask |= bit
+        if model.provider in self._healthy_providers:
+            self._healthy_mask |= bit
+
+        self._threshold_masks.clear()
+        self.version += 1
+
+    def _clear_slot(self, slot: int) -> None:
+        """Remove a slot from every bitset before it is re-indexed."""
+        keep = ~(1 << slot)
+        for task_type in self._task_masks:
+            self._task_masks[task_type] &= keep
+        for provider_type in self._provider_masks:
+            self._provider_masks[provider_type] &= keep
+        for flag in self._flag_masks:
+            self._flag_masks[flag] &= keep
+        self._available_mask &= keep
+        self._healthy_mask &= keep
+
+    def set_model_available(self, model_id: str, available: bool) -> None:
+        """
+        Update whether a model is available.
+
+        Args:
+            model_id: ID of the model
+            available: Whether the model can be routed to
+        """
+        slot = self._slots.get(model_id)
+        if slot is None:
+            return
+        mask = self._available_mask
+        if available:
+            self._available_mask |= 1 << slot
+        else:
+            self._available_mask &= ~(1 << slot)
+        if self._available_mask != mask:
+            self.version += 1
+
+    def set_provider_health(self, provider_type: ProviderType, healthy: bool) -> None:
+        """
+        Update the health of a provider's models.
+
+        Args:
+            provider_type: Provider whose health changed
+            healthy: Whether the provider is healthy
+        """
+        if healthy == (provider_type in self._healthy_providers):
+            return
+        self.version += 1
+
+        provider_mask = self._provider_masks.get(provider_type, 0)
+        if healthy:
+            self._healthy_providers.add(provider_type)
+            self._healthy_mask |= provider_mask
+        else:
+            self._healthy_providers.discard(provider_type)
+            self._healthy_mask &= ~provider_mask
+
+    def _threshold_mask(self, key: str, threshold: float) -> int:
+        """Bitset of models meeting a numeric requirement, cached per threshold."""
+        mask = self._threshold_masks.get((key, threshold))
+        if mask is not None:
+            return mask
+
+        mask = 0
+        if key == "min_max_tokens":
+            for slot, max_tokens in enumerate(self._max_tokens):
+                if max_tokens >= threshold:
+                    mask |= 1 << slot
+        else:
+            for slot, cost in enumerate(self._costs):
+                if not cost or cost <= threshold:
+                    mask |= 1 << slot
+        self._threshold_masks[(key, threshold)] = mask
+        return mask
+
+    def candidates(
+        self,
+        task_type: TaskType,
+        excluded_providers: Optional[Iterable[ProviderType]] = None,
+        requirements: Optional[Dict[str, Any]] = None,
+    ) -> List[Model]:
+        """
+        Get the available models of healthy providers that can run a task.
+
+        Args:
+            task_type: Task type the models must support
+            excluded_providers: Providers whose models are left out
+            requirements: Model requirements (min_max_tokens, supports_vision,
+                supports_functions, supports_streaming, max_cost_per_1k_tokens)
+
+        Returns:
+            Matching models in registration order
+        """
+        mask = (
+            self._task_masks.get(task_type, 0)
+            & self._available_mask
+            & self._healthy_mask
+        )
+        for provider_type in excluded_providers or ():
+            mask &= ~self._provider_masks.get(provider_type, 0)
+
+        for key, value in (requirements or {}).items():
+            if not mask:
+                break
+            flag = _FLAG_REQUIREMENTS.get(key)
+            if flag is not None:
+                if value:
+                    mask &= self._flag_masks[flag]
+            elif key in _THRESHOLD_REQUIREMENTS and value is not None:
+                mask &= self._threshold_mask(key, value)
+
+        return [self._models[slot] for slot in _iter_bits(mask)]
+
+    def clear(self) -> None:
+        """Drop every indexed model."""
+        version = self.version
+        self.__init__()
+        self.version = version + 1
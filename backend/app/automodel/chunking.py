@@ -0,0 +1,266 @@
+"""
+Chunking - Token-Aware Splitting of Long Conversations
+
+This module splits content that does not fit a model's context window into
+chunks along message boundaries, so long conversations can be processed with
+a map-reduce pass: each chunk is processed on its own and the partial results
+are combined in a final reduce request.
+
+Chunk boundaries are content-defined: a chunk is closed after a message whose
+digest matches a boundary pattern once the chunk is reasonably full. An edit
+to one part of a conversation therefore only changes the chunks around the
+edit, and the results of all other chunks can be served from cache.
+
+Author: Rip Jonesy
+"""
+
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Union
+
+from app.automodel import TaskType
+from app.core.token_estimator import MESSAGE_OVERHEAD_TOKENS, get_token_estimator
+
+Content = Union[str, Dict[str, Any], List[Dict[str, Any]]]
+
+# Task types whose results can be combined with a reduce pass
+CHUNKABLE_TASKS = {
+    TaskType.SUMMARIZATION,
+    TaskType.TOPIC_EXTRACTION,
+    TaskType.SENSEMAKING,
+}
+
+# Characters per token used when hard-splitting oversized messages
+CHARS_PER_TOKEN = 4
+
+# A chunk is only closed at a content-defined boundary once it is this full
+MIN_CHUNK_FILL = 0.6
+
+# On average one message in this many is a boundary candidate
+BOUNDARY_DIVISOR = 8
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+_REDUCE_INSTRUCTIONS = {
+    TaskType.SUMMARIZATION: (
+        "The following are summaries of consecutive parts of one long "
+        "conversation. Combine them into a single coherent summary of the "
+        "whole conversation, removing repetition."
+    ),
+    TaskType.TOPIC_EXTRACTION: (
+        "The following are topics extracted from consecutive parts of one long "
+        "conversation. Merge them into a single deduplicated list of topics for "
+        "the whole conversation."
+    ),
+    TaskType.SENSEMAKING: (
+        "The following are analyses of consecutive parts of one long "
+        "conversation. Combine them into a single analysis of the whole "
+        "conversation, connecting patterns and insights across the parts."
+    ),
+}
+
+
+def estimate_tokens(text: str, provider: Any = None) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: Text to estimate
+        provider: Provider whose calibration to apply
+
+    Returns:
+        Approximate token count
+    """
+    return get_token_estimator().estimate_text(text, provider)
+
+
+def _unit_text(unit: Union[str, Dict[str, Any]]) -> str:
+    """Get the text of a chunking unit (a paragraph or a chat message)."""
+    if isinstance(unit, str):
+        return unit
+    content = unit.get("content", "")
+    return content if isinstance(content, str) else json.dumps(content)
+
+
+def _unit_tokens(unit: Union[str, Dict[str, Any]], provider: Any = None) -> int:
+    """Estimate the tokens of a chunking unit."""
+    tokens = estimate_tokens(_unit_text(unit), provider)
+    return tokens if isinstance(unit, str) else tokens + MESSAGE_OVERHEAD_TOKENS
+
+
+def is_chunkable(content: Content) -> bool:
+    """
+    Check whether content can be split along message boundaries.
+
+    Args:
+        content: Content to check
+
+    Returns:
+        True for text, message lists and {"messages": [...]} content
+    """
+    if isinstance(content, str):
+        return True
+    if isinstance(content, dict):
+        return isinstance(content.get("messages"), list)
+    return isinstance(content, list)
+
+
+def _units(content: Content) -> List[Union[str, Dict[str, Any]]]:
+    """
+    Split content into paragraphs (text) or messages (chat content).
+
+    Chat items that are not messages become user messages holding their text,
+    as they would be sent to the provider.
+    """
+    if isinstance(content, str):
+        return [part for part in _PARAGRAPH_BREAK.split(content) if part.strip()]
+    if isinstance(content, dict):
+        return [
+            item if isinstance(item, dict) else {"role": "user", "content": str(item)}
+            for item in content["messages"]
+        ]
+    return [
+        item
+        if isinstance(item, dict) and "role" in item and "content" in item
+        else {"role": "user", "content": str(item)}
+        for item in content
+    ]
+
+
+def estimate_content_tokens(content: Content, provider: Any = None) -> int:
+    """
+    Estimate the number of tokens in chunkable content.
+
+    Args:
+        content: Text, message list or {"messages": [...]} content
+        provider: Provider whose calibration to apply
+
+    Returns:
+        Approximate token count
+    """
+    return sum(_unit_tokens(unit, provider) for unit in _units(content))
+
+
+def _split_oversized(
+    unit: Union[str, Dict[str, Any]], max_tokens: int, provider: Any = None
+) -> List[Union[str, Dict[str, Any]]]:
+    """Split a single unit that exceeds the chunk budget into smaller pieces."""
+    unit_tokens = _unit_tokens(unit, provider)
+    if unit_tokens <= max_tokens:
+        return [unit]
+
+    text = _unit_text(unit)
+    # Size the pieces by the unit's own characters-per-token ratio
+    chars_per_token = len(text) / unit_tokens if unit_tokens else CHARS_PER_TOKEN
+    overhead = 0 if isinstance(unit, str) else MESSAGE_OVERHEAD_TOKENS
+    step = max(1, int((max_tokens - overhead) * chars_per_token))
+    pieces = [text[i : i + step] for i in range(0, len(text), step)]
+    if isinstance(unit, str):
+        return pieces
+    return [{**unit, "content": piece} for piece in pieces]
+
+
+def _is_boundary(unit: Union[str, Dict[str, Any]]) -> bool:
+    """Content-defined boundary test, stable across edits elsewhere in the content."""
+    digest = hashlib.sha256(_unit_text(unit).encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % BOUNDARY_DIVISOR == 0
+
+
+def split_content(
+    content: Content, max_chunk_tokens: int, provider: Any = None
+) -> List[Content]:
+    """
+    Split content into chunks that each fit within a token budget.
+
+    Text is split on paragraph breaks and chat content on message boundaries;
+    single units larger than the budget are split further. Each chunk has the
+    same shape as the input content.
+
+    Args:
+        content: Text, message list or {"messages": [...]} content
+        max_chunk_tokens: Maximum estimated tokens per chunk
+        provider: Provider whose calibration to apply
+
+    Returns:
+        List of chunks in original order
+    """
+    chunks: List[List[Union[str, Dict[str, Any]]]] = []
+    current: List[Union[str, Dict[str, Any]]] = []
+    current_tokens = 0
+
+    for original in _units(content):
+        for unit in _split_oversized(original, max_chunk_tokens, provider):
+            tokens = _unit_tokens(unit, provider)
+            if current and current_tokens + tokens > max_chunk_tokens:
+                chunks.append(current)
+                current, current_tokens = [], 0
+
+            current.append(unit)
+            current_tokens += tokens
+
+            if current_tokens >= max_chunk_tokens * MIN_CHUNK_FILL and _is_boundary(
+                unit
+            ):
+                chunks.append(current)
+                current, current_tokens = [], 0
+
+    if current:
+        chunks.append(current)
+
+    if isinstance(content, str):
+        return ["\n\n".join(chunk) for chunk in chunks]
+    if isinstance(content, dict):
+        return [{**content, "messages": chunk} for chunk in chunks]
+    return chunks
+
+
+def group_partial_results(
+    partial_results: List[Any], max_chunk_tokens: int, provider: Any = None
+) -> List[List[Any]]:
+    """
+    Group partial results into batches whose combined size fits a token budget.
+
+    Used for hierarchical reduction when all partial results do not fit into a
+    single reduce request.
+
+    Args:
+        partial_results: Result content of each chunk, in order
+        max_chunk_tokens: Maximum estimated tokens per batch
+        provider: Provider whose calibration to apply
+
+    Returns:
+        List of batches of partial results, in order
+    """
+    batches: List[List[Any]] = []
+    current: List[Any] = []
+    current_tokens = 0
+    for result in partial_results:
+        text = result if isinstance(result, str) else json.dumps(result)
+        tokens = estimate_tokens(text, provider) + MESSAGE_OVERHEAD_TOKENS
+        if current and current_tokens + tokens > max_chunk_tokens:
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(result)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_reduce_prompt(task_type: TaskType, partial_results: List[Any]) -> str:
+    """
+    Build the content of the reduce request combining partial chunk results.
+
+    Args:
+        task_type: Task type of the original request
+        partial_results: Result content of each chunk, in order
+
+    Returns:
+        Text content for the reduce request
+    """
+    parts = [_REDUCE_INSTRUCTIONS.get(task_type, _REDUCE_INSTRUCTIONS[TaskType.SUMMARIZATION])]
+    for i, result in enumerate(partial_results, start=1):
+        text = result if isinstance(result, str) else json.dumps(result)
+        parts.append(f"## Part {i} of {len(partial_results)}\n{text}")
+    return "\n\n".join(parts)
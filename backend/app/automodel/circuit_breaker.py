@@ -0,0 +1,199 @@
+"""
+Circuit Breaker - Fast Failover Away from Failing Models and Providers
+
+This module implements the circuit breakers ModelRegistry keeps per provider
+and per model. A breaker is fed the outcome of every request:
+
+- CLOSED: requests flow normally. Too many consecutive failures, or too high
+  an error rate over the recent window, trips the breaker.
+- OPEN: the model (or provider) is skipped during routing, so requests fail
+  over immediately instead of waiting for it to time out.
+- HALF_OPEN: once the open period is over, a limited number of trial requests
+  are let through. A successful trial closes the breaker; a failed one opens
+  it again for twice as long (up to a maximum).
+
+Author: Rip Jonesy
+"""
+
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger("chatchonk.automodel.circuit_breaker")
+
+
+class CircuitState(str, Enum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker fed by request outcomes."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        error_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_requests: int = 10,
+        open_seconds: float = 30.0,
+        max_open_seconds: float = 300.0,
+        half_open_trials: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name: Name of the guarded model or provider, for logging
+            failure_threshold: Consecutive failures that trip the breaker
+            error_rate_threshold: Error rate over the recent window that trips
+                the breaker
+            window_size: Number of recent outcomes the error rate is taken over
+            min_requests: Outcomes required before the error rate is used
+            open_seconds: Time the breaker stays open after tripping
+            max_open_seconds: Upper bound of the open time after failed trials
+            half_open_trials: Concurrent trial requests allowed when half-open
+            clock: Monotonic clock, replaceable for tests
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.half_open_trials = half_open_trials
+        self._clock = clock
+
+        self._state = CircuitState.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._open_duration = open_seconds
+        self._trials_in_flight = 0
+        self._times_opened = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state; an open breaker turns half-open after its open period."""
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self._open_duration
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._trials_in_flight = 0
+            logger.info(f"Circuit for {self.name} is half-open; allowing trial requests")
+        return self._state
+
+    def available(self) -> bool:
+        """
+        Check whether a request may be sent, without reserving a trial.
+
+        Returns:
+            True if closed, or half-open with a trial slot free
+        """
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN:
+            return self._trials_in_flight < self.half_open_trials
+        return False
+
+    def acquire(self) -> bool:
+        """
+        Reserve permission to send a request.
+
+        Returns:
+            True if the request may be sent (taking a trial slot when half-open)
+        """
+        if not self.available():
+            return False
+        if self._state == CircuitState.HALF_OPEN:
+            self._trials_in_flight += 1
+        return True
+
+    def release(self) -> None:
+        """Give back a trial slot for a request that ended without an outcome."""
+        if self._state == CircuitState.HALF_OPEN and self._trials_in_flight:
+            self._trials_in_flight -= 1
+
+    def record(self, success: bool) -> None:
+        """
+        Record the outcome of a request.
+
+        Args:
+            success: Whether the request succeeded
+        """
+        state = self.state
+        if state == CircuitState.OPEN:
+            # Outcome of a request sent before the breaker tripped
+            return
+
+        if state == CircuitState.HALF_OPEN:
+            self.release()
+            if success:
+                self._close()
+            else:
+                # The trial failed: back off for longer before the next one
+                self._open(min(self._open_duration * 2, self.max_open_seconds))
+            return
+
+        self._outcomes.append(success)
+        if success:
+            self._consecutive_failures = 0
+            return
+
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.failure_threshold:
+            self._open(self.open_seconds)
+        elif len(self._outcomes) >= self.min_requests:
+            error_rate = self._outcomes.count(False) / len(self._outcomes)
+            if error_rate >= self.error_rate_threshold:
+                self._open(self.open_seconds)
+
+    def _open(self, duration: float) -> None:
+        """Trip the breaker for the given number of seconds."""
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._open_duration = duration
+        self._trials_in_flight = 0
+        self._times_opened += 1
+        logger.warning(f"Circuit for {self.name} opened for {duration:.0f}s")
+
+    def _close(self) -> None:
+        """Close the breaker and start counting afresh."""
+        self._state = CircuitState.CLOSED
+        self._outcomes.clear()
+        self._consecutive_failures = 0
+        self._open_duration = self.open_seconds
+        logger.info(f"Circuit for {self.name} closed")
+
+    def retry_after(self) -> Optional[float]:
+        """Seconds until an open breaker turns half-open, or None if not open."""
+        if self.state != CircuitState.OPEN:
+            return None
+        return max(0.0, self._opened_at + self._open_duration - self._clock())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the breaker's state and counters.
+
+        Returns:
+            Dictionary with state, recent error rate and trip count
+        """
+        outcomes = len(self._outcomes)
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._consecutive_failures,
+            "recent_error_rate": (
+                self._outcomes.count(False) / outcomes if outcomes else 0.0
+            ),
+            "times_opened": self._times_opened,
+            "retry_after": self.retry_after(),
+        }
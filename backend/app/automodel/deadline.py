@@ -0,0 +1,172 @@
+"""
+Deadline - Per-Request Time Budgets for AutoModel
+
+This module carries the deadline of the request being processed in a context
+variable, so every stage can honor the same budget without threading it
+through each call: cache lookups, health checks, routing, every candidate
+attempt, fallbacks and the provider's HTTP timeout. Tasks started while a
+deadline is active inherit it, and a nested scope can only shorten it.
+
+Author: Rip Jonesy
+"""
+
+import asyncio
+import contextvars
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+from app.automodel import DeadlineExceededError
+
+T = TypeVar("T")
+
+# Absolute deadline on the time.monotonic() clock, or None for no deadline
+_deadline: ContextVar[Optional[float]] = ContextVar(
+    "automodel_deadline", default=None
+)
+
+
+def remaining() -> Optional[float]:
+    """
+    Get the time left until the current deadline.
+
+    Returns:
+        Seconds left (negative once expired), or None without a deadline
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check(stage: str) -> None:
+    """
+    Fail fast if the current deadline has already passed.
+
+    Args:
+        stage: Name of the stage about to start, for the error message
+
+    Raises:
+        DeadlineExceededError: If no time is left
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError(f"Deadline exceeded before {stage}")
+
+
+def detached_context() -> contextvars.Context:
+    """
+    Copy the current context without its deadline.
+
+    Background work shared between requests (such as health checks) must not
+    be cut short by the deadline of whichever request happened to start it.
+
+    Returns:
+        Context to pass to ``asyncio.create_task``
+    """
+    context = contextvars.copy_context()
+    context.run(_deadline.set, None)
+    return context
+
+
+@contextmanager
+def scope(timeout: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Run a block with a deadline ``timeout`` seconds from now.
+
+    An enclosing deadline that is earlier stays in effect.
+
+    Args:
+        timeout: Time budget in seconds, or None to keep the current deadline
+
+    Yields:
+        The effective absolute deadline
+    """
+    current = _deadline.get()
+    deadline = current
+    if timeout is not None:
+        candidate = time.monotonic() + timeout
+        deadline = candidate if current is None else min(current, candidate)
+
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+@asynccontextmanager
+async def enforce(stage: str) -> AsyncIterator[None]:
+    """
+    Cancel a block that runs past the current deadline.
+
+    Args:
+        stage: Name of the stage, for the error message
+
+    Raises:
+        DeadlineExceededError: If the deadline passes before the block ends
+    """
+    check(stage)
+    left = remaining()
+    if left is None:
+        yield
+        return
+
+    timeout = asyncio.timeout(left)
+    try:
+        async with timeout:
+            yield
+    except TimeoutError as e:
+        if not timeout.expired():
+            # Raised by the block itself, not by the deadline
+            raise
+        raise DeadlineExceededError(f"Deadline exceeded during {stage}") from e
+
+
+async def wait(awaitable: Awaitable[T], stage: str) -> T:
+    """
+    Await a result within the current deadline.
+
+    Args:
+        awaitable: Coroutine or future to await
+        stage: Name of the stage, for the error message
+
+    Returns:
+        The result of the awaitable
+
+    Raises:
+        DeadlineExceededError: If the deadline passes first
+    """
+    try:
+        check(stage)
+    except DeadlineExceededError:
+        if asyncio.iscoroutine(awaitable):
+            # Never started, so close it to avoid a "never awaited" warning
+            awaitable.close()
+        raise
+
+    async with enforce(stage):
+        return await awaitable
+
+
+def http_timeout(default: Any) -> Any:
+    """
+    Get the HTTP timeout for a provider call under the current deadline.
+
+    Args:
+        default: Timeout to use without a deadline (e.g. the client default)
+
+    Returns:
+        Timeout in seconds capped by the remaining budget, or ``default``
+
+    Raises:
+        DeadlineExceededError: If no time is left for the call
+    """
+    check("provider request")
+    left = remaining()
+    if left is None:
+        return default
+    if isinstance(default, (int, float)):
+        return min(left, default)
+    return left
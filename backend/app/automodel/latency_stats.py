@@ -0,0 +1,189 @@
+"""
+Latency Statistics - Time-Decayed Performance Tracking for Routing
+
+This module keeps the recent performance of a model (or of a model on one
+task type) in a form routing can react to within seconds:
+
+- Time-decayed EWMAs of latency and error rate. Every observation's weight
+  halves after ``half_life`` seconds, so a burst of failures dominates the
+  error rate quickly regardless of how long the model was healthy before.
+- A sliding-window latency histogram with log-spaced buckets, from which
+  p50/p95/p99 are read in O(buckets) time. The window is split into slots
+  that are recycled as time moves on, so old requests drop out entirely.
+
+Author: Rip Jonesy
+"""
+
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Histogram buckets: upper bounds of 10ms * 1.2^i, up to roughly 16 minutes
+_BUCKET_BASE = 0.01
+_BUCKET_GROWTH = 1.2
+_BUCKET_COUNT = 64
+_LOG_GROWTH = math.log(_BUCKET_GROWTH)
+
+
+def _bucket(latency: float) -> int:
+    """Index of the histogram bucket a latency falls into."""
+    if latency <= _BUCKET_BASE:
+        return 0
+    index = math.ceil(math.log(latency / _BUCKET_BASE) / _LOG_GROWTH)
+    return min(_BUCKET_COUNT - 1, index)
+
+
+def _bucket_bound(index: int) -> float:
+    """Upper bound in seconds of a histogram bucket."""
+    return _BUCKET_BASE * _BUCKET_GROWTH**index
+
+
+def _percentile(counts: List[int], total: int, percentile: float) -> float:
+    """Nearest-rank percentile of a histogram, as its bucket's upper bound."""
+    rank = max(1, math.ceil(percentile / 100.0 * total))
+    seen = 0
+    for index, count in enumerate(counts):
+        seen += count
+        if seen >= rank:
+            return _bucket_bound(index)
+    return _bucket_bound(_BUCKET_COUNT - 1)
+
+
+class LatencyStats:
+    """Time-decayed EWMAs and a sliding-window histogram of request outcomes."""
+
+    PERCENTILES = (50.0, 95.0, 99.0)
+
+    def __init__(
+        self,
+        half_life: float = 15.0,
+        window_seconds: float = 60.0,
+        window_slots: int = 6,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the statistics.
+
+        Args:
+            half_life: Seconds after which an observation's EWMA weight halves
+            window_seconds: Length of the latency histogram window
+            window_slots: Number of slots the window is recycled in
+            clock: Monotonic clock, replaceable for tests
+        """
+        self._decay_rate = math.log(2) / half_life
+        self._slot_seconds = window_seconds / window_slots
+        self._clock = clock
+
+        # Decayed sums: the EWMA is the weighted sum over the total weight
+        self._updated_at = clock()
+        self._latency_sum = 0.0
+        self._latency_weight = 0.0
+        self._error_sum = 0.0
+        self._outcome_weight = 0.0
+
+        self._slot_ids: List[int] = [-1] * window_slots
+        self._slots: List[List[int]] = [[0] * _BUCKET_COUNT for _ in range(window_slots)]
+
+    def _decay(self, now: float) -> None:
+        """Age the decayed sums to the given time."""
+        elapsed = now - self._updated_at
+        if elapsed <= 0:
+            return
+        factor = math.exp(-self._decay_rate * elapsed)
+        self._latency_sum *= factor
+        self._latency_weight *= factor
+        self._error_sum *= factor
+        self._outcome_weight *= factor
+        self._updated_at = now
+
+    def record(self, latency: float, success: bool) -> None:
+        """
+        Record the outcome of a request.
+
+        Only successful requests count towards latency, since failures are
+        often fast rejections that would make a model look quicker.
+
+        Args:
+            latency: Response time in seconds
+            success: Whether the request succeeded
+        """
+        now = self._clock()
+        self._decay(now)
+        self._outcome_weight += 1.0
+        if not success:
+            self._error_sum += 1.0
+            return
+
+        self._latency_sum += latency
+        self._latency_weight += 1.0
+
+        slot_id = int(now / self._slot_seconds)
+        index = slot_id % len(self._slots)
+        slot = self._slots[index]
+        if self._slot_ids[index] != slot_id:
+            # The slot last held a window that has since expired
+            slot[:] = [0] * _BUCKET_COUNT
+            self._slot_ids[index] = slot_id
+        slot[_bucket(latency)] += 1
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Time-decayed average latency of successful requests, in seconds."""
+        if not self._latency_weight:
+            return None
+        return self._latency_sum / self._latency_weight
+
+    @property
+    def error_rate(self) -> float:
+        """Time-decayed error rate between 0 and 1."""
+        if not self._outcome_weight:
+            return 0.0
+        return self._error_sum / self._outcome_weight
+
+    def _window(self) -> List[int]:
+        """Bucket counts over the slots still inside the window."""
+        oldest = int(self._clock() / self._slot_seconds) - len(self._slots) + 1
+        counts = [0] * _BUCKET_COUNT
+        for slot_id, slot in zip(self._slot_ids, self._slots):
+            if slot_id >= oldest:
+                counts = [a + b for a, b in zip(counts, slot)]
+        return counts
+
+    def percentile(self, percentile: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Get a latency percentile over the histogram window.
+
+        Args:
+            percentile: Percentile to compute (0-100)
+            min_samples: Minimum number of samples required for a meaningful value
+
+        Returns:
+            Upper bound of the bucket holding the percentile in seconds, or None
+            if there are not enough samples in the window
+        """
+        counts = self._window()
+        total = sum(counts)
+        if not total or total < min_samples:
+            return None
+        return _percentile(counts, total, percentile)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the current statistics.
+
+        Returns:
+            Dictionary with decayed latency and error rate, the number of
+            requests in the window and p50/p95/p99 latency in seconds
+        """
+        counts = self._window()
+        total = sum(counts)
+        stats: Dict[str, Any] = {
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "window_requests": total,
+        }
+        for percentile in self.PERCENTILES:
+            stats[f"p{int(percentile)}"] = (
+                _percentile(counts, total, percentile) if total else None
+            )
+        return stats
@@ -0,0 +1,228 @@
+"""
+Media - Zero-Copy Handling of Binary Media Content
+
+This module wraps binary media (images, audio, video) for AutoModel requests
+without copying it. The data is held as a ``memoryview`` and only ever read
+in fixed-size slices: the SHA-256 digest used for cache keys is computed
+incrementally, and the base64 encoding that vision APIs expect is produced
+chunk by chunk while the request body is streamed to the provider. Peak
+memory beyond the caller's buffer therefore stays at a small multiple of the
+chunk size, regardless of the size of the media.
+
+Author: Rip Jonesy
+"""
+
+import base64
+import hashlib
+import json
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+# Bytes read per slice; a multiple of 3 so base64 chunks concatenate cleanly
+MEDIA_CHUNK_SIZE = 3 * 1024 * 1024
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def media_digest(data: BytesLike, chunk_size: int = MEDIA_CHUNK_SIZE) -> str:
+    """
+    Compute the SHA-256 digest of binary data without copying it.
+
+    Args:
+        data: Binary data
+        chunk_size: Bytes hashed per update
+
+    Returns:
+        Hex digest of the data
+    """
+    view = memoryview(data).cast("B")
+    digest = hashlib.sha256()
+    for start in range(0, len(view), chunk_size):
+        digest.update(view[start : start + chunk_size])
+    return digest.hexdigest()
+
+
+class MediaContent:
+    """
+    Binary media attached to an AutoModel request.
+
+    The media is referenced, never copied: the wrapper keeps a ``memoryview``
+    of the caller's buffer and computes its digest once, on first use.
+    """
+
+    __slots__ = ("media_type", "data", "prompt", "_digest")
+
+    def __init__(self, media_type: str, data: BytesLike, prompt: str = ""):
+        """
+        Initialize the media content.
+
+        Args:
+            media_type: MIME type of the media
+            data: Binary content of the media
+            prompt: Text prompt to guide the analysis
+        """
+        self.media_type = media_type
+        self.data = memoryview(data).cast("B")
+        self.prompt = prompt
+        self._digest: Optional[str] = None
+
+    @property
+    def size(self) -> int:
+        """Size of the media in bytes."""
+        return len(self.data)
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 digest of the media, computed on first access."""
+        if self._digest is None:
+            self._digest = media_digest(self.data)
+        return self._digest
+
+    def cache_token(self) -> str:
+        """
+        Get a short, stable identifier of the media for cache keys.
+
+        Returns:
+            MIME type, size and digest of the media
+        """
+        return f"{self.media_type}:{self.size}:sha256:{self.digest}"
+
+    def iter_base64(self, chunk_size: int = MEDIA_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Encode the media as base64, one slice at a time.
+
+        Args:
+            chunk_size: Bytes encoded per chunk (rounded down to a multiple of 3)
+
+        Yields:
+            Consecutive chunks of the base64 encoding
+        """
+        chunk_size = max(3, chunk_size - chunk_size % 3)
+        for start in range(0, len(self.data), chunk_size):
+            yield base64.b64encode(self.data[start : start + chunk_size])
+
+    def as_base64(self) -> "MediaField":
+        """Payload field holding the media as plain base64."""
+        return MediaField(self)
+
+    def as_data_url(self) -> "MediaField":
+        """Payload field holding the media as a base64 data URL."""
+        return MediaField(self, data_url=True)
+
+    def __repr__(self) -> str:
+        return f"MediaContent({self.media_type!r}, {self.size} bytes)"
+
+
+class MediaField:
+    """
+    Placeholder for base64-encoded media in a provider request payload.
+
+    The encoded media is never built as one string; ``stream_json_body``
+    splices it into the serialized payload while the body is sent.
+    """
+
+    __slots__ = ("media", "data_url", "marker")
+
+    def __init__(self, media: MediaContent, data_url: bool = False):
+        """
+        Initialize the payload field.
+
+        Args:
+            media: Media to encode
+            data_url: Whether to prefix the encoding with a data URL header
+        """
+        self.media = media
+        self.data_url = data_url
+        self.marker = f"media-{uuid.uuid4().hex}"
+
+    def iter_encoded(self) -> Iterator[bytes]:
+        """Yield the field value (without quotes) in chunks."""
+        if self.data_url:
+            yield f"data:{self.media.media_type};base64,".encode("ascii")
+        yield from self.media.iter_base64()
+
+
+def media_from_content(content: Any) -> Optional[MediaContent]:
+    """
+    Get the media of request content built by ``AutoModel.process_media``.
+
+    Args:
+        content: Request content
+
+    Returns:
+        The media, or None for text and chat content
+    """
+    if isinstance(content, dict) and isinstance(content.get("media"), MediaContent):
+        return content["media"]
+    return None
+
+
+def stream_json_body(payload: Dict[str, Any]) -> Union[bytes, AsyncIterator[bytes]]:
+    """
+    Serialize a request payload, streaming any media fields it contains.
+
+    Payloads without media are encoded in one piece. Otherwise the payload is
+    serialized with a marker in place of each media field, and the encoded
+    media is yielded between the surrounding JSON fragments.
+
+    Args:
+        payload: JSON payload, possibly containing MediaField values
+
+    Returns:
+        The encoded body, or an async iterator over its chunks
+    """
+    fields: Dict[str, MediaField] = {}
+
+    def _default(value: Any) -> Any:
+        if isinstance(value, MediaField):
+            fields[value.marker] = value
+            return value.marker
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    encoded = json.dumps(payload, default=_default).encode("utf-8")
+    if not fields:
+        return encoded
+
+    async def _chunks() -> AsyncIterator[bytes]:
+        rest = encoded
+        for marker, field in fields.items():
+            before, _, rest = rest.partition(marker.encode("ascii"))
+            yield before
+            for chunk in field.iter_encoded():
+                yield chunk
+        yield rest
+
+    return _chunks()
+
+
+def json_request_kwargs(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get httpx request arguments that send a payload as a JSON body.
+
+    Args:
+        payload: JSON payload, possibly containing MediaField values
+
+    Returns:
+        Keyword arguments for ``httpx.AsyncClient.post`` or ``stream``
+    """
+    return {
+        "content": stream_json_body(payload),
+        "headers": {"Content-Type": "application/json"},
+    }
+
+
+def media_message_parts(media: MediaContent) -> List[Dict[str, Any]]:
+    """
+    Build OpenAI-style chat content parts for media.
+
+    Args:
+        media: Media to send
+
+    Returns:
+        Content parts with the prompt text and the media as a data URL
+    """
+    parts: List[Dict[str, Any]] = []
+    if media.prompt:
+        parts.append({"type": "text", "text": media.prompt})
+    parts.append({"type": "image_url", "image_url": {"url": media.as_data_url()}})
+    return parts
@@ -0,0 +1,265 @@
+"""
+Metrics Store - Fixed-Capacity Ring Buffer for AutoModel Performance Metrics
+
+This module records one row per AutoModel request in a columnar ring buffer
+backed by typed ``array`` columns. Appends are O(1) and never reallocate,
+provider/model/task names are interned to small integer codes, and latency
+percentiles per provider/model/task are computed at most once per write
+batch and cached for readers.
+
+Author: Rip Jonesy
+"""
+
+import logging
+import math
+import time
+from array import array
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("chatchonk.automodel.metrics")
+
+# Sentinel stored in the token column when the token count is unknown
+_NO_TOKENS = -1
+
+
+class _Interner:
+    """Maps hashable labels to compact integer codes and back."""
+
+    def __init__(self):
+        self._codes: Dict[Hashable, int] = {}
+        self._labels: List[Hashable] = []
+
+    def encode(self, label: Hashable) -> int:
+        """Get the code for a label, assigning a new one if needed."""
+        code = self._codes.get(label)
+        if code is None:
+            code = len(self._labels)
+            self._codes[label] = code
+            self._labels.append(label)
+        return code
+
+    def lookup(self, label: Hashable) -> Optional[int]:
+        """Get the code for a label without assigning one."""
+        return self._codes.get(label)
+
+    def decode(self, code: int) -> Hashable:
+        """Get the label for a code."""
+        return self._labels[code]
+
+
+class MetricsRingBuffer:
+    """
+    Columnar ring buffer of per-request performance metrics.
+
+    The buffer keeps the most recent ``capacity`` rows. Each column is a
+    preallocated ``array``, so appending overwrites the oldest row in place.
+    """
+
+    PERCENTILES = (50.0, 95.0, 99.0)
+
+    def __init__(self, capacity: int = 10000):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            capacity: Maximum number of rows kept
+        """
+        self.capacity = max(1, capacity)
+
+        self._timestamps = array("d", bytes(8 * self.capacity))
+        self._latencies = array("d", bytes(8 * self.capacity))
+        self._tokens = array("q", bytes(8 * self.capacity))
+        self._success = array("b", bytes(self.capacity))
+        self._providers = array("l", bytes(array("l").itemsize * self.capacity))
+        self._models = array("l", bytes(array("l").itemsize * self.capacity))
+        self._tasks = array("l", bytes(array("l").itemsize * self.capacity))
+        self._errors: List[Optional[str]] = [None] * self.capacity
+
+        self._provider_codes = _Interner()
+        self._model_codes = _Interner()
+        self._task_codes = _Interner()
+
+        self._next = 0
+        self._size = 0
+        self._version = 0
+        self._summary_cache: Optional[Tuple[int, Dict[str, Dict[str, Any]]]] = None
+
+    def __len__(self) -> int:
+        """Number of rows currently stored."""
+        return self._size
+
+    def append(
+        self,
+        provider: Hashable,
+        model_id: str,
+        task_type: Hashable,
+        success: bool,
+        processing_time: float,
+        tokens_used: Optional[int] = None,
+        error: Optional[str] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """
+        Record a request, overwriting the oldest row when the buffer is full.
+
+        Args:
+            provider: Provider label
+            model_id: Model ID
+            task_type: Task type label
+            success: Whether the request was successful
+            processing_time: Processing time in seconds
+            tokens_used: Number of tokens used
+            error: Error message if unsuccessful
+            timestamp: Unix timestamp of the request (default: now)
+        """
+        i = self._next
+        self._timestamps[i] = time.time() if timestamp is None else timestamp
+        self._latencies[i] = processing_time
+        self._tokens[i] = _NO_TOKENS if tokens_used is None else tokens_used
+        self._success[i] = 1 if success else 0
+        self._providers[i] = self._provider_codes.encode(provider)
+        self._models[i] = self._model_codes.encode(model_id)
+        self._tasks[i] = self._task_codes.encode(task_type)
+        self._errors[i] = error
+
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self._version += 1
+
+    def _newest_first(self) -> Iterator[int]:
+        """Iterate over row indices from the newest to the oldest."""
+        for offset in range(1, self._size + 1):
+            yield (self._next - offset) % self.capacity
+
+    def query(
+        self,
+        provider: Optional[Hashable] = None,
+        model_id: Optional[str] = None,
+        task_type: Optional[Hashable] = None,
+        success: Optional[bool] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the most recent rows matching the filters, newest first.
+
+        Filters are compared on interned integer codes, and the scan stops as
+        soon as ``limit`` rows have been found.
+
+        Args:
+            provider: Filter by provider
+            model_id: Filter by model ID
+            task_type: Filter by task type
+            success: Filter by success status
+            limit: Maximum number of rows to return
+
+        Returns:
+            List of row dictionaries
+        """
+        filters = []
+        for column, interner, value in (
+            (self._providers, self._provider_codes, provider),
+            (self._models, self._model_codes, model_id),
+            (self._tasks, self._task_codes, task_type),
+        ):
+            if value is None:
+                continue
+            code = interner.lookup(value)
+            if code is None:
+                # Never recorded, so nothing can match
+                return []
+            filters.append((column, code))
+        if success is not None:
+            filters.append((self._success, 1 if success else 0))
+
+        rows = []
+        for i in self._newest_first():
+            if len(rows) >= limit:
+                break
+            if all(column[i] == code for column, code in filters):
+                rows.append(self._row(i))
+        return rows
+
+    def _row(self, i: int) -> Dict[str, Any]:
+        """Materialize a single row."""
+        tokens = self._tokens[i]
+        return {
+            "provider": self._provider_codes.decode(self._providers[i]),
+            "model_id": self._model_codes.decode(self._models[i]),
+            "task_type": self._task_codes.decode(self._tasks[i]),
+            "success": bool(self._success[i]),
+            "processing_time": self._latencies[i],
+            "tokens_used": None if tokens == _NO_TOKENS else tokens,
+            "error": self._errors[i],
+            "timestamp": self._timestamps[i],
+        }
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], percentile: float) -> float:
+        """Nearest-rank percentile of an already sorted list."""
+        rank = max(1, math.ceil(percentile / 100.0 * len(sorted_values)))
+        return sorted_values[rank - 1]
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get request counts and latency percentiles per provider/model/task.
+
+        The result is cached until the next append, so frequent readers do
+        not re-aggregate the buffer.
+
+        Returns:
+            Dictionary keyed by "provider/model_id/task_type" with counts,
+            error rate, token totals and p50/p95/p99 latency of successful
+            requests
+        """
+        if self._summary_cache and self._summary_cache[0] == self._version:
+            return self._summary_cache[1]
+
+        groups: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+        for i in range(self._size):
+            key = (self._providers[i], self._models[i], self._tasks[i])
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {"latencies": [], "failed": 0, "tokens": 0}
+            if self._success[i]:
+                group["latencies"].append(self._latencies[i])
+            else:
+                group["failed"] += 1
+            if self._tokens[i] != _NO_TOKENS:
+                group["tokens"] += self._tokens[i]
+
+        summary = {}
+        for (provider, model, task), group in groups.items():
+            latencies = sorted(group["latencies"])
+            total = len(latencies) + group["failed"]
+            provider_label = self._provider_codes.decode(provider)
+            task_label = self._task_codes.decode(task)
+            model_label = self._model_codes.decode(model)
+            entry = {
+                "provider": provider_label,
+                "model_id": model_label,
+                "task_type": task_label,
+                "requests": total,
+                "failed": group["failed"],
+                "error_rate": group["failed"] / total,
+                "tokens_used": group["tokens"],
+            }
+            for percentile in self.PERCENTILES:
+                entry[f"p{int(percentile)}"] = (
+                    self._percentile(latencies, percentile) if latencies else None
+                )
+            summary[f"{_label(provider_label)}/{model_label}/{_label(task_label)}"] = entry
+
+        self._summary_cache = (self._version, summary)
+        return summary
+
+    def clear(self) -> None:
+        """Drop all rows."""
+        self._next = 0
+        self._size = 0
+        self._errors = [None] * self.capacity
+        self._version += 1
+
+
+def _label(value: Hashable) -> str:
+    """Render an enum or plain label as a string."""
+    return str(getattr(value, "value", value))
@@ -5,14 +5,40 @@ This module manages all AI providers and models in the AutoModel system.
 It handles provider initialization, model discovery, health monitoring,
 and intelligent model selection for tasks.
 
+Providers are initialized concurrently at startup, each with its own timeout.
+Startup only waits a few seconds for them; slower providers finish in the
+background and become routable when they are ready. Lazy providers are not
+initialized until a request needs them.
+
+Provider health is monitored in the background, never on the request path.
+It is derived passively from the outcome of real requests; only providers
+without recent traffic are probed, using a free endpoint of their API.
+
+Request outcomes also feed a circuit breaker per provider and per model.
+Models behind an open circuit are left out of routing until trial requests
+show they have recovered.
+
+Model selection uses time-decayed latency and error rates, and windowed
+latency percentiles, per model and task type, so a model that degrades is
+demoted within seconds rather than after its lifetime averages catch up.
+
 Author: Rip Jonesy
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from app.automodel import TaskType, ProviderType, ModelPriority
+from app.automodel import (
+    TaskType,
+    ProviderType,
+    ModelPriority,
+    deadline,
+)
+from app.automodel.capability_index import CapabilityIndex
+from app.automodel.circuit_breaker import CircuitBreaker, CircuitState
+from app.automodel.latency_stats import LatencyStats
 from app.automodel.providers import (
     BaseProvider,
     Model,
@@ -48,31 +74,87 @@ class ModelRegistry:
             config: Configuration dictionary with provider settings
         """
         self.config = config or {}
+        # Initialized providers, and configured ones not (yet) initialized
         self._providers: Dict[ProviderType, BaseProvider] = {}
+        self._configured: Dict[ProviderType, BaseProvider] = {}
+        self._init_tasks: Dict[ProviderType, asyncio.Task] = {}
         self._models: Dict[str, Model] = {}
         self._provider_health: Dict[ProviderType, bool] = {}
         self._last_health_check: Dict[ProviderType, datetime] = {}
+        self._provider_circuits: Dict[ProviderType, CircuitBreaker] = {}
+        self._model_circuits: Dict[str, CircuitBreaker] = {}
+        self._monitor_task: Optional[asyncio.Task] = None
         self._performance_metrics: Dict[str, Dict[str, Any]] = {}
+        # Models by task type, capability and provider health, kept up to date
+        # as models are registered and health changes
+        self._index = CapabilityIndex()
+        # Advances on every recorded request outcome
+        self.metrics_epoch = 0
+        # Recent performance per (model ID, task type); task type None is the
+        # model across all tasks
+        self._latency_stats: Dict[Tuple[str, Optional[TaskType]], LatencyStats] = {}
         self._is_initialized = False
 
-        # Health check interval (5 minutes)
+        # Health check interval (5 minutes): providers without traffic for this
+        # long are probed. Unhealthy providers are probed more often so they
+        # can recover quickly
         self.health_check_interval = timedelta(minutes=5)
+        self.recovery_probe_interval = timedelta(seconds=30)
+        self.monitor_interval = 10.0  # seconds between monitor passes
+
+        # Circuit breaker settings (CircuitBreaker keyword arguments)
+        self.circuit_config: Dict[str, Any] = dict(self.config.get("circuit_breaker", {}))
+
+        # Seconds after which a request's weight in the latency and error rate
+        # averages halves, and the window latency percentiles are taken over
+        self.latency_half_life = self.config.get("latency_half_life", 15.0)
+        self.latency_window = self.config.get("latency_window", 60.0)
+
+        # Decayed error rate above which a model is demoted behind healthy ones
+        self.degraded_error_rate = 0.25
+
+        # Seconds startup waits for providers, and the limit for each provider's
+        # initialization (which continues in the background after startup)
+        self.startup_timeout = self.config.get("startup_timeout", 5.0)
+        self.provider_init_timeout = self.config.get("provider_init_timeout", 30.0)
+
+        # Providers initialized on first use rather than at startup. OpenRouter
+        # fetches its whole model catalog and is in no default fallback chain
+        self.lazy_providers: Set[ProviderType] = {
+            ProviderType(getattr(provider, "value", provider))
+            for provider in self.config.get("lazy_providers", [ProviderType.OPENROUTER])
+        }
 
     async def initialize(self) -> None:
-        """Initialize all configured providers and load their models."""
+        """
+        Initialize the configured providers and load their models.
+
+        Eager providers are initialized concurrently. This returns once they
+        are all ready or ``startup_timeout`` has passed, whichever is first;
+        providers still initializing then finish in the background.
+        """
         if self._is_initialized:
             return
 
         logger.info("Initializing ModelRegistry...")
 
-        # Initialize providers based on configuration
-        await self._initialize_providers()
+        # Create provider instances based on configuration
+        self._create_providers()
 
-        # Load models from all providers
-        await self._load_all_models()
+        # Initialize eager providers concurrently
+        tasks = [
+            self._start_provider(provider_type)
+            for provider_type in self._configured
+            if provider_type not in self.lazy_providers
+        ]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self.startup_timeout)
+            if pending:
+                logger.info(
+                    f"{len(pending)} providers are still initializing in the background"
+                )
 
-        # Perform initial health checks
-        await self._perform_health_checks()
+        self.start_health_monitor()
 
         self._is_initialized = True
         logger.info(
@@ -80,8 +162,8 @@ class ModelRegistry:
             f"and {len(self._models)} models"
         )
 
-    async def _initialize_providers(self) -> None:
-        """Initialize all configured providers."""
+    def _create_providers(self) -> None:
+        """Create an instance of every provider that has an API key."""
         provider_configs = {
             ProviderType.OPENAI: (OpenAIProvider, self.config.get("openai", {})),
             ProviderType.ANTHROPIC: (
@@ -105,66 +187,163 @@ class ModelRegistry:
             provider_class,
             provider_config,
         ) in provider_configs.items():
+            # Skip if no API key provided
+            if not provider_config.get("api_key"):
+                logger.warning(
+                    f"No API key provided for {provider_type}, "
+                    "skipping initialization"
+                )
+                continue
+
             try:
-                # Skip if no API key provided
-                if not provider_config.get("api_key"):
-                    logger.warning(
-                        f"No API key provided for {provider_type}, "
-                        "skipping initialization"
-                    )
-                    continue
-
-                # Initialize provider
-                provider = provider_class(**provider_config)
-                await provider.initialize()
+                self._configured[provider_type] = provider_class(**provider_config)
+            except Exception as e:
+                logger.error(f"Failed to create {provider_type} provider: {str(e)}")
+                self._set_provider_health(provider_type, False)
 
-                self._providers[provider_type] = provider
-                self._provider_health[provider_type] = True
+    def _start_provider(self, provider_type: ProviderType) -> Optional[asyncio.Task]:
+        """
+        Start initializing a configured provider in the background.
 
-                logger.info(f"Initialized {provider.name} provider")
+        Args:
+            provider_type: Provider to initialize
 
-            except Exception as e:
-                logger.error(f"Failed to initialize {provider_type} provider: {str(e)}")
-                self._provider_health[provider_type] = False
+        Returns:
+            The initialization task (an already running one is reused), or None
+            if the last attempt failed less than a health check interval ago
+        """
+        task = self._init_tasks.get(provider_type)
+        if task is not None and not task.done():
+            return task
+
+        last_attempt = self._last_health_check.get(provider_type)
+        if (
+            task is not None
+            and last_attempt
+            and datetime.now() - last_attempt <= self.health_check_interval
+        ):
+            return None
 
-    async def _load_all_models(self) -> None:
-        """Load models from all initialized providers."""
-        for provider_type, provider in self._providers.items():
-            try:
-                models = provider.get_models()
-                for model in models:
-                    self._models[model.id] = model
-                    # Initialize performance metrics
-                    self._performance_metrics[model.id] = {
-                        "total_requests": 0,
-                        "successful_requests": 0,
-                        "failed_requests": 0,
-                        "average_response_time": 0.0,
-                        "last_used": None,
-                        "error_rate": 0.0,
-                    }
-
-                logger.info(f"Loaded {len(models)} models from {provider.name}")
+        # Shared by every request waiting for the provider, so no request's
+        # deadline may cut it short
+        task = asyncio.create_task(
+            self._initialize_provider(provider_type),
+            context=deadline.detached_context(),
+        )
+        self._init_tasks[provider_type] = task
+        return task
 
-            except Exception as e:
-                logger.error(f"Failed to load models from {provider_type}: {str(e)}")
+    async def _initialize_provider(self, provider_type: ProviderType) -> bool:
+        """
+        Initialize a configured provider and register its models.
 
-    async def _perform_health_checks(self) -> None:
-        """Perform health checks on all providers."""
-        for provider_type, provider in self._providers.items():
-            try:
-                is_healthy = await provider.health_check()
-                self._provider_health[provider_type] = is_healthy
-                self._last_health_check[provider_type] = datetime.now()
+        Args:
+            provider_type: Provider to initialize
 
-                if not is_healthy:
-                    logger.warning(
-                        f"Health check failed for {provider.name}: {provider.last_error}"
-                    )
+        Returns:
+            True if the provider is ready
+        """
+        provider = self._configured[provider_type]
+        try:
+            async with asyncio.timeout(self.provider_init_timeout):
+                await provider.initialize()
+        except Exception as e:
+            logger.error(
+                f"Failed to initialize {provider_type} provider: "
+                f"{str(e) or type(e).__name__}"
+            )
+            self._set_provider_health(provider_type, False)
+            self._last_health_check[provider_type] = datetime.now()
+            return False
+
+        self._providers[provider_type] = provider
+        self._register_models(provider)
+        self._set_provider_health(provider_type, True)
+        # A successful initialization counts as the first health check
+        self._last_health_check[provider_type] = datetime.now()
+
+        logger.info(f"Initialized {provider.name} provider")
+        return True
+
+    async def ensure_provider(
+        self, provider_type: ProviderType
+    ) -> Optional[BaseProvider]:
+        """
+        Get a provider, initializing it first if it has not been used yet.
 
-            except Exception as e:
-                logger.error(f"Health check error for {provider_type}: {str(e)}")
-                self._provider_health[provider_type] = False
+        Args:
+            provider_type: Type of provider to retrieve
+
+        Returns:
+            Provider instance or None if it is not configured or failed to
+            initialize
+        """
+        provider = self._providers.get(provider_type)
+        if provider or provider_type not in self._configured:
+            return provider
+
+        task = self._start_provider(provider_type)
+        if task is not None:
+            await deadline.wait(
+                asyncio.shield(task), f"initialization of {provider_type.value}"
+            )
+        return self._providers.get(provider_type)
+
+    async def ensure_all_providers(self) -> bool:
+        """
+        Initialize every configured provider that is not ready yet.
+
+        Used when the ready providers cannot serve a request, so lazy
+        providers get a chance before it fails.
+
+        Returns:
+            True if any provider became ready
+        """
+        tasks = [
+            task
+            for task in (
+                self._start_provider(provider_type)
+                for provider_type in self._configured
+                if provider_type not in self._providers
+            )
+            if task is not None
+        ]
+        if not tasks:
+            return False
+
+        results = await deadline.wait(
+            asyncio.shield(asyncio.gather(*tasks)), "provider initialization"
+        )
+        return any(results)
+
+    async def _load_all_models(self) -> None:
+        """Load models from all initialized providers."""
+        for provider in self._providers.values():
+            self._register_models(provider)
+
+    def _register_models(self, provider: BaseProvider) -> None:
+        """Register the models of an initialized provider."""
+        try:
+            models = provider.get_models()
+            for model in models:
+                self._models[model.id] = model
+                self._index.add(model)
+                # Initialize performance metrics
+                self._performance_metrics[model.id] = {
+                    "total_requests": 0,
+                    "successful_requests": 0,
+                    "failed_requests": 0,
+                    "average_response_time": 0.0,
+                    "last_used": None,
+                    "error_rate": 0.0,
+                }
+
+            logger.info(f"Loaded {len(models)} models from {provider.name}")
+
+        except Exception as e:
+            logger.error(
+                f"Failed to load models from {provider.provider_type}: {str(e)}"
+            )
 
     def get_model(self, model_id: str) -> Optional[Model]:
         """
@@ -178,27 +357,33 @@ class ModelRegistry:
         """
         return self._models.get(model_id)
 
-    def get_models_for_task(self, task_type: TaskType) -> List[Model]:
+    def get_models_for_task(
+        self,
+        task_type: TaskType,
+        excluded_providers: Optional[Set[ProviderType]] = None,
+        requirements: Optional[Dict[str, Any]] = None,
+        check_circuits: bool = True,
+    ) -> List[Model]:
         """
         Get all models that support a specific task type.
 
+        Candidates come from the capability index, so the cost does not grow
+        with the number of registered models that cannot run the task.
+
         Args:
             task_type: Task type to find models for
+            excluded_providers: Providers to exclude
+            requirements: Model requirements (min_max_tokens, supports_vision,
+                supports_functions, supports_streaming, max_cost_per_1k_tokens)
+            check_circuits: Whether to leave out models behind an open circuit
 
         Returns:
-            List of models that support the task
+            List of available models of healthy providers that support the task
         """
-        suitable_models = []
-
-        for model in self._models.values():
-            if (
-                task_type in model.supported_tasks
-                and model.is_available
-                and self._provider_health.get(model.provider, False)
-            ):
-                suitable_models.append(model)
-
-        return suitable_models
+        models = self._index.candidates(task_type, excluded_providers, requirements)
+        if not check_circuits:
+            return models
+        return [model for model in models if self.is_circuit_closed(model)]
 
     def get_best_model_for_task(
         self,
@@ -217,38 +402,16 @@ class ModelRegistry:
         Returns:
             Best model for the task or None if no suitable model found
         """
-        exclude_providers = exclude_providers or set()
-        suitable_models = []
-
-        for model in self._models.values():
-            if (
-                task_type in model.supported_tasks
-                and model.is_available
-                and model.provider not in exclude_providers
-                and self._provider_health.get(model.provider, False)
-            ):
-                suitable_models.append(model)
-
+        suitable_models = self.get_models_for_task(task_type, exclude_providers)
         if not suitable_models:
             return None
 
         # Sort models by multiple criteria
         def model_score(model: Model) -> float:
-            base_score = model.priority_score
-
-            # Adjust score based on performance metrics
-            metrics = self._performance_metrics.get(model.id, {})
-            error_rate = metrics.get("error_rate", 0.0)
-            avg_response_time = metrics.get("average_response_time", 0.0)
-
-            # Penalize high error rates
-            if error_rate > 0.1:  # More than 10% error rate
-                base_score *= 1.0 - error_rate
-
-            # Slightly favor faster models
-            if avg_response_time > 0:
-                time_penalty = min(avg_response_time / 10.0, 0.2)  # Max 20% penalty
-                base_score *= 1.0 - time_penalty
+            # Adjust score based on recent performance
+            base_score = model.priority_score * self.get_performance_factor(
+                model.id, task_type
+            )
 
             # Adjust based on priority requirements
             if priority == ModelPriority.HIGH and model.priority_score < 8.0:
@@ -262,6 +425,35 @@ class ModelRegistry:
         suitable_models.sort(key=model_score, reverse=True)
         return suitable_models[0]
 
+    def set_model_available(self, model_id: str, available: bool) -> None:
+        """
+        Mark a model as available or unavailable for routing.
+
+        Args:
+            model_id: ID of the model
+            available: Whether the model can be routed to
+        """
+        model = self._models.get(model_id)
+        if model is None:
+            return
+        model.is_available = available
+        self._index.set_model_available(model_id, available)
+
+    @property
+    def routing_epoch(self) -> int:
+        """
+        Version of the model set routing chooses from.
+
+        Changes when models are registered or when the availability of a model
+        or the health of a provider changes.
+        """
+        return self._index.version
+
+    def _set_provider_health(self, provider_type: ProviderType, healthy: bool) -> None:
+        """Record a provider's health and update the capability index."""
+        self._provider_health[provider_type] = healthy
+        self._index.set_provider_health(provider_type, healthy)
+
     def get_provider(self, provider_type: ProviderType) -> Optional[BaseProvider]:
         """
         Get a provider by its type.
@@ -293,63 +485,266 @@ class ModelRegistry:
         success: bool,
         response_time: float,
         error: Optional[str] = None,
+        task_type: Optional[TaskType] = None,
     ) -> None:
         """
         Update performance metrics for a model.
 
+        The outcome also counts as a health check of the model's provider and
+        feeds the circuit breakers of the model and the provider.
+
         Args:
             model_id: ID of the model
             success: Whether the request was successful
             response_time: Response time in seconds
             error: Error message if request failed
+            task_type: Task type of the request, for per-task statistics
         """
         if model_id not in self._performance_metrics:
             return
 
+        provider_type = self._models[model_id].provider
+        self._last_health_check[provider_type] = datetime.now()
+        self._provider_circuit(provider_type).record(success)
+        self._model_circuit(model_id).record(success)
+
+        self.metrics_epoch += 1
+
         metrics = self._performance_metrics[model_id]
         metrics["total_requests"] += 1
         metrics["last_used"] = datetime.now()
 
         if success:
             metrics["successful_requests"] += 1
-            # Update average response time
-            current_avg = metrics["average_response_time"]
-            total_successful = metrics["successful_requests"]
-            metrics["average_response_time"] = (
-                current_avg * (total_successful - 1) + response_time
-            ) / total_successful
         else:
             metrics["failed_requests"] += 1
             if error:
                 logger.warning(f"Model {model_id} error: {error}")
 
-        # Update error rate
-        total_requests = metrics["total_requests"]
-        failed_requests = metrics["failed_requests"]
-        metrics["error_rate"] = (
-            failed_requests / total_requests if total_requests > 0 else 0.0
+        keys = [(model_id, None)]
+        if task_type is not None:
+            keys.append((model_id, task_type))
+        for key in keys:
+            stats = self._latency_stats.get(key)
+            if stats is None:
+                stats = self._latency_stats[key] = LatencyStats(
+                    half_life=self.latency_half_life, window_seconds=self.latency_window
+                )
+            stats.record(response_time, success)
+
+        # Report the decayed averages of the model across all tasks
+        stats = self._latency_stats[(model_id, None)]
+        metrics["average_response_time"] = stats.latency or 0.0
+        metrics["error_rate"] = stats.error_rate
+
+    def get_latency_stats(
+        self, model_id: str, task_type: Optional[TaskType] = None
+    ) -> Optional[LatencyStats]:
+        """
+        Get the recent performance of a model.
+
+        Args:
+            model_id: ID of the model
+            task_type: Task type to get statistics for. Falls back to the model
+                across all tasks when it has no requests for this task yet
+
+        Returns:
+            Latency statistics, or None if the model has served no requests
+        """
+        if task_type is not None:
+            stats = self._latency_stats.get((model_id, task_type))
+            if stats is not None:
+                return stats
+        return self._latency_stats.get((model_id, None))
+
+    def get_performance_factor(
+        self, model_id: str, task_type: Optional[TaskType] = None
+    ) -> float:
+        """
+        Get the factor a model's priority score is scaled by for its recent performance.
+
+        Args:
+            model_id: ID of the model
+            task_type: Task type the model is ranked for
+
+        Returns:
+            Factor between 0 and 1, where 1 means no penalty
+        """
+        stats = self.get_latency_stats(model_id, task_type)
+        if stats is None:
+            return 1.0
+
+        factor = 1.0
+
+        # Penalize high error rates
+        error_rate = stats.error_rate
+        if error_rate > 0.1:  # More than 10% error rate
+            factor *= 1.0 - error_rate
+
+        # Slightly favor faster models, judged by their tail latency when known
+        latency = stats.percentile(95, min_samples=10) or stats.latency
+        if latency:
+            factor *= 1.0 - min(latency / 10.0, 0.2)  # Max 20% penalty
+
+        return factor
+
+    def is_degraded(self, model_id: str, task_type: Optional[TaskType] = None) -> bool:
+        """
+        Check whether a model's recent error rate is high enough to demote it.
+
+        Args:
+            model_id: ID of the model
+            task_type: Task type the model is ranked for
+
+        Returns:
+            True if the decayed error rate exceeds the degraded threshold
+        """
+        stats = self.get_latency_stats(model_id, task_type)
+        return stats is not None and stats.error_rate > self.degraded_error_rate
+
+    def get_latency_percentile(
+        self,
+        model_id: str,
+        percentile: float,
+        min_samples: int = 10,
+        task_type: Optional[TaskType] = None,
+    ) -> Optional[float]:
+        """
+        Get a percentile of a model's recent successful response times.
+
+        Args:
+            model_id: ID of the model
+            percentile: Percentile to compute (0-100)
+            min_samples: Minimum number of samples required for a meaningful value
+            task_type: Task type to get the percentile for
+
+        Returns:
+            Response time in seconds, or None if there are not enough samples
+            in the latency window
+        """
+        stats = self.get_latency_stats(model_id, task_type)
+        if stats is None:
+            return None
+        return stats.percentile(percentile, min_samples=min_samples)
+
+    def _provider_circuit(self, provider_type: ProviderType) -> CircuitBreaker:
+        """Get the circuit breaker of a provider, creating it on first use."""
+        circuit = self._provider_circuits.get(provider_type)
+        if circuit is None:
+            circuit = self._provider_circuits[provider_type] = CircuitBreaker(
+                f"provider {provider_type.value}", **self.circuit_config
+            )
+        return circuit
+
+    def _model_circuit(self, model_id: str) -> CircuitBreaker:
+        """Get the circuit breaker of a model, creating it on first use."""
+        circuit = self._model_circuits.get(model_id)
+        if circuit is None:
+            circuit = self._model_circuits[model_id] = CircuitBreaker(
+                f"model {model_id}", **self.circuit_config
+            )
+        return circuit
+
+    def is_circuit_closed(self, model: Model) -> bool:
+        """
+        Check whether requests may be routed to a model.
+
+        Args:
+            model: Model to check
+
+        Returns:
+            True unless the circuit of the model or its provider is open (or
+            half-open with every trial slot taken)
+        """
+        return (
+            self._provider_circuit(model.provider).available()
+            and self._model_circuit(model.id).available()
         )
 
-    async def health_check_if_needed(self) -> None:
-        """Perform health checks if enough time has passed since the last check."""
-        now = datetime.now()
+    def acquire_model(self, model: Model) -> bool:
+        """
+        Reserve permission to send a request to a model.
 
-        for provider_type, provider in self._providers.items():
-            last_check = self._last_health_check.get(provider_type)
+        When a circuit is half-open this takes one of its trial slots. Every
+        successful acquire must be followed by update_model_metrics() or, if
+        the request ends without an outcome, release_model().
+
+        Args:
+            model: Model the request goes to
+
+        Returns:
+            True if the request may be sent
+        """
+        if not self.is_circuit_closed(model):
+            return False
+        self._provider_circuit(model.provider).acquire()
+        self._model_circuit(model.id).acquire()
+        return True
+
+    def release_model(self, model: Model) -> None:
+        """
+        Release a model acquired for a request that ended without an outcome.
+
+        Args:
+            model: Model the request went to
+        """
+        self._provider_circuit(model.provider).release()
+        self._model_circuit(model.id).release()
+
+    def start_health_monitor(self) -> None:
+        """
+        Start the background health monitor unless it is already running.
 
-            if not last_check or now - last_check > self.health_check_interval:
+        This never waits for any health check, so it is safe to call from the
+        request path.
+        """
+        if self._monitor_task is not None and not self._monitor_task.done():
+            return
 
-                try:
-                    is_healthy = await provider.health_check()
-                    self._provider_health[provider_type] = is_healthy
-                    self._last_health_check[provider_type] = now
+        # Not tied to the request (or deadline) that happened to start it
+        self._monitor_task = asyncio.create_task(
+            self._monitor_health(), context=deadline.detached_context()
+        )
 
-                    if not is_healthy:
-                        logger.warning(f"Health check failed for {provider.name}")
+    async def _monitor_health(self) -> None:
+        """Probe idle providers periodically for as long as the registry runs."""
+        while True:
+            try:
+                await self._probe_idle_providers()
+            except Exception as e:
+                logger.error(f"Health monitor error: {str(e)}")
+            await asyncio.sleep(self.monitor_interval)
 
-                except Exception as e:
-                    logger.error(f"Health check error for {provider_type}: {str(e)}")
-                    self._provider_health[provider_type] = False
+    async def _probe_idle_providers(self) -> None:
+        """Probe the providers without a recent request or probe, concurrently."""
+        now = datetime.now()
+        idle = []
+        for provider_type in self._providers:
+            interval = (
+                self.health_check_interval
+                if self._provider_health.get(provider_type, False)
+                else self.recovery_probe_interval
+            )
+            last_check = self._last_health_check.get(provider_type)
+            if not last_check or now - last_check > interval:
+                idle.append(provider_type)
+
+        async def probe(provider_type: ProviderType) -> None:
+            provider = self._providers[provider_type]
+            try:
+                is_healthy = await provider.probe()
+            except Exception as e:
+                logger.error(f"Health probe error for {provider_type}: {str(e)}")
+                is_healthy = False
+
+            self._last_health_check[provider_type] = datetime.now()
+            if not is_healthy and self._provider_health.get(provider_type, False):
+                logger.warning(
+                    f"Health probe failed for {provider.name}: {provider.last_error}"
+                )
+            self._set_provider_health(provider_type, is_healthy)
+
+        await asyncio.gather(*(probe(provider_type) for provider_type in idle))
 
     def get_registry_stats(self) -> Dict[str, Any]:
         """
@@ -373,14 +768,35 @@ class ModelRegistry:
                 "healthy": self._provider_health.get(provider_type, False),
                 "models": len(models),
                 "last_health_check": self._last_health_check.get(provider_type),
+                "circuit": self._provider_circuit(provider_type).get_stats(),
             }
 
+        open_circuits = {
+            model_id: circuit.get_stats()
+            for model_id, circuit in self._model_circuits.items()
+            if circuit.state != CircuitState.CLOSED
+        }
+
+        pending_providers = {}
+        for provider_type in self._configured:
+            if provider_type in self._providers:
+                continue
+            task = self._init_tasks.get(provider_type)
+            if task is None:
+                pending_providers[provider_type.value] = "lazy"
+            elif not task.done():
+                pending_providers[provider_type.value] = "initializing"
+            else:
+                pending_providers[provider_type.value] = "failed"
+
         return {
             "total_providers": len(self._providers),
+            "pending_providers": pending_providers,
             "healthy_providers": sum(self._provider_health.values()),
             "total_models": total_models,
             "available_models": available_models,
             "providers": provider_stats,
+            "open_circuits": open_circuits,
             "initialized": self._is_initialized,
         }
 
@@ -388,7 +804,15 @@ class ModelRegistry:
         """Shutdown all providers and clean up resources."""
         logger.info("Shutting down ModelRegistry...")
 
-        for provider in self._providers.values():
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            self._monitor_task = None
+
+        for task in self._init_tasks.values():
+            task.cancel()
+        self._init_tasks.clear()
+
+        for provider in self._configured.values():
             try:
                 if hasattr(provider, "__aexit__"):
                     await provider.__aexit__(None, None, None)
@@ -396,7 +820,10 @@ class ModelRegistry:
                 logger.error(f"Error shutting down provider: {str(e)}")
 
         self._providers.clear()
+        self._configured.clear()
         self._models.clear()
         self._provider_health.clear()
         self._performance_metrics.clear()
+        self._index.clear()
+        self._latency_stats.clear()
         self._is_initialized = False
@@ -8,7 +8,7 @@ to provide a consistent API for AI processing.
 Author: Rip Jonesy
 """
 
-from .base import BaseProvider, ProviderResponse, Model
+from .base import BaseProvider, ProviderResponse, Model, StreamChunk
 from .huggingface import HuggingFaceProvider
 from .openai import OpenAIProvider
 from .anthropic import AnthropicProvider
@@ -21,6 +21,7 @@ __all__ = [
     "BaseProvider",
     "ProviderResponse",
     "Model",
+    "StreamChunk",
     "HuggingFaceProvider",
     "OpenAIProvider",
     "AnthropicProvider",
@@ -8,12 +8,14 @@ Author: Rip Jonesy
 """
 
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 
 import httpx
 
 from app.automodel import TaskType, ProviderType
-from .base import BaseProvider, Model, ProviderResponse
+from app.automodel.media import json_request_kwargs, media_from_content
+from app.core.token_estimator import get_token_estimator
+from .base import BaseProvider, Model, ProviderResponse, StreamChunk
 
 logger = logging.getLogger("chatchonk.automodel.providers.anthropic")
 
@@ -21,6 +23,13 @@ logger = logging.getLogger("chatchonk.automodel.providers.anthropic")
 class AnthropicProvider(BaseProvider):
     """Anthropic Claude provider implementation for the AutoModel system."""
 
+    # The API is versioned in the path
+    probe_path = "/v1/models"
+
+    # Shortest prompt prefix Claude will cache; shorter breakpoints are ignored
+    PROMPT_CACHE_MIN_TOKENS = 1024
+    PROMPT_CACHE_MIN_TOKENS_HAIKU = 2048
+
     def __init__(self, api_key: Optional[str] = None, **kwargs):
         """
         Initialize the Anthropic provider.
@@ -215,6 +224,50 @@ class AnthropicProvider(BaseProvider):
             self._set_error(f"Processing failed: {str(e)}")
             raise
 
+    async def stream(
+        self,
+        task_type: TaskType,
+        model_id: str,
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        top_p: float = 0.95,
+        frequency_penalty: float = 0.0,
+        presence_penalty: float = 0.0,
+        stop_sequences: Optional[List[str]] = None,
+        session_context: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> AsyncIterator[StreamChunk]:
+        """Stream content using Anthropic Claude models."""
+        if not self._is_initialized:
+            await self.initialize()
+
+        model = self.get_model(model_id)
+        if not model:
+            raise ValueError(f"Model {model_id} not found")
+
+        if not self.supports_task(model_id, task_type):
+            raise ValueError(f"Model {model_id} does not support task {task_type}")
+
+        payload = self._build_message_payload(
+            model_id,
+            task_type,
+            content,
+            max_tokens,
+            temperature,
+            top_p,
+            stop_sequences,
+            session_context,
+        )
+        payload["stream"] = True
+
+        try:
+            async for chunk in self._stream_message(model_id, payload):
+                yield chunk
+        except Exception as e:
+            self._set_error(f"Streaming failed: {str(e)}")
+            raise
+
     async def _process_message(
         self,
         model_id: str,
@@ -228,25 +281,22 @@ class AnthropicProvider(BaseProvider):
         **kwargs,
     ) -> ProviderResponse:
         """Process message requests using Claude's messages API."""
-        # Prepare messages and system prompt
-        messages, system_prompt = self._prepare_messages(
-            task_type, content, session_context
+        payload = self._build_message_payload(
+            model_id,
+            task_type,
+            content,
+            max_tokens,
+            temperature,
+            top_p,
+            stop_sequences,
+            session_context,
         )
 
-        payload = {
-            "model": model_id,
-            "messages": messages,
-            "max_tokens": max_tokens or 4096,
-            "temperature": temperature,
-            "top_p": top_p,
-        }
-
-        if system_prompt:
-            payload["system"] = system_prompt
-        if stop_sequences:
-            payload["stop_sequences"] = stop_sequences
-
-        response = await self._client.post("/v1/messages", json=payload)
+        response = await self._client.post(
+            "/v1/messages",
+            timeout=self._request_timeout(),
+            **json_request_kwargs(payload),
+        )
         response.raise_for_status()
 
         result = response.json()
@@ -258,20 +308,117 @@ class AnthropicProvider(BaseProvider):
         else:
             message_content = ""
 
-        tokens_used = result.get("usage", {}).get("output_tokens", 0) + result.get(
-            "usage", {}
-        ).get("input_tokens", 0)
+        usage_metadata = self._usage_metadata(result.get("usage", {}))
         finish_reason = result.get("stop_reason", "completed")
 
         return ProviderResponse(
             content=message_content,
             model_id=model_id,
-            tokens_used=tokens_used,
+            tokens_used=usage_metadata["prompt_tokens"]
+            + usage_metadata["output_tokens"],
             finish_reason=finish_reason,
-            metadata={
-                "input_tokens": result.get("usage", {}).get("input_tokens", 0),
-                "output_tokens": result.get("usage", {}).get("output_tokens", 0),
-            },
+            metadata=usage_metadata,
+        )
+
+    @staticmethod
+    def _usage_metadata(usage: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build response metadata from Claude's usage, including prompt caching.
+
+        Claude reports cache reads and writes separately from ``input_tokens``,
+        so the total prompt size is the sum of all three.
+
+        Args:
+            usage: The "usage" object of a Claude response
+
+        Returns:
+            Metadata with input, output, prompt and cached token counts
+        """
+        input_tokens = usage.get("input_tokens", 0) or 0
+        cache_creation = usage.get("cache_creation_input_tokens", 0) or 0
+        cache_read = usage.get("cache_read_input_tokens", 0) or 0
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": usage.get("output_tokens", 0) or 0,
+            "prompt_tokens": input_tokens + cache_creation + cache_read,
+            "cache_creation_input_tokens": cache_creation,
+            "cache_read_input_tokens": cache_read,
+            "cached_tokens": cache_read,
+        }
+
+    def _build_message_payload(
+        self,
+        model_id: str,
+        task_type: TaskType,
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        max_tokens: Optional[int],
+        temperature: float,
+        top_p: float,
+        stop_sequences: Optional[List[str]],
+        session_context: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Build the messages API payload shared by regular and streaming requests."""
+        # Prepare messages and system prompt
+        messages, system_prompt, history_end = self._prepare_messages(
+            task_type, content, session_context
+        )
+        system = self._add_cache_breakpoints(
+            model_id, messages, system_prompt, history_end
+        )
+
+        payload = {
+            "model": model_id,
+            "messages": messages,
+            "max_tokens": max_tokens or 4096,
+            "temperature": temperature,
+            "top_p": top_p,
+        }
+
+        if system:
+            payload["system"] = system
+        if stop_sequences:
+            payload["stop_sequences"] = stop_sequences
+
+        return payload
+
+    async def _stream_message(
+        self, model_id: str, payload: Dict[str, Any]
+    ) -> AsyncIterator[StreamChunk]:
+        """Stream message requests using Claude's server-sent events."""
+        usage: Dict[str, Any] = {}
+        finish_reason = None
+
+        async with self._client.stream(
+            "POST",
+            "/v1/messages",
+            timeout=self._request_timeout(),
+            **json_request_kwargs(payload),
+        ) as response:
+            response.raise_for_status()
+            async for event in self._iter_sse_data(response):
+                event_type = event.get("type")
+                if event_type == "message_start":
+                    usage = dict(event.get("message", {}).get("usage", {}))
+                elif event_type == "content_block_delta":
+                    delta = event.get("delta", {})
+                    if delta.get("type") == "text_delta" and delta.get("text"):
+                        yield StreamChunk(content=delta["text"], model_id=model_id)
+                elif event_type == "message_delta":
+                    finish_reason = event.get("delta", {}).get("stop_reason")
+                    usage.update(event.get("usage", {}))
+                elif event_type == "error":
+                    error = event.get("error", {})
+                    raise RuntimeError(
+                        f"{error.get('type', 'error')}: {error.get('message', '')}"
+                    )
+
+        usage_metadata = self._usage_metadata(usage)
+        yield StreamChunk(
+            model_id=model_id,
+            finish_reason=finish_reason or "completed",
+            tokens_used=usage_metadata["prompt_tokens"]
+            + usage_metadata["output_tokens"],
+            metadata=usage_metadata,
         )
 
     def _prepare_messages(
@@ -279,8 +426,14 @@ class AnthropicProvider(BaseProvider):
         task_type: TaskType,
         content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
         session_context: Optional[Dict[str, Any]],
-    ) -> tuple[List[Dict[str, Any]], Optional[str]]:
-        """Prepare messages for Claude's message format."""
+    ) -> tuple[List[Dict[str, Any]], Optional[str], int]:
+        """
+        Prepare messages for Claude's message format.
+
+        Returns:
+            Tuple of the messages, the system prompt and the number of leading
+            messages that consist only of session history
+        """
         messages = []
         system_prompt = self._get_system_prompt(task_type)
 
@@ -290,14 +443,35 @@ class AnthropicProvider(BaseProvider):
             for msg in session_context["messages"]:
                 if msg.get("role") != "system":
                     messages.append(msg)
+        history_count = len(messages)
 
         # Add current content
-        if isinstance(content, str):
+        media = media_from_content(content)
+        if media:
+            blocks = [
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": media.media_type,
+                        "data": media.as_base64(),
+                    },
+                }
+            ]
+            if media.prompt:
+                blocks.append({"type": "text", "text": media.prompt})
+            messages.append({"role": "user", "content": blocks})
+        elif isinstance(content, str):
             messages.append({"role": "user", "content": content})
         elif isinstance(content, dict) and "messages" in content:
             for msg in content["messages"]:
                 if msg.get("role") != "system":
                     messages.append(msg)
+                else:
+                    # System messages (e.g. from templates) go in the system parameter
+                    system_prompt = "\n\n".join(
+                        filter(None, [system_prompt, msg.get("content")])
+                    )
         elif isinstance(content, list):
             for item in content:
                 if isinstance(item, dict) and "role" in item and "content" in item:
@@ -311,26 +485,106 @@ class AnthropicProvider(BaseProvider):
         # Ensure messages alternate between user and assistant
         cleaned_messages = []
         last_role = None
+        history_end = 0
 
-        for msg in messages:
+        for i, msg in enumerate(messages):
             role = msg.get("role")
-            if role == last_role:
+            if role == last_role and cleaned_messages:
                 # Merge consecutive messages from the same role
-                if cleaned_messages:
-                    cleaned_messages[-1]["content"] += "\n\n" + msg["content"]
+                previous = cleaned_messages[-1]
+                if isinstance(previous["content"], str) and isinstance(
+                    msg["content"], str
+                ):
+                    previous["content"] += "\n\n" + msg["content"]
                 else:
-                    cleaned_messages.append(msg)
+                    previous["content"] = self._content_blocks(
+                        previous["content"]
+                    ) + self._content_blocks(msg["content"])
+                if i >= history_count and history_end == len(cleaned_messages):
+                    # New content merged into the last history message
+                    history_end -= 1
             else:
-                cleaned_messages.append(msg)
+                # Copy so merging never modifies the stored session context
+                cleaned_messages.append(dict(msg))
                 last_role = role
+            if i < history_count:
+                history_end = len(cleaned_messages)
 
         # Ensure the conversation starts with a user message
         if cleaned_messages and cleaned_messages[0].get("role") != "user":
             cleaned_messages.insert(
                 0, {"role": "user", "content": "Please help me with the following:"}
             )
+            if history_end:
+                history_end += 1
+
+        return cleaned_messages, system_prompt, history_end
+
+    @staticmethod
+    def _content_blocks(
+        content: Union[str, List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Convert message content to a list of content blocks."""
+        if isinstance(content, str):
+            return [{"type": "text", "text": content}]
+        return list(content)
 
-        return cleaned_messages, system_prompt
+    def _add_cache_breakpoints(
+        self,
+        model_id: str,
+        messages: List[Dict[str, Any]],
+        system_prompt: Optional[str],
+        history_end: int,
+    ) -> Optional[Union[str, List[Dict[str, Any]]]]:
+        """
+        Mark the stable prompt prefix for Claude's prompt caching.
+
+        The system prompt (task and template instructions) and the session
+        history are identical across the turns of a session, so a cache
+        breakpoint is placed after each of them once the prefix is long enough
+        to be cached. Messages are modified in place.
+
+        Args:
+            model_id: Model the request is sent to
+            messages: Prepared messages
+            system_prompt: Prepared system prompt
+            history_end: Number of leading messages that are session history
+
+        Returns:
+            System parameter for the payload, as text or as cacheable blocks
+        """
+        min_tokens = (
+            self.PROMPT_CACHE_MIN_TOKENS_HAIKU
+            if "haiku" in model_id
+            else self.PROMPT_CACHE_MIN_TOKENS
+        )
+        estimator = get_token_estimator()
+        prefix_tokens = estimator.estimate_text(
+            system_prompt or "", ProviderType.ANTHROPIC
+        )
+
+        system: Optional[Union[str, List[Dict[str, Any]]]] = system_prompt
+        if system_prompt and prefix_tokens >= min_tokens:
+            system = [
+                {
+                    "type": "text",
+                    "text": system_prompt,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+
+        if history_end:
+            prefix_tokens += estimator.estimate_messages(
+                messages[:history_end], ProviderType.ANTHROPIC
+            )
+            if prefix_tokens >= min_tokens:
+                last = messages[history_end - 1]
+                blocks = [dict(block) for block in self._content_blocks(last["content"])]
+                if blocks:
+                    blocks[-1]["cache_control"] = {"type": "ephemeral"}
+                    last["content"] = blocks
+
+        return system
 
     def _get_system_prompt(self, task_type: TaskType) -> Optional[str]:
         """Get system prompt for specific task types."""
@@ -8,16 +8,26 @@ AI processing across different providers.
 Author: Rip Jonesy
 """
 
+import json
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Set, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Union
 
+import httpx
 from pydantic import BaseModel, Field
 
-from app.automodel import TaskType, ProviderType
+from app.automodel import TaskType, ProviderType, deadline
+from app.automodel.media import (
+    json_request_kwargs,
+    media_from_content,
+    media_message_parts,
+)
 
 logger = logging.getLogger("chatchonk.automodel.providers")
 
+# Timeout in seconds for health probes
+PROBE_TIMEOUT = 10.0
+
 
 class Model(BaseModel):
     """Represents an AI model with its capabilities and metadata."""
@@ -77,6 +87,26 @@ class ProviderResponse(BaseModel):
     )
 
 
+class StreamChunk(BaseModel):
+    """Incremental piece of a streamed provider response."""
+
+    content: str = Field(
+        default="", description="Text generated since the previous chunk"
+    )
+    model_id: str = Field(
+        ..., description="ID of the model that generated the response"
+    )
+    finish_reason: Optional[str] = Field(
+        None, description="Reason why generation finished (final chunk only)"
+    )
+    tokens_used: Optional[int] = Field(
+        None, description="Number of tokens used in processing (final chunk only)"
+    )
+    metadata: Dict[str, Any] = Field(
+        default_factory=dict, description="Additional chunk metadata"
+    )
+
+
 class BaseProvider(ABC):
     """
     Abstract base class for all AI providers.
@@ -86,6 +116,10 @@ class BaseProvider(ABC):
     error handling, and rate limiting.
     """
 
+    # Free endpoint requested by probe(), relative to the API base URL (or
+    # absolute), or None if the provider has no such endpoint
+    probe_path: Optional[str] = "/models"
+
     def __init__(self, api_key: Optional[str] = None, **kwargs):
         """
         Initialize the provider.
@@ -160,6 +194,240 @@ class BaseProvider(ABC):
         """
         pass
 
+    async def stream(
+        self,
+        task_type: TaskType,
+        model_id: str,
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        top_p: float = 0.95,
+        frequency_penalty: float = 0.0,
+        presence_penalty: float = 0.0,
+        stop_sequences: Optional[List[str]] = None,
+        session_context: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream content generated by the specified model.
+
+        Providers with a streaming API override this method. The default
+        implementation runs a regular request and yields the full result as a
+        single final chunk, so every provider can be used with streaming callers.
+
+        Args:
+            Same as process()
+
+        Yields:
+            StreamChunk objects; the last chunk carries finish_reason and usage
+        """
+        response = await self.process(
+            task_type=task_type,
+            model_id=model_id,
+            content=content,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            frequency_penalty=frequency_penalty,
+            presence_penalty=presence_penalty,
+            stop_sequences=stop_sequences,
+            session_context=session_context,
+            **kwargs,
+        )
+        yield StreamChunk(
+            content=(
+                response.content
+                if isinstance(response.content, str)
+                else json.dumps(response.content)
+            ),
+            model_id=response.model_id,
+            finish_reason=response.finish_reason or "completed",
+            tokens_used=response.tokens_used,
+            metadata=response.metadata,
+        )
+
+    def _content_messages(
+        self, content: Union[str, Dict[str, Any], List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Normalize request content into a list of chat messages."""
+        media = media_from_content(content)
+        if media:
+            return [{"role": "user", "content": media_message_parts(media)}]
+        if isinstance(content, str):
+            return [{"role": "user", "content": content}]
+        if isinstance(content, dict) and "messages" in content:
+            return list(content["messages"])
+        if isinstance(content, list):
+            return [
+                item
+                if isinstance(item, dict) and "role" in item and "content" in item
+                else {"role": "user", "content": str(item)}
+                for item in content
+            ]
+        return [{"role": "user", "content": str(content)}]
+
+    def _layout_chat_messages(
+        self,
+        system_prompt: Optional[str],
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        session_context: Optional[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Build chat messages in a stable, prefix-cache friendly order.
+
+        Provider prompt caches reuse the longest identical prefix of a prompt,
+        so the parts that change least come first: the task system prompt,
+        then template instructions (leading system messages in the content),
+        then the session history, and finally the new content.
+
+        Args:
+            system_prompt: Task system prompt of the provider
+            content: Content to process
+            session_context: Context from previous interactions
+
+        Returns:
+            List of chat messages
+        """
+        instructions = (
+            [{"role": "system", "content": system_prompt}] if system_prompt else []
+        )
+        new_messages: List[Dict[str, Any]] = []
+        for message in self._content_messages(content):
+            if message.get("role") == "system" and not new_messages:
+                instructions.append(message)
+            else:
+                new_messages.append(message)
+
+        history = (
+            list(session_context["messages"])
+            if session_context and "messages" in session_context
+            else []
+        )
+        return instructions + history + new_messages
+
+    def prompt_messages(
+        self,
+        task_type: TaskType,
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        session_context: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the chat messages a request is sent as, for sizing its prompt.
+
+        Covers everything the provider bills as prompt tokens: the task system
+        prompt, template instructions, session history and the new content.
+
+        Args:
+            task_type: Type of task
+            content: Content to process
+            session_context: Context from previous interactions
+
+        Returns:
+            List of chat messages
+        """
+        get_system_prompt = getattr(self, "_get_system_prompt", None)
+        system_prompt = get_system_prompt(task_type) if get_system_prompt else None
+        return self._layout_chat_messages(system_prompt, content, session_context)
+
+    def _request_timeout(self) -> Any:
+        """
+        Get the HTTP timeout for a request, capped by the request's deadline.
+
+        Returns:
+            Timeout for the httpx call; the client default when no deadline is set
+
+        Raises:
+            DeadlineExceededError: If the deadline has already passed
+        """
+        return deadline.http_timeout(
+            getattr(self, "timeout", None) or httpx.USE_CLIENT_DEFAULT
+        )
+
+    @staticmethod
+    def _chat_usage_metadata(usage: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract prompt and prompt-cache token counts from OpenAI-style usage.
+
+        Args:
+            usage: The "usage" object of a chat completion response
+
+        Returns:
+            Metadata with "prompt_tokens" and "cached_tokens"
+        """
+        cached_tokens = (usage.get("prompt_tokens_details") or {}).get(
+            "cached_tokens"
+        )
+        if cached_tokens is None:
+            # DeepSeek reports cache hits separately
+            cached_tokens = usage.get("prompt_cache_hit_tokens", 0)
+        return {
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "cached_tokens": cached_tokens or 0,
+        }
+
+    async def _iter_sse_data(self, response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Parse a Server-Sent Events response body into decoded JSON payloads.
+
+        Args:
+            response: Streaming httpx response
+
+        Yields:
+            The decoded JSON payload of each "data:" line, until "[DONE]"
+        """
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if not data:
+                continue
+            if data == "[DONE]":
+                return
+            try:
+                yield json.loads(data)
+            except json.JSONDecodeError:
+                logger.warning(f"{self.name} sent an undecodable stream event")
+
+    async def _stream_chat_completion(
+        self, model_id: str, payload: Dict[str, Any]
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream a request against an OpenAI-compatible /chat/completions API.
+
+        Args:
+            model_id: ID of the model to use
+            payload: Chat completion payload with "stream" enabled
+
+        Yields:
+            A chunk per content delta, then a final chunk with finish reason and usage
+        """
+        finish_reason = None
+        usage: Dict[str, Any] = {}
+
+        async with self._client.stream(
+            "POST",
+            "/chat/completions",
+            timeout=self._request_timeout(),
+            **json_request_kwargs(payload),
+        ) as response:
+            response.raise_for_status()
+            async for event in self._iter_sse_data(response):
+                if event.get("usage"):
+                    usage = event["usage"]
+                for choice in event.get("choices") or []:
+                    if choice.get("finish_reason"):
+                        finish_reason = choice["finish_reason"]
+                    delta = (choice.get("delta") or {}).get("content")
+                    if delta:
+                        yield StreamChunk(content=delta, model_id=model_id)
+
+        yield StreamChunk(
+            model_id=model_id,
+            finish_reason=finish_reason or "completed",
+            tokens_used=usage.get("total_tokens"),
+            metadata=self._chat_usage_metadata(usage),
+        )
+
     def get_model(self, model_id: str) -> Optional[Model]:
         """
         Get a model by its ID.
@@ -244,10 +512,41 @@ class BaseProvider(ABC):
         """Clear the last error for this provider."""
         self._last_error = None
 
+    async def probe(self) -> bool:
+        """
+        Check the provider's health without a billed request.
+
+        Requests the free ``probe_path`` endpoint (usually the model list),
+        which verifies both reachability and the API key. Without such an
+        endpoint only the provider's own state is checked.
+
+        Returns:
+            True if the provider is healthy, False otherwise
+        """
+        if not self.is_available:
+            return False
+
+        client = getattr(self, "_client", None)
+        if not self.probe_path or client is None:
+            return True
+
+        try:
+            response = await client.get(self.probe_path, timeout=PROBE_TIMEOUT)
+            response.raise_for_status()
+        except Exception as e:
+            self._set_error(f"Health probe failed: {str(e)}")
+            return False
+
+        self._clear_error()
+        return True
+
     async def health_check(self) -> bool:
         """
         Perform a health check on the provider.
 
+        This sends a minimal completion request, which is billed; background
+        health monitoring uses probe() instead.
+
         Returns:
             True if the provider is healthy, False otherwise
         """
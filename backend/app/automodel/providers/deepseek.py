@@ -8,12 +8,13 @@ Author: Rip Jonesy
 """
 
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 
 import httpx
 
 from app.automodel import TaskType, ProviderType
-from .base import BaseProvider, Model, ProviderResponse
+from app.automodel.media import json_request_kwargs
+from .base import BaseProvider, Model, ProviderResponse, StreamChunk
 
 logger = logging.getLogger("chatchonk.automodel.providers.deepseek")
 
@@ -169,6 +170,53 @@ class DeepseekProvider(BaseProvider):
             self._set_error(f"Processing failed: {str(e)}")
             raise
 
+    async def stream(
+        self,
+        task_type: TaskType,
+        model_id: str,
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        top_p: float = 0.95,
+        frequency_penalty: float = 0.0,
+        presence_penalty: float = 0.0,
+        stop_sequences: Optional[List[str]] = None,
+        session_context: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> AsyncIterator[StreamChunk]:
+        """Stream content using DeepSeek models."""
+        if not self._is_initialized:
+            await self.initialize()
+
+        model = self.get_model(model_id)
+        if not model:
+            raise ValueError(f"Model {model_id} not found")
+
+        if not self.supports_task(model_id, task_type):
+            raise ValueError(f"Model {model_id} does not support task {task_type}")
+
+        payload = self._build_chat_payload(
+            model_id,
+            task_type,
+            content,
+            max_tokens,
+            temperature,
+            top_p,
+            frequency_penalty,
+            presence_penalty,
+            stop_sequences,
+            session_context,
+        )
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
+
+        try:
+            async for chunk in self._stream_chat_completion(model_id, payload):
+                yield chunk
+        except Exception as e:
+            self._set_error(f"Streaming failed: {str(e)}")
+            raise
+
     async def _process_chat_completion(
         self,
         model_id: str,
@@ -184,6 +232,54 @@ class DeepseekProvider(BaseProvider):
         **kwargs,
     ) -> ProviderResponse:
         """Process chat completion requests."""
+        payload = self._build_chat_payload(
+            model_id,
+            task_type,
+            content,
+            max_tokens,
+            temperature,
+            top_p,
+            frequency_penalty,
+            presence_penalty,
+            stop_sequences,
+            session_context,
+        )
+
+        response = await self._client.post(
+            "/chat/completions",
+            timeout=self._request_timeout(),
+            **json_request_kwargs(payload),
+        )
+        response.raise_for_status()
+
+        result = response.json()
+        choice = result["choices"][0]
+        message_content = choice["message"]["content"]
+        tokens_used = result["usage"]["total_tokens"]
+        finish_reason = choice["finish_reason"]
+
+        return ProviderResponse(
+            content=message_content,
+            model_id=model_id,
+            tokens_used=tokens_used,
+            finish_reason=finish_reason,
+            metadata=self._chat_usage_metadata(result["usage"]),
+        )
+
+    def _build_chat_payload(
+        self,
+        model_id: str,
+        task_type: TaskType,
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        max_tokens: Optional[int],
+        temperature: float,
+        top_p: float,
+        frequency_penalty: float,
+        presence_penalty: float,
+        stop_sequences: Optional[List[str]],
+        session_context: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Build the chat completion payload shared by regular and streaming requests."""
         # Convert content to messages format
         messages = self._prepare_messages(task_type, content, session_context)
 
@@ -201,22 +297,7 @@ class DeepseekProvider(BaseProvider):
         if stop_sequences:
             payload["stop"] = stop_sequences
 
-        response = await self._client.post("/chat/completions", json=payload)
-        response.raise_for_status()
-
-        result = response.json()
-        choice = result["choices"][0]
-        message_content = choice["message"]["content"]
-        tokens_used = result["usage"]["total_tokens"]
-        finish_reason = choice["finish_reason"]
-
-        return ProviderResponse(
-            content=message_content,
-            model_id=model_id,
-            tokens_used=tokens_used,
-            finish_reason=finish_reason,
-            metadata={"prompt_tokens": result["usage"]["prompt_tokens"]},
-        )
+        return payload
 
     def _prepare_messages(
         self,
@@ -225,30 +306,11 @@ class DeepseekProvider(BaseProvider):
         session_context: Optional[Dict[str, Any]],
     ) -> List[Dict[str, str]]:
         """Prepare messages for DeepSeek chat completion format."""
-        messages = []
-
-        # Add system message based on task type
-        system_prompt = self._get_system_prompt(task_type)
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-
-        # Add session context if available
-        if session_context and "messages" in session_context:
-            messages.extend(session_context["messages"])
-
-        # Add current content
-        if isinstance(content, str):
-            messages.append({"role": "user", "content": content})
-        elif isinstance(content, dict) and "messages" in content:
-            messages.extend(content["messages"])
-        elif isinstance(content, list):
-            for item in content:
-                if isinstance(item, dict) and "role" in item and "content" in item:
-                    messages.append(item)
-                else:
-                    messages.append({"role": "user", "content": str(item)})
-        else:
-            messages.append({"role": "user", "content": str(content)})
+        # System prompt, template instructions, history, then new content, so
+        # the provider's automatic prefix cache can reuse the shared prefix
+        messages = self._layout_chat_messages(
+            self._get_system_prompt(task_type), content, session_context
+        )
 
         return messages
 
@@ -21,6 +21,9 @@ logger = logging.getLogger("chatchonk.automodel.providers.huggingface")
 class HuggingFaceProvider(BaseProvider):
     """HuggingFace provider implementation for the AutoModel system."""
 
+    # The Inference API has no model list; the Hub's whoami verifies the token
+    probe_path = "https://huggingface.co/api/whoami-v2"
+
     def __init__(self, api_key: Optional[str] = None, **kwargs):
         """
         Initialize the HuggingFace provider.
@@ -232,7 +235,9 @@ class HuggingFaceProvider(BaseProvider):
 
         payload = {"inputs": inputs}
 
-        response = await self._client.post(f"/models/{model_id}", json=payload)
+        response = await self._client.post(
+            f"/models/{model_id}", json=payload, timeout=self._request_timeout()
+        )
         response.raise_for_status()
 
         result = response.json()
@@ -273,7 +278,9 @@ class HuggingFaceProvider(BaseProvider):
             # Regular classification
             payload = {"inputs": content}
 
-        response = await self._client.post(f"/models/{model_id}", json=payload)
+        response = await self._client.post(
+            f"/models/{model_id}", json=payload, timeout=self._request_timeout()
+        )
         response.raise_for_status()
 
         result = response.json()
@@ -299,7 +306,9 @@ class HuggingFaceProvider(BaseProvider):
         if max_tokens:
             payload["parameters"]["max_length"] = max_tokens
 
-        response = await self._client.post(f"/models/{model_id}", json=payload)
+        response = await self._client.post(
+            f"/models/{model_id}", json=payload, timeout=self._request_timeout()
+        )
         response.raise_for_status()
 
         result = response.json()
@@ -330,7 +339,9 @@ class HuggingFaceProvider(BaseProvider):
         if max_tokens:
             payload["parameters"]["max_new_tokens"] = max_tokens
 
-        response = await self._client.post(f"/models/{model_id}", json=payload)
+        response = await self._client.post(
+            f"/models/{model_id}", json=payload, timeout=self._request_timeout()
+        )
         response.raise_for_status()
 
         result = response.json()
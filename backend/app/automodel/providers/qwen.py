@@ -21,6 +21,9 @@ logger = logging.getLogger("chatchonk.automodel.providers.qwen")
 class QwenProvider(BaseProvider):
     """Qwen provider implementation for the AutoModel system."""
 
+    # DashScope's native API has no free endpoint to probe
+    probe_path = None
+
     def __init__(self, api_key: Optional[str] = None, **kwargs):
         """
         Initialize the Qwen provider.
@@ -223,7 +226,9 @@ class QwenProvider(BaseProvider):
             payload["parameters"]["stop"] = stop_sequences
 
         response = await self._client.post(
-            "/services/aigc/text-generation/generation", json=payload
+            "/services/aigc/text-generation/generation",
+            json=payload,
+            timeout=self._request_timeout(),
         )
         response.raise_for_status()
 
@@ -246,6 +251,9 @@ class QwenProvider(BaseProvider):
             metadata={
                 "input_tokens": usage.get("input_tokens", 0),
                 "output_tokens": usage.get("output_tokens", 0),
+                "cached_tokens": (usage.get("prompt_tokens_details") or {}).get(
+                    "cached_tokens", 0
+                ),
             },
         )
 
@@ -256,30 +264,11 @@ class QwenProvider(BaseProvider):
         session_context: Optional[Dict[str, Any]],
     ) -> Dict[str, Any]:
         """Prepare input for Qwen's generation format."""
-        messages = []
-
-        # Add system message based on task type
-        system_prompt = self._get_system_prompt(task_type)
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-
-        # Add session context if available
-        if session_context and "messages" in session_context:
-            messages.extend(session_context["messages"])
-
-        # Add current content
-        if isinstance(content, str):
-            messages.append({"role": "user", "content": content})
-        elif isinstance(content, dict) and "messages" in content:
-            messages.extend(content["messages"])
-        elif isinstance(content, list):
-            for item in content:
-                if isinstance(item, dict) and "role" in item and "content" in item:
-                    messages.append(item)
-                else:
-                    messages.append({"role": "user", "content": str(item)})
-        else:
-            messages.append({"role": "user", "content": str(content)})
+        # System prompt, template instructions, history, then new content, so
+        # the provider's automatic prefix cache can reuse the shared prefix
+        messages = self._layout_chat_messages(
+            self._get_system_prompt(task_type), content, session_context
+        )
 
         return {"messages": messages}
 
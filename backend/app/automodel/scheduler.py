@@ -0,0 +1,298 @@
+"""
+Scheduler - Priority- and Tenant-Aware Admission to Provider Capacity
+
+This module sits between AutoModel and the providers and decides which
+waiting request gets the next free slot of a provider's concurrency limit.
+
+- Requests are served strictly by priority: a waiting CRITICAL request always
+  goes before HIGH, HIGH before MEDIUM, and so on.
+- Within a priority level, capacity is shared between tenants (users) with
+  weighted fair queuing. Each tenant's share is weighted by its subscription
+  tier, so a single tenant with a large batch cannot starve the others.
+- Part of each provider's capacity is reserved for HIGH and CRITICAL
+  requests, so interactive calls keep low latency even when batch work has
+  filled everything else.
+
+Queue times are recorded per provider and priority.
+
+Author: Rip Jonesy
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from app.automodel import ModelPriority
+from app.models.mswap_models import UserTier
+
+logger = logging.getLogger("chatchonk.automodel.scheduler")
+
+# Share of capacity each tier gets relative to FREE when tenants compete
+TIER_WEIGHTS: Dict[UserTier, float] = {
+    UserTier.FREE: 1.0,
+    UserTier.LILBEAN: 2.0,
+    UserTier.CLAWBACK: 3.0,
+    UserTier.BIGCHONK: 4.0,
+    UserTier.MEOWTRIX: 6.0,
+}
+
+# Priorities allowed to use the capacity reserved for interactive calls
+INTERACTIVE_PRIORITIES = (ModelPriority.HIGH, ModelPriority.CRITICAL)
+
+# Number of recent queue times kept per provider and priority
+QUEUE_TIME_WINDOW = 1000
+
+
+class _Waiter:
+    """A request waiting for a provider slot."""
+
+    __slots__ = ("future", "priority", "enqueued_at")
+
+    def __init__(self, future: asyncio.Future, priority: ModelPriority):
+        self.future = future
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+
+
+class _ProviderQueue:
+    """Slots and waiting requests of a single provider."""
+
+    def __init__(self, capacity: int, reserved: int):
+        self.capacity = capacity
+        self.reserved = reserved
+        self.active = 0
+        self.active_by_priority: Dict[ModelPriority, int] = {}
+        # One heap of (finish tag, sequence, waiter) per priority level
+        self.heaps: Dict[ModelPriority, List[Tuple[float, int, _Waiter]]] = {
+            priority: [] for priority in ModelPriority
+        }
+        # Live waiters per priority (heaps may still hold cancelled ones)
+        self.waiting: Dict[ModelPriority, int] = {
+            priority: 0 for priority in ModelPriority
+        }
+        self.virtual_time = 0.0
+        self.tenant_finish: Dict[str, float] = {}
+        self.queue_times: Dict[ModelPriority, Deque[float]] = {}
+
+    def has_room(self, priority: ModelPriority) -> bool:
+        """Check whether a request of the given priority may start now."""
+        if self.active >= self.capacity:
+            return False
+        if priority in INTERACTIVE_PRIORITIES:
+            return True
+        return self.active < self.capacity - self.reserved
+
+    def waiting_at_or_above(self, priority: ModelPriority) -> bool:
+        """Check whether requests of equal or higher priority are waiting."""
+        return any(
+            count for level, count in self.waiting.items() if level >= priority
+        )
+
+
+class RequestScheduler:
+    """
+    Admission control for provider calls.
+
+    Use ``slot()`` around a provider call; it returns once the request may run
+    and releases the slot when the call finishes.
+    """
+
+    def __init__(
+        self,
+        default_capacity: int = 32,
+        provider_capacity: Optional[Dict[Any, int]] = None,
+        interactive_reserve: float = 0.25,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            default_capacity: Concurrent calls allowed per provider
+            provider_capacity: Optional per-provider overrides of the capacity
+            interactive_reserve: Share of each provider's capacity that only
+                HIGH and CRITICAL requests may use
+        """
+        self.default_capacity = default_capacity
+        self.provider_capacity = {
+            getattr(provider, "value", provider): capacity
+            for provider, capacity in (provider_capacity or {}).items()
+        }
+        self.interactive_reserve = interactive_reserve
+        self._queues: Dict[str, _ProviderQueue] = {}
+        self._sequence = itertools.count()
+
+    def _queue(self, provider: Any) -> _ProviderQueue:
+        """Get the queue of a provider, creating it on first use."""
+        key = getattr(provider, "value", provider)
+        queue = self._queues.get(key)
+        if queue is None:
+            capacity = max(1, self.provider_capacity.get(key, self.default_capacity))
+            reserved = (
+                int(capacity * self.interactive_reserve) if capacity > 1 else 0
+            )
+            queue = self._queues[key] = _ProviderQueue(capacity, reserved)
+        return queue
+
+    @staticmethod
+    def _tenant(user_id: Optional[str], user_tier: Optional[UserTier]) -> str:
+        """Get the fair-queuing tenant of a request."""
+        if user_id:
+            return f"user:{user_id}"
+        return f"tier:{getattr(user_tier, 'value', user_tier) or 'anonymous'}"
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        provider: Any,
+        priority: ModelPriority = ModelPriority.MEDIUM,
+        user_id: Optional[str] = None,
+        user_tier: Optional[UserTier] = None,
+    ) -> AsyncIterator[float]:
+        """
+        Hold a slot of a provider's capacity for the duration of a call.
+
+        Args:
+            provider: Provider the call goes to
+            priority: Priority of the request
+            user_id: ID of the user the request is made for
+            user_tier: Subscription tier of the user
+
+        Yields:
+            Time in seconds the request waited in the queue
+        """
+        queue = self._queue(provider)
+        priority = ModelPriority(priority)
+        queue_time = await self._acquire(queue, priority, user_id, user_tier)
+        try:
+            yield queue_time
+        finally:
+            self._release(queue, priority)
+
+    async def _acquire(
+        self,
+        queue: _ProviderQueue,
+        priority: ModelPriority,
+        user_id: Optional[str],
+        user_tier: Optional[UserTier],
+    ) -> float:
+        """Wait for a slot and return the queue time."""
+        if queue.has_room(priority) and not queue.waiting_at_or_above(priority):
+            self._start(queue, priority, 0.0)
+            return 0.0
+
+        # Weighted fair queuing: a tenant's requests are spaced 1/weight apart
+        # in virtual time, so heavier tiers get proportionally more turns
+        tenant = self._tenant(user_id, user_tier)
+        weight = TIER_WEIGHTS.get(user_tier, TIER_WEIGHTS[UserTier.FREE])
+        start_tag = max(queue.virtual_time, queue.tenant_finish.get(tenant, 0.0))
+        finish_tag = start_tag + 1.0 / weight
+        queue.tenant_finish[tenant] = finish_tag
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority)
+        heapq.heappush(
+            queue.heaps[priority], (finish_tag, next(self._sequence), waiter)
+        )
+        queue.waiting[priority] += 1
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.cancelled():
+                # Cancelled while queued; the heap entry is dropped lazily
+                queue.waiting[priority] -= 1
+            else:
+                # The slot was granted just as the caller gave up
+                self._release(queue, priority)
+            raise
+
+    def _start(
+        self, queue: _ProviderQueue, priority: ModelPriority, queue_time: float
+    ) -> None:
+        """Account for a request that starts running."""
+        queue.active += 1
+        queue.active_by_priority[priority] = (
+            queue.active_by_priority.get(priority, 0) + 1
+        )
+        times = queue.queue_times.get(priority)
+        if times is None:
+            times = queue.queue_times[priority] = deque(maxlen=QUEUE_TIME_WINDOW)
+        times.append(queue_time)
+
+    def _release(self, queue: _ProviderQueue, priority: ModelPriority) -> None:
+        """Free a slot and hand free capacity to the next waiting requests."""
+        queue.active -= 1
+        queue.active_by_priority[priority] -= 1
+        self._dispatch(queue)
+
+    def _dispatch(self, queue: _ProviderQueue) -> None:
+        """Start waiting requests, highest priority first, while there is room."""
+        for priority in sorted(ModelPriority, reverse=True):
+            heap = queue.heaps[priority]
+            while heap:
+                finish_tag, _, waiter = heap[0]
+                if waiter.future.done():
+                    # Cancelled while queued
+                    heapq.heappop(heap)
+                    continue
+                if not queue.has_room(priority):
+                    break
+                heapq.heappop(heap)
+                queue.waiting[priority] -= 1
+                queue.virtual_time = max(queue.virtual_time, finish_tag)
+                queue_time = time.monotonic() - waiter.enqueued_at
+                self._start(queue, priority, queue_time)
+                waiter.future.set_result(queue_time)
+            if heap and not queue.has_room(priority):
+                # Lower priorities must not overtake a blocked higher one
+                return
+
+        if not any(queue.waiting.values()):
+            # Nothing is queued, so finish tags can restart from zero
+            queue.virtual_time = 0.0
+            queue.tenant_finish.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get capacity, queue depth and queue-time statistics per provider.
+
+        Returns:
+            Dictionary keyed by provider with slot usage and, per priority,
+            the number of waiting requests and recent queue-time percentiles
+        """
+        stats = {}
+        for provider, queue in self._queues.items():
+            priorities = {}
+            for priority in ModelPriority:
+                times = sorted(queue.queue_times.get(priority, ()))
+                waiting = queue.waiting[priority]
+                if not times and not waiting:
+                    continue
+                priorities[priority.name.lower()] = {
+                    "active": queue.active_by_priority.get(priority, 0),
+                    "waiting": waiting,
+                    "started": len(times),
+                    "queue_time_p50": _percentile(times, 50.0),
+                    "queue_time_p95": _percentile(times, 95.0),
+                    "queue_time_max": times[-1] if times else None,
+                }
+            stats[provider] = {
+                "capacity": queue.capacity,
+                "reserved_for_interactive": queue.reserved,
+                "active": queue.active,
+                "waiting": sum(queue.waiting.values()),
+                "priorities": priorities,
+            }
+        return stats
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(percentile / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
@@ -0,0 +1,289 @@
+"""
+Semantic Cache - Near-Duplicate Lookup for AutoModel Responses
+
+This module finds earlier requests whose content is nearly identical to a new
+one, so their cached responses can be reused when exact cache keys differ:
+re-uploaded exports with a few extra messages, or the same summarization
+question with slightly different whitespace or wording.
+
+Requests are embedded locally as L2-normalized feature-hashed vectors of
+their word unigrams and bigrams, and kept in an in-process NumPy index per
+namespace (task type, template and generation parameters). A lookup is a
+single matrix-vector product over the namespace. The index stores only
+vectors and the exact cache keys of the original requests; the responses
+themselves stay in the regular response cache.
+
+NumPy is an optional dependency. Without it the semantic cache is disabled.
+
+Author: Rip Jonesy
+"""
+
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = logging.getLogger("chatchonk.automodel.semantic_cache")
+
+# Dimensionality of the hashed embedding
+EMBEDDING_DIMENSIONS = 1024
+
+_WORDS = re.compile(r"\w+")
+
+
+def is_available() -> bool:
+    """Whether the optional NumPy dependency is installed."""
+    return np is not None
+
+
+def content_text(content: Any) -> Optional[str]:
+    """
+    Get the text of request content for embedding.
+
+    Args:
+        content: Text, message list or {"messages": [...]} content
+
+    Returns:
+        The text, or None for content that cannot be embedded (e.g. media)
+    """
+    if isinstance(content, str):
+        return content
+    if isinstance(content, dict):
+        content = content.get("messages")
+    if not isinstance(content, list):
+        return None
+
+    parts = []
+    for item in content:
+        if isinstance(item, dict):
+            text = item.get("content")
+            if not isinstance(text, str):
+                return None
+            parts.append(f"{item.get('role', 'user')}: {text}")
+        else:
+            parts.append(str(item))
+    return "\n".join(parts)
+
+
+def embed_text(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> "np.ndarray":
+    """
+    Embed a text as a normalized feature-hashed vector.
+
+    Word unigrams and bigrams are hashed into ``dimensions`` buckets with
+    sublinear (log) term frequency, so small edits to a long text move its
+    vector only slightly.
+
+    Args:
+        text: Text to embed
+        dimensions: Number of vector dimensions
+
+    Returns:
+        Float32 unit vector (all zeros for text without words)
+    """
+    words = _WORDS.findall(text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    vector = np.zeros(dimensions, dtype=np.float32)
+    if not features:
+        return vector
+
+    buckets = np.fromiter(
+        (hash(feature) % dimensions for feature in features),
+        dtype=np.int64,
+        count=len(features),
+    )
+    counts = np.bincount(buckets, minlength=dimensions).astype(np.float32)
+    np.log1p(counts, out=vector)
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    return vector
+
+
+class _Namespace:
+    """Vectors and entry IDs of one namespace, stored as a growable matrix."""
+
+    def __init__(self, dimensions: int):
+        self.vectors = np.zeros((16, dimensions), dtype=np.float32)
+        self.entry_ids: List[int] = []
+
+    def add(self, entry_id: int, vector: "np.ndarray") -> None:
+        """Append a vector, doubling the matrix when it is full."""
+        size = len(self.entry_ids)
+        if size == len(self.vectors):
+            grown = np.zeros((size * 2, self.vectors.shape[1]), dtype=np.float32)
+            grown[:size] = self.vectors
+            self.vectors = grown
+        self.vectors[size] = vector
+        self.entry_ids.append(entry_id)
+
+    def remove(self, entry_id: int) -> None:
+        """Remove a vector by moving the last row into its place."""
+        row = self.entry_ids.index(entry_id)
+        last = len(self.entry_ids) - 1
+        if row != last:
+            self.vectors[row] = self.vectors[last]
+            self.entry_ids[row] = self.entry_ids[last]
+        self.entry_ids.pop()
+
+    def nearest(self, vector: "np.ndarray") -> Tuple[Optional[int], float]:
+        """Find the most similar vector by cosine similarity."""
+        size = len(self.entry_ids)
+        if not size:
+            return None, 0.0
+        scores = self.vectors[:size] @ vector
+        row = int(np.argmax(scores))
+        return self.entry_ids[row], float(scores[row])
+
+
+class SemanticCache:
+    """
+    In-process nearest-neighbour index over recent requests.
+
+    Entries are evicted least recently used first once ``max_entries`` is
+    reached; a hit refreshes the matching entry.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        threshold: float = 0.97,
+        dimensions: int = EMBEDDING_DIMENSIONS,
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            max_entries: Maximum number of indexed requests
+            threshold: Minimum cosine similarity for a hit
+            dimensions: Number of embedding dimensions
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.dimensions = dimensions
+
+        self._namespaces: Dict[str, _Namespace] = {}
+        # Entry ID -> (namespace, cache key), in least recently used order
+        self._entries: "OrderedDict[int, Tuple[str, str]]" = OrderedDict()
+        self._next_id = 0
+        self._stats = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "evictions": 0,
+        }
+
+    def embed(self, text: str) -> "np.ndarray":
+        """
+        Embed a request text for lookup and insertion.
+
+        Args:
+            text: Text of the request content
+
+        Returns:
+            Embedding vector
+        """
+        return embed_text(text, self.dimensions)
+
+    def lookup(
+        self, namespace: str, vector: "np.ndarray"
+    ) -> Optional[Tuple[str, float]]:
+        """
+        Find the cache key of the most similar earlier request.
+
+        Args:
+            namespace: Namespace of the request
+            vector: Embedding of the request
+
+        Returns:
+            Tuple of (cache key, similarity) above the threshold, or None
+        """
+        self._stats["lookups"] += 1
+        index = self._namespaces.get(namespace)
+        entry_id, score = index.nearest(vector) if index else (None, 0.0)
+        if entry_id is None or score < self.threshold:
+            self._stats["misses"] += 1
+            return None
+
+        self._stats["hits"] += 1
+        self._entries.move_to_end(entry_id)
+        return self._entries[entry_id][1], score
+
+    def add(self, namespace: str, vector: "np.ndarray", cache_key: str) -> None:
+        """
+        Index a request whose response was cached under ``cache_key``.
+
+        Args:
+            namespace: Namespace of the request
+            vector: Embedding of the request
+            cache_key: Exact cache key of the stored response
+        """
+        if not vector.any():
+            return
+
+        index = self._namespaces.get(namespace)
+        if index is None:
+            index = self._namespaces[namespace] = _Namespace(self.dimensions)
+
+        entry_id = self._next_id
+        self._next_id += 1
+        index.add(entry_id, vector)
+        self._entries[entry_id] = (namespace, cache_key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def invalidate(self, cache_key: str) -> None:
+        """
+        Drop the entries pointing at a response that is no longer cached.
+
+        Args:
+            cache_key: Exact cache key of the missing response
+        """
+        stale = [
+            entry_id for entry_id, (_, key) in self._entries.items() if key == cache_key
+        ]
+        for entry_id in stale:
+            self._remove(entry_id)
+        if stale:
+            self._stats["stale"] += 1
+            # The lookup that found the stale entry did not produce a hit
+            self._stats["hits"] -= 1
+            self._stats["misses"] += 1
+
+    def _remove(self, entry_id: int) -> None:
+        """Remove an entry from its namespace and the LRU order."""
+        namespace, _ = self._entries.pop(entry_id)
+        index = self._namespaces[namespace]
+        index.remove(entry_id)
+        if not index.entry_ids:
+            del self._namespaces[namespace]
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._namespaces.clear()
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get size and hit-rate statistics.
+
+        Returns:
+            Dictionary with entry counts, limits, lookup counters and hit rate
+        """
+        lookups = self._stats["lookups"]
+        return {
+            "entries": len(self._entries),
+            "namespaces": len(self._namespaces),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            **self._stats,
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+        }
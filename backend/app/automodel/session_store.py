@@ -0,0 +1,273 @@
+"""
+Session Store - Bounded In-Memory Storage for AutoModel Chat Sessions
+
+This module keeps the context of multi-turn AutoModel sessions in memory.
+The store is bounded both by the number of sessions and by the approximate
+size of their contexts, evicts the least recently used sessions first, and
+expires sessions that have been idle for longer than their TTL, so a
+long-running worker does not grow without limit.
+
+Author: Rip Jonesy
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("chatchonk.automodel.sessions")
+
+
+class _SessionEntry:
+    """A stored session context with its bookkeeping."""
+
+    __slots__ = ("context", "size_bytes", "created_at", "last_access")
+
+    def __init__(self, context: Dict[str, Any], size_bytes: int, now: float):
+        self.context = context
+        self.size_bytes = size_bytes
+        self.created_at = now
+        self.last_access = now
+
+
+class SessionStore:
+    """
+    LRU/TTL session store with per-session byte accounting.
+
+    Sessions are kept in least-recently-used order. Reads and writes refresh a
+    session; sessions idle for longer than ``ttl_seconds`` are dropped lazily
+    on access and during writes. When the store exceeds ``max_sessions`` or
+    ``max_total_bytes``, the least recently used sessions are evicted.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 10000,
+        max_total_bytes: int = 64 * 1024 * 1024,
+        max_session_bytes: int = 256 * 1024,
+        ttl_seconds: float = 3600.0,
+    ):
+        """
+        Initialize the session store.
+
+        Args:
+            max_sessions: Maximum number of sessions kept at once
+            max_total_bytes: Maximum approximate size of all session contexts
+            max_session_bytes: Maximum approximate size of a single context
+            ttl_seconds: Idle time after which a session expires
+        """
+        self.max_sessions = max_sessions
+        self.max_total_bytes = max_total_bytes
+        self.max_session_bytes = max_session_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._sessions: "OrderedDict[str, _SessionEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._stats = {
+            "evicted_lru": 0,
+            "evicted_ttl": 0,
+            "rejected_oversize": 0,
+        }
+
+    @staticmethod
+    def _measure(context: Dict[str, Any]) -> int:
+        """Approximate the memory footprint of a context by its JSON size."""
+        return len(json.dumps(context, default=str).encode("utf-8"))
+
+    def _is_expired(self, entry: _SessionEntry, now: float) -> bool:
+        """Check whether a session has been idle for longer than the TTL."""
+        return self.ttl_seconds > 0 and now - entry.last_access > self.ttl_seconds
+
+    def _remove(self, session_id: str) -> None:
+        """Remove a session and release its byte accounting."""
+        entry = self._sessions.pop(session_id, None)
+        if entry:
+            self._total_bytes -= entry.size_bytes
+
+    def _evict(self, now: float) -> None:
+        """Drop expired sessions, then least recently used ones over the limits."""
+        # Entries are in access order, so expired ones are at the front
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if not self._is_expired(entry, now):
+                break
+            self._remove(session_id)
+            self._stats["evicted_ttl"] += 1
+
+        while self._sessions and (
+            len(self._sessions) > self.max_sessions
+            or self._total_bytes > self.max_total_bytes
+        ):
+            session_id = next(iter(self._sessions))
+            self._remove(session_id)
+            self._stats["evicted_lru"] += 1
+            logger.debug(f"Evicted least recently used session {session_id}")
+
+    def create(self, session_id: str) -> None:
+        """
+        Register a new, empty session.
+
+        Args:
+            session_id: ID of the session to create
+        """
+        self.set(session_id, {})
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the context of a session and mark it as recently used.
+
+        Args:
+            session_id: The session ID
+
+        Returns:
+            Session context, or None if the session does not exist or expired
+        """
+        entry = self._sessions.get(session_id)
+        if not entry:
+            return None
+
+        now = time.monotonic()
+        if self._is_expired(entry, now):
+            self._remove(session_id)
+            self._stats["evicted_ttl"] += 1
+            return None
+
+        entry.last_access = now
+        self._sessions.move_to_end(session_id)
+        return entry.context
+
+    def set(self, session_id: str, context: Dict[str, Any]) -> bool:
+        """
+        Replace the context of a session, creating the session if needed.
+
+        Args:
+            session_id: The session ID
+            context: The new context
+
+        Returns:
+            True if the context was stored, False if it exceeds the per-session limit
+        """
+        size_bytes = self._measure(context)
+        if size_bytes > self.max_session_bytes:
+            self._stats["rejected_oversize"] += 1
+            logger.warning(
+                f"Context for session {session_id} is {size_bytes} bytes, "
+                f"over the {self.max_session_bytes} byte limit; not stored"
+            )
+            return False
+
+        now = time.monotonic()
+        existing = self._sessions.get(session_id)
+        if existing:
+            self._total_bytes -= existing.size_bytes
+            existing.context = context
+            existing.size_bytes = size_bytes
+            existing.last_access = now
+            self._sessions.move_to_end(session_id)
+        else:
+            self._sessions[session_id] = _SessionEntry(context, size_bytes, now)
+        self._total_bytes += size_bytes
+
+        self._evict(now)
+        return True
+
+    def update(self, session_id: str, context: Dict[str, Any]) -> bool:
+        """
+        Merge new values into the context of a session.
+
+        Args:
+            session_id: The session ID
+            context: Values to merge into the existing context
+
+        Returns:
+            True if the merged context was stored, False otherwise
+        """
+        merged = dict(self.get(session_id) or {})
+        merged.update(context)
+        return self.set(session_id, merged)
+
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> bool:
+        """
+        Append chat messages to the history of a session.
+
+        The history is the "messages" list of the context. When it would exceed
+        the per-session limit, the oldest messages are dropped so the session
+        keeps its latest turns, and the history always starts with a user
+        message.
+
+        Args:
+            session_id: The session ID
+            messages: Messages to append, oldest first
+
+        Returns:
+            True if the context was stored, False otherwise
+        """
+        context = dict(self.get(session_id) or {})
+        history = list(context.get("messages", [])) + list(messages)
+        context["messages"] = history
+
+        size_bytes = self._measure(context)
+        if size_bytes > self.max_session_bytes:
+            dropped = 0
+            while dropped < len(history) and (
+                size_bytes > self.max_session_bytes
+                or history[dropped].get("role") != "user"
+            ):
+                # Each message also takes a separator in the JSON list
+                size_bytes -= self._measure(history[dropped]) + 2
+                dropped += 1
+            context["messages"] = history[dropped:]
+        return self.set(session_id, context)
+
+    def delete(self, session_id: str) -> bool:
+        """
+        Delete a session.
+
+        Args:
+            session_id: The session ID to delete
+
+        Returns:
+            True if the session existed, False otherwise
+        """
+        existed = session_id in self._sessions
+        self._remove(session_id)
+        return existed
+
+    def clear(self) -> None:
+        """Remove all sessions."""
+        self._sessions.clear()
+        self._total_bytes = 0
+
+    def __contains__(self, session_id: str) -> bool:
+        """Check whether a live session exists without refreshing it."""
+        entry = self._sessions.get(session_id)
+        return entry is not None and not self._is_expired(entry, time.monotonic())
+
+    def __len__(self) -> int:
+        """Number of stored sessions, including ones not yet lazily expired."""
+        return len(self._sessions)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get memory and eviction statistics for the store.
+
+        Returns:
+            Dictionary with session counts, byte usage, limits and eviction counts
+        """
+        largest = max(
+            (entry.size_bytes for entry in self._sessions.values()), default=0
+        )
+        return {
+            "sessions": len(self._sessions),
+            "total_bytes": self._total_bytes,
+            "largest_session_bytes": largest,
+            "average_session_bytes": (
+                self._total_bytes / len(self._sessions) if self._sessions else 0.0
+            ),
+            "max_sessions": self.max_sessions,
+            "max_total_bytes": self.max_total_bytes,
+            "max_session_bytes": self.max_session_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            **self._stats,
+        }
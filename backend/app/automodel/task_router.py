@@ -8,16 +8,102 @@ and availability. It implements the core "AutoSwap" logic.
 Author: Rip Jonesy
 """
 
+import asyncio
+import contextvars
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
-
-from app.automodel import TaskType, ProviderType, ModelPriority
-from app.automodel.providers import Model, ProviderResponse
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import httpx
+
+from app.automodel import (
+    DeadlineExceededError,
+    ProviderApiError,
+    ProviderNotAvailableError,
+    TaskType,
+    ProviderType,
+    ModelPriority,
+    deadline,
+)
+from app.automodel.providers import BaseProvider, Model, ProviderResponse
 from app.automodel.model_registry import ModelRegistry
 
 logger = logging.getLogger("chatchonk.automodel.router")
 
+T = TypeVar("T")
+
+
+class _AttemptTimer:
+    """Start time of the provider call made by a single attempt."""
+
+    __slots__ = ("started",)
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+
+    def elapsed(self) -> float:
+        """Seconds since the provider call started."""
+        return time.monotonic() - self.started
+
+
+# Timer of the attempt running in the current context, if any
+_attempt_timer: contextvars.ContextVar[Optional[_AttemptTimer]] = (
+    contextvars.ContextVar("attempt_timer", default=None)
+)
+
+
+def mark_call_started() -> None:
+    """
+    Mark the start of the provider call of the current attempt.
+
+    Attempts that wait for capacity first (a batch limit or a scheduler slot)
+    call this once admitted, so the latency recorded for the model excludes
+    the time spent in our own queues. Does nothing outside of an attempt.
+    """
+    timer = _attempt_timer.get()
+    if timer is not None:
+        timer.started = time.monotonic()
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Check whether a failed attempt should fail over to the next candidate.
+
+    Rate limiting (429), server errors (5xx), timeouts and connection failures
+    are specific to the provider that raised them, so another candidate may
+    well succeed. Other errors, such as a rejected request, would fail the
+    same way everywhere.
+
+    Args:
+        error: Exception raised by the attempt
+
+    Returns:
+        True if the next candidate should be tried
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return status_code == 429 or status_code >= 500
+    return isinstance(
+        error,
+        (
+            httpx.TransportError,
+            TimeoutError,
+            ConnectionError,
+            ProviderNotAvailableError,
+        ),
+    )
+
 
 class TaskRouter:
     """
@@ -38,10 +124,31 @@ class TaskRouter:
             model_registry: ModelRegistry instance for accessing models and providers
         """
         self.model_registry = model_registry
-        self._routing_cache: Dict[str, Tuple[str, datetime]] = {}
+        # Ranked candidates and the number of leading equivalent ones by routing
+        # key, with the registry routing epoch, metrics epoch and ranking time
+        self._routing_cache: Dict[Tuple, Tuple[int, int, float, List[Model], int]] = {}
         self._fallback_chains: Dict[TaskType, List[ProviderType]] = {}
+        self._fallback_ranks: Dict[TaskType, Dict[ProviderType, int]] = {}
         self._load_balancing: Dict[ProviderType, int] = {}
 
+        # Requests currently in flight per model and per provider
+        self._in_flight: Dict[str, int] = {}
+        self._provider_in_flight: Dict[ProviderType, int] = {}
+
+        # Hedged request settings and counters
+        self.default_hedge_delay = 10.0  # seconds, used until a model has latency data
+        self._hedge_stats: Dict[str, int] = {"hedged_requests": 0, "hedges_fired": 0, "hedge_wins": 0}
+
+        # Seconds a ranking is reused while request metrics keep changing, and
+        # the maximum number of cached rankings
+        self.routing_cache_ttl = 1.0
+        self.routing_cache_size = 1024
+
+        # Models scoring within this fraction of the best candidate share its
+        # load, and the latency assumed for models without latency data
+        self.balance_tolerance = 0.1
+        self.default_latency_estimate = 1.0  # seconds
+
         # Initialize fallback chains for different task types
         self._initialize_fallback_chains()
 
@@ -110,6 +217,27 @@ class TaskRouter:
                 ProviderType.HUGGINGFACE,
             ],
         }
+        self._fallback_ranks = {
+            task_type: {provider: rank for rank, provider in enumerate(chain)}
+            for task_type, chain in self._fallback_chains.items()
+        }
+        self._routing_cache.clear()
+
+    def set_fallback_chain(
+        self, task_type: TaskType, providers: List[ProviderType]
+    ) -> None:
+        """
+        Set the preferred provider order for a task type.
+
+        Args:
+            task_type: Task type to set the order for
+            providers: Providers in order of preference
+        """
+        self._fallback_chains[task_type] = list(providers)
+        self._fallback_ranks[task_type] = {
+            provider: rank for rank, provider in enumerate(providers)
+        }
+        self._routing_cache.clear()
 
     async def route_task(
         self,
@@ -119,6 +247,9 @@ class TaskRouter:
         preferred_providers: Optional[List[ProviderType]] = None,
         excluded_providers: Optional[Set[ProviderType]] = None,
         model_requirements: Optional[Dict[str, Any]] = None,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_budget: int = 1,
         **kwargs,
     ) -> ProviderResponse:
         """
@@ -131,6 +262,10 @@ class TaskRouter:
             preferred_providers: Preferred providers to use (in order)
             excluded_providers: Providers to exclude from selection
             model_requirements: Specific model requirements (e.g., max_tokens, supports_vision)
+            hedge: If True, send a backup request to the next candidate when the
+                current one is slower than its observed latency percentile
+            hedge_percentile: Latency percentile (e.g. 90 or 95) after which to hedge
+            hedge_budget: Maximum number of extra hedge requests for this call
             **kwargs: Additional parameters for model processing
 
         Returns:
@@ -138,13 +273,10 @@ class TaskRouter:
 
         Raises:
             ValueError: If no suitable model is found
-            Exception: If all attempts fail
+            DeadlineExceededError: If the request's deadline passes first
+            ProviderApiError: If all attempts fail
         """
-        # Ensure registry is up to date
-        await self.model_registry.health_check_if_needed()
-
-        # Get candidate models
-        candidate_models = self._get_candidate_models(
+        candidate_models = await self.rank_candidates(
             task_type,
             priority,
             preferred_providers,
@@ -155,26 +287,128 @@ class TaskRouter:
         if not candidate_models:
             raise ValueError(f"No suitable models found for task {task_type}")
 
+        async def attempt(provider: BaseProvider, model: Model) -> ProviderResponse:
+            return await provider.process(
+                task_type=task_type, model_id=model.id, content=content, **kwargs
+            )
+
+        if hedge:
+            return await self.execute_hedged(
+                task_type, candidate_models, attempt, hedge_percentile, hedge_budget
+            )
+        return await self.execute_with_failover(task_type, candidate_models, attempt)
+
+    async def rank_candidates(
+        self,
+        task_type: TaskType,
+        priority: ModelPriority = ModelPriority.MEDIUM,
+        preferred_providers: Optional[List[ProviderType]] = None,
+        excluded_providers: Optional[Set[ProviderType]] = None,
+        model_requirements: Optional[Dict[str, Any]] = None,
+    ) -> List[Model]:
+        """
+        Get the models that can run a task, best first.
+
+        Args:
+            task_type: Type of task to perform
+            priority: Priority level for model selection
+            preferred_providers: Preferred providers to use (in order)
+            excluded_providers: Providers to exclude from selection
+            model_requirements: Specific model requirements
+
+        Returns:
+            Ranked list of candidate models (empty if none is suitable)
+        """
+        # Preferred providers that have not been used yet are initialized now
+        for provider_type in preferred_providers or []:
+            await self.model_registry.ensure_provider(provider_type)
+
+        # Health is monitored in the background; this never waits for it
+        self.model_registry.start_health_monitor()
+
+        candidate_models = self._get_candidate_models(
+            task_type,
+            priority,
+            preferred_providers,
+            excluded_providers,
+            model_requirements,
+        )
+
+        # Give lazy providers a chance before giving up
+        if not candidate_models and await self.model_registry.ensure_all_providers():
+            candidate_models = self._get_candidate_models(
+                task_type,
+                priority,
+                preferred_providers,
+                excluded_providers,
+                model_requirements,
+            )
+
+        return candidate_models
+
+    async def execute_with_failover(
+        self,
+        task_type: TaskType,
+        candidate_models: List[Model],
+        attempt: Callable[[BaseProvider, Model], Awaitable[T]],
+        should_failover: Optional[Callable[[Exception], bool]] = None,
+    ) -> T:
+        """
+        Run a task on ranked candidates until one attempt succeeds.
+
+        Every attempt is bounded by the request's deadline. Successes and
+        provider-side failures are recorded in the model metrics; rejected
+        requests are not held against the model. Candidates whose circuit breaker opened since
+        ranking are skipped without being called. Latency is measured from the
+        start of the attempt, or from its call to mark_call_started() for
+        attempts that queue for capacity first.
+
+        Args:
+            task_type: Type of task, for logging
+            candidate_models: Candidate models in order of preference
+            attempt: Coroutine function running the task on a provider and model
+            should_failover: Decides whether an error moves on to the next
+                candidate; other errors are raised at once. By default every
+                error fails over
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            DeadlineExceededError: If the request's deadline passes first
+            ProviderApiError: If every candidate failed
+        """
         # Try models in order until one succeeds
         last_error = None
         for model in candidate_models:
-            try:
-                provider = self.model_registry.get_provider(model.provider)
-                if not provider:
-                    continue
+            provider = self.model_registry.get_provider(model.provider)
+            if not provider:
+                continue
 
-                # Record attempt start time
-                start_time = datetime.now()
+            if not self.model_registry.acquire_model(model):
+                last_error = ProviderNotAvailableError(f"Circuit open for {model.name}")
+                logger.debug(f"Skipping {model.name}: circuit open")
+                continue
 
-                # Execute the task
-                response = await provider.process(
-                    task_type=task_type, model_id=model.id, content=content, **kwargs
+            # Time the attempt; the attempt may restart the timer once admitted
+            timer = _AttemptTimer()
+            timer_token = _attempt_timer.set(timer)
+            recorded = False
+            self._start_request(model)
+            try:
+                # Execute the task within the remaining time budget
+                response = await deadline.wait(
+                    attempt(provider, model), f"attempt with {model.name}"
                 )
 
                 # Record success metrics
-                response_time = (datetime.now() - start_time).total_seconds()
+                response_time = timer.elapsed()
+                recorded = True
                 self.model_registry.update_model_metrics(
-                    model.id, success=True, response_time=response_time
+                    model.id,
+                    success=True,
+                    response_time=response_time,
+                    task_type=task_type,
                 )
 
                 # Update load balancing
@@ -187,116 +421,435 @@ class TaskRouter:
                 )
                 return response
 
+            except DeadlineExceededError:
+                # Out of time: trying further candidates cannot succeed either
+                raise
+
             except Exception as e:
                 # Record failure metrics
-                response_time = (datetime.now() - start_time).total_seconds()
-                self.model_registry.update_model_metrics(
-                    model.id, success=False, response_time=response_time, error=str(e)
-                )
+                response_time = timer.elapsed()
+                recorded = self._record_failure(model, e, response_time, task_type)
+
+                if should_failover and not should_failover(e):
+                    raise
 
                 last_error = e
                 logger.warning(f"Task failed with {model.name}: {str(e)}")
                 continue
 
+            finally:
+                _attempt_timer.reset(timer_token)
+                self._finish_request(model)
+                if not recorded:
+                    # Deadline or cancellation: free any half-open trial slot
+                    self.model_registry.release_model(model)
+
         # If we get here, all models failed
-        raise Exception(
+        raise ProviderApiError(
             f"All models failed for task {task_type}. Last error: {str(last_error)}"
-        )
+        ) from last_error
 
-    def _get_candidate_models(
+    async def execute_hedged(
         self,
         task_type: TaskType,
-        priority: ModelPriority,
-        preferred_providers: Optional[List[ProviderType]],
-        excluded_providers: Optional[Set[ProviderType]],
-        model_requirements: Optional[Dict[str, Any]],
-    ) -> List[Model]:
-        """Get candidate models for a task, ordered by preference."""
-        excluded_providers = excluded_providers or set()
-        model_requirements = model_requirements or {}
+        candidate_models: List[Model],
+        attempt: Callable[[BaseProvider, Model], Awaitable[T]],
+        hedge_percentile: float = 95.0,
+        hedge_budget: int = 1,
+        should_failover: Optional[Callable[[Exception], bool]] = None,
+    ) -> T:
+        """
+        Run a task on ranked candidates, hedging slow attempts.
 
-        # Get all models that support the task
-        suitable_models = self.model_registry.get_models_for_task(task_type)
+        The first candidate is called immediately. If it has not answered within
+        its observed latency percentile, the next candidate is called as well and
+        the first successful response wins; the remaining attempts are cancelled.
+        At most hedge_budget extra attempts are started this way. Failed attempts
+        fail over to the next candidate without using the budget, as in
+        execute_with_failover. All attempts are cancelled when the request's
+        deadline passes.
 
-        # Filter by requirements
-        filtered_models = []
-        for model in suitable_models:
-            if model.provider in excluded_providers:
-                continue
+        Args:
+            task_type: Type of task, for logging
+            candidate_models: Candidate models in order of preference
+            attempt: Coroutine function running the task on a provider and model
+            hedge_percentile: Latency percentile (e.g. 90 or 95) after which to hedge
+            hedge_budget: Maximum number of extra hedge attempts
+            should_failover: Decides whether an error moves on to the next
+                candidate; other errors are raised at once. By default every
+                error fails over
 
-            # Check model requirements
-            if not self._meets_requirements(model, model_requirements):
-                continue
+        Returns:
+            Result of the first successful attempt
 
-            filtered_models.append(model)
+        Raises:
+            DeadlineExceededError: If the request's deadline passes first
+            ProviderApiError: If every candidate failed
+        """
+        self._hedge_stats["hedged_requests"] += 1
+        remaining = list(candidate_models)
+        pending: Dict[asyncio.Task, Tuple[Model, _AttemptTimer, bool]] = {}
+        hedges_left = hedge_budget
+        last_error: Optional[Exception] = None
+
+        def launch(is_hedge: bool) -> Optional[Model]:
+            nonlocal last_error
+            while remaining:
+                model = remaining.pop(0)
+                provider = self.model_registry.get_provider(model.provider)
+                if not provider:
+                    continue
+                if not self.model_registry.acquire_model(model):
+                    last_error = ProviderNotAvailableError(f"Circuit open for {model.name}")
+                    logger.debug(f"Skipping {model.name}: circuit open")
+                    continue
+                # The task runs in a copy of this context, timer included
+                timer = _AttemptTimer()
+                timer_token = _attempt_timer.set(timer)
+                try:
+                    task = asyncio.create_task(attempt(provider, model))
+                finally:
+                    _attempt_timer.reset(timer_token)
+                pending[task] = (model, timer, is_hedge)
+                self._start_request(model)
+                return model
+            return None
+
+        last_launched = launch(is_hedge=False)
+
+        try:
+            while pending:
+                # Time after which the latest attempt counts as slow, if a hedge
+                # can still be fired
+                hedge_delay = None
+                if hedges_left > 0 and remaining and last_launched:
+                    hedge_delay = self.model_registry.get_latency_percentile(
+                        last_launched.id, hedge_percentile, task_type=task_type
+                    )
+                    if hedge_delay is None:
+                        hedge_delay = self.default_hedge_delay
+
+                # Never wait past the request's deadline
+                left = deadline.remaining()
+                wait_timeout = hedge_delay
+                if left is not None:
+                    wait_timeout = left if hedge_delay is None else min(hedge_delay, left)
+
+                done, _ = await asyncio.wait(
+                    pending.keys(),
+                    timeout=wait_timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
 
-        if not filtered_models:
-            return []
+                if not done:
+                    if left is not None and deadline.remaining() <= 0:
+                        raise DeadlineExceededError(
+                            f"Deadline exceeded while routing task {task_type}"
+                        )
+                    if hedge_delay is None:
+                        # Woke up just short of the deadline: keep waiting
+                        continue
+
+                    # Current attempts are slower than expected: fire a hedge
+                    hedged_model = launch(is_hedge=True)
+                    if hedged_model:
+                        hedges_left -= 1
+                        last_launched = hedged_model
+                        self._hedge_stats["hedges_fired"] += 1
+                        logger.info(
+                            f"Hedging task {task_type} with {hedged_model.name} "
+                            f"after {hedge_delay:.2f}s"
+                        )
+                    continue
 
-        # Sort models by preference
-        return self._sort_models_by_preference(
-            filtered_models, task_type, priority, preferred_providers
-        )
+                for task in done:
+                    model, timer, is_hedge = pending.pop(task)
+                    self._finish_request(model)
+                    response_time = timer.elapsed()
+
+                    error = task.exception()
+                    if error is None:
+                        self.model_registry.update_model_metrics(
+                            model.id,
+                            success=True,
+                            response_time=response_time,
+                            task_type=task_type,
+                        )
+                        self._load_balancing[model.provider] = (
+                            self._load_balancing.get(model.provider, 0) + 1
+                        )
+                        if is_hedge:
+                            self._hedge_stats["hedge_wins"] += 1
+                        logger.info(
+                            f"Task {task_type} completed successfully using {model.name}"
+                            + (" (hedge)" if is_hedge else "")
+                        )
+                        return task.result()
+
+                    if not self._record_failure(model, error, response_time, task_type):
+                        self.model_registry.release_model(model)
+                    if isinstance(error, DeadlineExceededError) or (
+                        should_failover and not should_failover(error)
+                    ):
+                        raise error
+
+                    last_error = error
+                    logger.warning(f"Task failed with {model.name}: {str(error)}")
+
+                # Every finished attempt failed: fail over if nothing else is running
+                if not pending:
+                    last_launched = launch(is_hedge=False)
+        finally:
+            # Cancel the losers (and everything else, if we were cancelled)
+            for task, (model, _, _) in pending.items():
+                task.cancel()
+                self._finish_request(model)
+                self.model_registry.release_model(model)
+
+        raise ProviderApiError(
+            f"All models failed for task {task_type}. Last error: {str(last_error)}"
+        ) from last_error
 
-    def _meets_requirements(self, model: Model, requirements: Dict[str, Any]) -> bool:
-        """Check if a model meets the specified requirements."""
-        for req_key, req_value in requirements.items():
-            if req_key == "min_max_tokens" and model.max_tokens < req_value:
-                return False
-            elif (
-                req_key == "supports_vision" and req_value and not model.supports_vision
-            ):
-                return False
-            elif (
-                req_key == "supports_functions"
-                and req_value
-                and not model.supports_functions
-            ):
-                return False
-            elif (
-                req_key == "max_cost_per_1k_tokens"
-                and model.cost_per_1k_tokens
-                and model.cost_per_1k_tokens > req_value
-            ):
-                return False
+    def _record_failure(
+        self,
+        model: Model,
+        error: Exception,
+        response_time: float,
+        task_type: TaskType,
+    ) -> bool:
+        """
+        Record a failed attempt against the model, if the model is to blame.
 
+        Only provider-side failures (see is_retryable_error) count towards the
+        model's error rate and circuit breakers. A rejected request, such as a
+        4xx response or invalid input, would fail the same way anywhere, so it
+        must not let one caller open the circuit for everyone.
+
+        Args:
+            model: Model the attempt went to
+            error: Exception raised by the attempt
+            response_time: Response time in seconds
+            task_type: Type of task
+
+        Returns:
+            True if the failure was recorded; otherwise the caller must release
+            the model it acquired
+        """
+        if not is_retryable_error(error):
+            logger.info(f"Request rejected by {model.name}: {str(error)}")
+            return False
+
+        self.model_registry.update_model_metrics(
+            model.id,
+            success=False,
+            response_time=response_time,
+            error=str(error),
+            task_type=task_type,
+        )
         return True
 
+    def _get_candidate_models(
+        self,
+        task_type: TaskType,
+        priority: ModelPriority,
+        preferred_providers: Optional[List[ProviderType]],
+        excluded_providers: Optional[Set[ProviderType]],
+        model_requirements: Optional[Dict[str, Any]],
+    ) -> List[Model]:
+        """
+        Get candidate models for a task, ordered by preference.
+
+        Rankings are cached per routing key. A cached ranking is reused until
+        the registry's routing epoch changes, or until it is older than
+        routing_cache_ttl and request metrics have changed since. Circuit
+        breakers and load change with time, so they are applied on every call.
+        """
+        try:
+            key = (
+                task_type,
+                priority,
+                tuple(preferred_providers or ()),
+                frozenset(excluded_providers or ()),
+                tuple(sorted((model_requirements or {}).items())),
+            )
+            hash(key)
+        except TypeError:
+            # Unhashable requirement values are ranked without caching
+            key = None
+
+        registry = self.model_registry
+        now = time.monotonic()
+        cached = self._routing_cache.get(key) if key is not None else None
+        if (
+            cached is not None
+            and cached[0] == registry.routing_epoch
+            and (
+                cached[1] == registry.metrics_epoch
+                or now - cached[2] < self.routing_cache_ttl
+            )
+        ):
+            ranked, equivalent = cached[3], cached[4]
+        else:
+            # Get the models that support the task and meet the requirements
+            ranked, equivalent = self._sort_models_by_preference(
+                registry.get_models_for_task(
+                    task_type,
+                    excluded_providers,
+                    model_requirements,
+                    check_circuits=False,
+                ),
+                task_type,
+                priority,
+                preferred_providers,
+            )
+            if key is not None:
+                if (
+                    key not in self._routing_cache
+                    and len(self._routing_cache) >= self.routing_cache_size
+                ):
+                    # Evict the oldest ranking
+                    del self._routing_cache[next(iter(self._routing_cache))]
+                self._routing_cache[key] = (
+                    registry.routing_epoch,
+                    registry.metrics_epoch,
+                    now,
+                    ranked,
+                    equivalent,
+                )
+
+        return [
+            model
+            for model in self._balance_load(ranked, equivalent, task_type)
+            if registry.is_circuit_closed(model)
+        ]
+
     def _sort_models_by_preference(
         self,
         models: List[Model],
         task_type: TaskType,
         priority: ModelPriority,
         preferred_providers: Optional[List[ProviderType]],
-    ) -> List[Model]:
-        """Sort models by preference for the given task."""
+    ) -> Tuple[List[Model], int]:
+        """
+        Sort models by preference for the given task.
+
+        Explicitly preferred providers come first. Otherwise models with a high
+        recent error rate are moved behind healthy ones before the fallback
+        chain order applies, and priority scores are scaled by each model's
+        recent latency and error rate on this task type.
+
+        Models equivalent to the best one (same preferred provider and health,
+        and a score within balance_tolerance of it) are moved to the front, so
+        _balance_load() can spread concurrent requests across them.
+
+        Returns:
+            Sorted models and the number of leading equivalent models
+        """
+        fallback_ranks = self._fallback_ranks.get(task_type, {})
+
+        def model_preference_score(model: Model) -> Tuple[Tuple[int, ...], float]:
+            degraded = int(self.model_registry.is_degraded(model.id, task_type))
 
-        def model_preference_score(model: Model) -> Tuple[int, float, float]:
-            # Primary sort: preferred providers (if specified)
+            # Primary sort: preferred providers (if specified), then health
             if preferred_providers:
                 try:
                     provider_preference = preferred_providers.index(model.provider)
                 except ValueError:
                     provider_preference = len(preferred_providers)
+                order = (provider_preference, degraded)
             else:
                 # Use fallback chain preference
-                fallback_chain = self._fallback_chains.get(task_type, [])
-                try:
-                    provider_preference = fallback_chain.index(model.provider)
-                except ValueError:
-                    provider_preference = len(fallback_chain)
-
-            # Secondary sort: model priority score (higher is better, so negate)
-            priority_score = -model.priority_score
+                provider_preference = fallback_ranks.get(
+                    model.provider, len(fallback_ranks)
+                )
+                order = (degraded, provider_preference)
 
-            # Tertiary sort: load balancing (prefer less used providers)
-            load_balance_score = self._load_balancing.get(model.provider, 0)
+            # Secondary sort: model priority score adjusted for recent
+            # performance (higher is better, so negate)
+            priority_score = -model.priority_score * (
+                self.model_registry.get_performance_factor(model.id, task_type)
+            )
 
-            return (provider_preference, priority_score, load_balance_score)
+            return order, priority_score
 
         # Sort by preference (lower scores are better)
-        models.sort(key=model_preference_score)
-        return models
+        scores = {model.id: model_preference_score(model) for model in models}
+        models.sort(key=lambda model: scores[model.id])
+        if not models:
+            return models, 0
+
+        # The fallback chain position does not make models inequivalent
+        def group(order: Tuple[int, ...]) -> Tuple[int, ...]:
+            return order if preferred_providers else order[:1]
+
+        best_order, best_score = scores[models[0].id]
+        threshold = best_score * (1.0 - self.balance_tolerance)
+        equivalent = [
+            model
+            for model in models
+            if group(scores[model.id][0]) == group(best_order)
+            and scores[model.id][1] <= threshold
+        ]
+        equivalent_ids = {model.id for model in equivalent}
+        others = [model for model in models if model.id not in equivalent_ids]
+        return equivalent + others, len(equivalent)
+
+    def _expected_completion_time(self, model: Model, task_type: TaskType) -> float:
+        """
+        Estimate how long a new request would wait behind outstanding ones.
+
+        Args:
+            model: Candidate model
+            task_type: Type of task
+
+        Returns:
+            Requests in flight on the model and its provider times the model's
+            recent latency, in seconds
+        """
+        queue_depth = self._in_flight.get(model.id, 0) + self._provider_in_flight.get(
+            model.provider, 0
+        )
+        if not queue_depth:
+            return 0.0
+        stats = self.model_registry.get_latency_stats(model.id, task_type)
+        latency = stats.latency if stats else None
+        return queue_depth * (latency or self.default_latency_estimate)
+
+    def _balance_load(
+        self, models: List[Model], equivalent: int, task_type: TaskType
+    ) -> List[Model]:
+        """
+        Order equivalent leading models by least expected completion time.
+
+        Idle models all expect no wait, so without load the ranking is kept.
+
+        Args:
+            models: Ranked models
+            equivalent: Number of leading models equivalent to the best one
+            task_type: Type of task
+
+        Returns:
+            Models with the equivalent ones reordered by current load
+        """
+        if equivalent < 2:
+            return models
+        leading = sorted(
+            models[:equivalent],
+            key=lambda model: self._expected_completion_time(model, task_type),
+        )
+        return leading + models[equivalent:]
+
+    def _start_request(self, model: Model) -> None:
+        """Count a request sent to a model as in flight."""
+        self._in_flight[model.id] = self._in_flight.get(model.id, 0) + 1
+        self._provider_in_flight[model.provider] = (
+            self._provider_in_flight.get(model.provider, 0) + 1
+        )
+
+    def _finish_request(self, model: Model) -> None:
+        """Stop counting a finished request to a model as in flight."""
+        self._in_flight[model.id] -= 1
+        self._provider_in_flight[model.provider] -= 1
 
     async def get_model_recommendation(
         self,
@@ -315,10 +868,8 @@ class TaskRouter:
         Returns:
             Recommended model or None if no suitable model found
         """
-        await self.model_registry.health_check_if_needed()
-
-        candidate_models = self._get_candidate_models(
-            task_type, priority, None, None, model_requirements
+        candidate_models = await self.rank_candidates(
+            task_type, priority, model_requirements=model_requirements
         )
 
         return candidate_models[0] if candidate_models else None
@@ -390,6 +941,11 @@ class TaskRouter:
         return {
             "total_requests": total_requests,
             "provider_distribution": provider_distribution,
+            "in_flight": {
+                provider_type.value: count
+                for provider_type, count in self._provider_in_flight.items()
+            },
+            "hedging": dict(self._hedge_stats),
             "fallback_chains": {
                 task_type.value: [p.value for p in providers]
                 for task_type, providers in self._fallback_chains.items()
@@ -0,0 +1,353 @@
+"""
+Template Cache - Parsed and Compiled AutoModel Processing Templates
+
+This module loads the YAML processing templates from the templates directory
+and keeps them in memory in compiled form: the system prompt is pre-split
+into literal text and ``{{variable}}`` placeholders, and the generation
+parameters are extracted once. Entries are invalidated when the template
+file's modification time changes, so no YAML is parsed on the request path.
+
+Author: Rip Jonesy
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import yaml
+
+logger = logging.getLogger("chatchonk.automodel.templates")
+
+# Default location of the templates directory (repository root)
+DEFAULT_TEMPLATES_DIR = Path(__file__).resolve().parents[3] / "templates"
+
+# File types scanned for templates
+TEMPLATE_SUFFIXES = {".yaml", ".yml", ".md"}
+
+# Generation parameters a template may set
+TEMPLATE_PARAMETERS = (
+    "temperature",
+    "max_tokens",
+    "top_p",
+    "frequency_penalty",
+    "presence_penalty",
+    "stop_sequences",
+)
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+class CompiledTemplate:
+    """A parsed template ready to be applied to content."""
+
+    def __init__(
+        self,
+        ids: List[str],
+        name: str,
+        path: Path,
+        mtime: float,
+        system_prompt: Optional[str],
+        parameters: Dict[str, Any],
+    ):
+        """
+        Initialize a compiled template.
+
+        Args:
+            ids: IDs the template can be referenced by; the last one is primary
+            name: Human-readable template name
+            path: Path of the template file
+            mtime: Modification time of the file when it was parsed
+            system_prompt: System prompt text, if the template defines one
+            parameters: Generation parameters defined by the template
+        """
+        self.ids = ids
+        self.template_id = ids[-1]
+        self.name = name
+        self.path = path
+        self.mtime = mtime
+        self.parameters = parameters
+        # Digest of what the template contributes to a request; unlike the
+        # mtime it is the same in every process and on every host
+        self.version = hashlib.sha256(
+            json.dumps(
+                {"system_prompt": system_prompt, "parameters": parameters},
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8")
+        ).hexdigest()[:16]
+        # Alternating literal text and placeholder names, starting with text
+        self._prompt_parts: List[str] = (
+            _PLACEHOLDER.split(system_prompt) if system_prompt else []
+        )
+
+    @property
+    def has_system_prompt(self) -> bool:
+        """Whether the template defines a system prompt."""
+        return bool(self._prompt_parts)
+
+    def render_system_prompt(
+        self, template_vars: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Render the system prompt with the given variables.
+
+        Placeholders without a matching variable are left unchanged.
+
+        Args:
+            template_vars: Variables for placeholder substitution
+
+        Returns:
+            Rendered system prompt, or None if the template has none
+        """
+        if not self._prompt_parts:
+            return None
+        if len(self._prompt_parts) == 1:
+            return self._prompt_parts[0]
+
+        template_vars = template_vars or {}
+        rendered = []
+        for i, part in enumerate(self._prompt_parts):
+            if i % 2 == 0:
+                rendered.append(part)
+            elif part in template_vars:
+                rendered.append(str(template_vars[part]))
+            else:
+                rendered.append(f"{{{{{part}}}}}")
+        return "".join(rendered)
+
+    def apply(
+        self,
+        content: Union[str, Dict[str, Any], List[Dict[str, Any]]],
+        template_vars: Optional[Dict[str, Any]] = None,
+    ) -> Union[str, Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Wrap content in the chat message layout with the template's system prompt.
+
+        Args:
+            content: Content to process
+            template_vars: Variables for placeholder substitution
+
+        Returns:
+            Content in {"messages": [...]} form, or the original content if the
+            template has no system prompt
+        """
+        system_prompt = self.render_system_prompt(template_vars)
+        if not system_prompt:
+            return content
+
+        messages = [{"role": "system", "content": system_prompt}]
+        if isinstance(content, dict) and "messages" in content:
+            messages.extend(content["messages"])
+        elif isinstance(content, list):
+            for item in content:
+                if isinstance(item, dict) and "role" in item and "content" in item:
+                    messages.append(item)
+                else:
+                    messages.append({"role": "user", "content": str(item)})
+        else:
+            messages.append(
+                {
+                    "role": "user",
+                    "content": content if isinstance(content, str) else str(content),
+                }
+            )
+        return {"messages": messages}
+
+
+def _compile_system_prompt(data: Dict[str, Any]) -> Optional[str]:
+    """
+    Extract the system prompt from a parsed template.
+
+    Templates with an ``ai_processing.system_prompt`` use it directly. Section
+    based templates get a prompt assembled from their description and the
+    extraction prompt of each section.
+    """
+    ai_processing = data.get("ai_processing") or {}
+    if ai_processing.get("system_prompt"):
+        return ai_processing["system_prompt"].strip()
+
+    sections = data.get("sections")
+    if not isinstance(sections, dict):
+        return None
+
+    lines = []
+    name = data.get("template_name")
+    description = data.get("template_description")
+    if name:
+        lines.append(f'Process the conversation using the "{name}" template.')
+    if description:
+        lines.append(str(description).strip())
+    lines.append("Structure your output with the following sections:")
+    for key, section in sections.items():
+        if not isinstance(section, dict):
+            continue
+        title = section.get("title") or key
+        instruction = section.get("extraction_prompt") or section.get("description")
+        if instruction:
+            lines.append(f"- {title}: {str(instruction).strip()}")
+    return "\n".join(lines)
+
+
+def _template_ids(path: Path, data: Dict[str, Any]) -> List[str]:
+    """Get all IDs a template can be referenced by."""
+    ids = [path.stem]
+    for section in ("metadata", "meta"):
+        section_data = data.get(section)
+        if isinstance(section_data, dict) and section_data.get("id"):
+            ids.append(str(section_data["id"]))
+    if data.get("persona_id"):
+        ids.append(str(data["persona_id"]))
+    return ids
+
+
+class TemplateCache:
+    """
+    In-memory cache of compiled templates, invalidated by file mtime.
+
+    The directory listing is rescanned only when the directory's own mtime
+    changes, and a template is re-parsed only when its file's mtime changes.
+    """
+
+    def __init__(self, templates_dir: Optional[Union[str, Path]] = None):
+        """
+        Initialize the template cache.
+
+        Args:
+            templates_dir: Directory containing template files
+        """
+        self.templates_dir = Path(templates_dir or DEFAULT_TEMPLATES_DIR)
+        self._templates: Dict[Path, CompiledTemplate] = {}
+        self._index: Dict[str, Path] = {}
+        self._dir_mtime: Optional[float] = None
+
+    def _refresh_index(self) -> None:
+        """Rebuild the ID index if files were added, removed or renamed."""
+        try:
+            dir_mtime = os.stat(self.templates_dir).st_mtime
+        except OSError:
+            if self._index:
+                logger.warning(f"Templates directory {self.templates_dir} is missing")
+            self._templates.clear()
+            self._index.clear()
+            self._dir_mtime = None
+            return
+
+        if dir_mtime == self._dir_mtime:
+            return
+
+        paths = [
+            path
+            for path in sorted(self.templates_dir.iterdir())
+            if path.suffix in TEMPLATE_SUFFIXES and path.is_file()
+        ]
+        self._templates = {
+            path: template
+            for path, template in self._templates.items()
+            if path in paths
+        }
+        self._index = {}
+        for path in paths:
+            template = self._load(path)
+            if template:
+                self._register(path, template)
+        self._dir_mtime = dir_mtime
+        logger.info(f"Indexed {len(self._templates)} templates from {self.templates_dir}")
+
+    def _register(self, path: Path, template: CompiledTemplate) -> None:
+        """Add a template to the ID index."""
+        for template_id in template.ids:
+            existing = self._index.get(template_id)
+            if existing and existing != path:
+                logger.warning(
+                    f"Template ID {template_id} is defined by both "
+                    f"{existing.name} and {path.name}; using {existing.name}"
+                )
+                continue
+            self._index[template_id] = path
+
+    def _load(self, path: Path) -> Optional[CompiledTemplate]:
+        """Return the compiled template for a file, parsing it only if it changed."""
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+
+        cached = self._templates.get(path)
+        if cached and cached.mtime == mtime:
+            return cached
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError) as e:
+            logger.warning(f"Failed to parse template {path.name}: {e}")
+            return None
+        if not isinstance(data, dict):
+            return None
+
+        ai_processing = data.get("ai_processing") or {}
+        raw_parameters = ai_processing.get("parameters") or {}
+        parameters = {
+            name: raw_parameters[name]
+            for name in TEMPLATE_PARAMETERS
+            if raw_parameters.get(name) is not None
+        }
+
+        metadata = data.get("metadata") or data.get("meta") or {}
+        template = CompiledTemplate(
+            ids=_template_ids(path, data),
+            name=str(
+                metadata.get("name")
+                or data.get("template_name")
+                or data.get("persona_name")
+                or path.stem
+            ),
+            path=path,
+            mtime=mtime,
+            system_prompt=_compile_system_prompt(data),
+            parameters=parameters,
+        )
+        self._templates[path] = template
+        return template
+
+    def get(self, template_id: str) -> Optional[CompiledTemplate]:
+        """
+        Get a compiled template by ID.
+
+        Args:
+            template_id: Template file name without extension, or the ID declared
+                in the template's metadata
+
+        Returns:
+            Compiled template or None if not found
+        """
+        self._refresh_index()
+        path = self._index.get(template_id)
+        if not path:
+            return None
+
+        template = self._load(path)
+        if template and template_id not in template.ids:
+            # The file was edited and no longer declares this ID, so reindex
+            self._dir_mtime = None
+            self._refresh_index()
+            path = self._index.get(template_id)
+            template = self._templates.get(path) if path else None
+        return template
+
+    def list_templates(self) -> List[Tuple[str, str]]:
+        """
+        List the available templates.
+
+        Returns:
+            List of (template_id, name) tuples
+        """
+        self._refresh_index()
+        return sorted(
+            (template.template_id, template.name)
+            for template in self._templates.values()
+        )
@@ -46,3 +46,8 @@ class Settings(BaseSettings):
 
 # Create a singleton settings instance
 settings = Settings()
+
+
+def get_settings() -> Settings:
+    """Get the application settings singleton."""
+    return settings
@@ -0,0 +1,277 @@
+"""
+Token Estimation Utilities
+
+This module estimates token counts locally, without a tokenizer or a network
+call, so requests can be budgeted and priced before they are sent. Text is
+classified in a single regex pass into word, number, CJK, symbol and newline
+runs, each weighted by how subword tokenizers typically split them; this keeps
+estimates reasonable for prose, source code and CJK text alike.
+
+Raw estimates are calibrated per provider from the real usage numbers the
+providers report, and the observed completion share of total tokens is
+tracked per provider for cost estimation.
+
+Author: Rip Jonesy
+"""
+
+import json
+import math
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# One alternation per character class; the first matching group wins
+_TOKEN_CLASSES = re.compile(
+    r"(?P<cjk>[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]+)"
+    r"|(?P<word>[A-Za-z]+)"
+    r"|(?P<number>[0-9]+)"
+    r"|(?P<newline>\n+)"
+    r"|(?P<space>[ \t\r\f\v]+)"
+    r"|(?P<other_letter>[^\W\d_]+)"
+    r"|(?P<symbol>[^\sA-Za-z0-9]+)"
+)
+
+# Characters that typically merge into one token, per class
+WORD_CHARS_PER_TOKEN = 4.0
+DIGITS_PER_TOKEN = 3.0
+CJK_TOKENS_PER_CHAR = 1.0
+OTHER_LETTER_CHARS_PER_TOKEN = 2.0
+
+# Chat format overhead (role markers and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 3
+
+# Default share of completion tokens in a request's total (70/30 split)
+DEFAULT_COMPLETION_SHARE = 0.3
+
+# Calibration smoothing and bounds
+CALIBRATION_ALPHA = 0.1
+MIN_CALIBRATION_SAMPLE_TOKENS = 20
+MIN_SCALE, MAX_SCALE = 0.5, 2.0
+
+
+def _provider_key(provider: Any) -> str:
+    """Normalize a provider enum or name to a lookup key."""
+    return str(getattr(provider, "value", provider) or "").lower()
+
+
+def _raw_text_tokens(text: str) -> float:
+    """Estimate the tokens of a text before provider calibration."""
+    tokens = 0.0
+    for match in _TOKEN_CLASSES.finditer(text):
+        kind = match.lastgroup
+        length = match.end() - match.start()
+        if kind == "word":
+            # Short words are one token; long words split into subwords
+            tokens += max(1.0, length / WORD_CHARS_PER_TOKEN)
+        elif kind == "symbol":
+            # Punctuation and code operators are mostly one token per character
+            tokens += length
+        elif kind == "cjk":
+            tokens += length * CJK_TOKENS_PER_CHAR
+        elif kind == "number":
+            tokens += math.ceil(length / DIGITS_PER_TOKEN)
+        elif kind == "newline":
+            tokens += 1
+        elif kind == "other_letter":
+            tokens += max(1.0, length / OTHER_LETTER_CHARS_PER_TOKEN)
+        elif length > 1:
+            # Runs of spaces (indentation) become their own tokens
+            tokens += length / WORD_CHARS_PER_TOKEN
+    return tokens
+
+
+def _message_text(message: Any) -> str:
+    """Get the text of a chat message or other content item."""
+    if isinstance(message, dict):
+        content = message.get("content", "")
+        return content if isinstance(content, str) else json.dumps(content)
+    return message if isinstance(message, str) else str(message)
+
+
+class TokenEstimator:
+    """
+    Tokenizer-free token estimator with per-provider calibration.
+
+    Each provider gets a scale factor (actual / estimated prompt tokens) and a
+    completion share, both tracked as exponential moving averages of the usage
+    the provider reports.
+    """
+
+    def __init__(self):
+        """Initialize the estimator with uncalibrated providers."""
+        self._scales: Dict[str, float] = {}
+        self._completion_shares: Dict[str, float] = {}
+        self._samples: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def scale(self, provider: Any = None) -> float:
+        """
+        Get the calibration factor for a provider.
+
+        Args:
+            provider: Provider enum or name (None for uncalibrated)
+
+        Returns:
+            Multiplier applied to raw estimates
+        """
+        if provider is None:
+            return 1.0
+        return self._scales.get(_provider_key(provider), 1.0)
+
+    def estimate_text(self, text: str, provider: Any = None) -> int:
+        """
+        Estimate the tokens of a text.
+
+        Args:
+            text: Text to estimate
+            provider: Provider to calibrate for
+
+        Returns:
+            Estimated token count
+        """
+        if not text:
+            return 0
+        return math.ceil(_raw_text_tokens(text) * self.scale(provider))
+
+    def estimate_batch(
+        self, texts: Iterable[str], provider: Any = None
+    ) -> List[int]:
+        """
+        Estimate the tokens of many texts at once.
+
+        Args:
+            texts: Texts to estimate
+            provider: Provider to calibrate for
+
+        Returns:
+            Estimated token count of each text, in order
+        """
+        scale = self.scale(provider)
+        return [
+            math.ceil(_raw_text_tokens(text) * scale) if text else 0 for text in texts
+        ]
+
+    def estimate_messages(
+        self, messages: List[Any], provider: Any = None
+    ) -> int:
+        """
+        Estimate the prompt tokens of a list of chat messages.
+
+        Args:
+            messages: Chat messages ({"role", "content"} dicts) or plain items
+            provider: Provider to calibrate for
+
+        Returns:
+            Estimated prompt token count including chat format overhead
+        """
+        counts = self.estimate_batch(
+            (_message_text(message) for message in messages), provider
+        )
+        return (
+            sum(counts) + MESSAGE_OVERHEAD_TOKENS * len(counts) + REPLY_PRIMING_TOKENS
+        )
+
+    def estimate_content(
+        self,
+        content: Union[str, Dict[str, Any], List[Any]],
+        provider: Any = None,
+    ) -> int:
+        """
+        Estimate the prompt tokens of request content in any supported shape.
+
+        Args:
+            content: Text, message list or {"messages": [...]} content
+            provider: Provider to calibrate for
+
+        Returns:
+            Estimated prompt token count
+        """
+        if isinstance(content, str):
+            return self.estimate_text(content, provider)
+        if isinstance(content, dict):
+            if isinstance(content.get("messages"), list):
+                return self.estimate_messages(content["messages"], provider)
+            return self.estimate_text(json.dumps(content), provider)
+        return self.estimate_messages(list(content), provider)
+
+    def completion_share(self, provider: Any = None) -> float:
+        """
+        Get the typical share of completion tokens in a provider's total usage.
+
+        Args:
+            provider: Provider enum or name
+
+        Returns:
+            Completion share between 0 and 1
+        """
+        if provider is None:
+            return DEFAULT_COMPLETION_SHARE
+        return self._completion_shares.get(
+            _provider_key(provider), DEFAULT_COMPLETION_SHARE
+        )
+
+    def observe(
+        self,
+        provider: Any,
+        estimated_prompt_tokens: Optional[int] = None,
+        actual_prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+    ) -> None:
+        """
+        Calibrate a provider from the usage it reported for a request.
+
+        Args:
+            provider: Provider enum or name
+            estimated_prompt_tokens: Uncalibrated estimate of the prompt tokens
+            actual_prompt_tokens: Prompt tokens reported by the provider
+            completion_tokens: Completion tokens reported by the provider
+        """
+        key = _provider_key(provider)
+        with self._lock:
+            if (
+                estimated_prompt_tokens
+                and actual_prompt_tokens
+                and estimated_prompt_tokens >= MIN_CALIBRATION_SAMPLE_TOKENS
+            ):
+                ratio = actual_prompt_tokens / estimated_prompt_tokens
+                ratio = min(MAX_SCALE, max(MIN_SCALE, ratio))
+                current = self._scales.get(key)
+                self._scales[key] = (
+                    ratio
+                    if current is None
+                    else current + CALIBRATION_ALPHA * (ratio - current)
+                )
+                self._samples[key] = self._samples.get(key, 0) + 1
+
+            if actual_prompt_tokens and completion_tokens is not None:
+                share = completion_tokens / (actual_prompt_tokens + completion_tokens)
+                current = self._completion_shares.get(key, DEFAULT_COMPLETION_SHARE)
+                self._completion_shares[key] = current + CALIBRATION_ALPHA * (
+                    share - current
+                )
+
+    def get_calibration(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the current calibration of every observed provider.
+
+        Returns:
+            Dictionary keyed by provider with scale, completion share and samples
+        """
+        return {
+            key: {
+                "scale": self._scales.get(key, 1.0),
+                "completion_share": self.completion_share(key),
+                "samples": self._samples.get(key, 0),
+            }
+            for key in set(self._scales) | set(self._completion_shares)
+        }
+
+
+# Process-wide estimator shared by AutoModel and ModelSwapper
+token_estimator = TokenEstimator()
+
+
+def get_token_estimator() -> TokenEstimator:
+    """Get the shared token estimator."""
+    return token_estimator
@@ -14,7 +14,7 @@ import uuid
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field, SecretStr, HttpUrl, constr, validator
 
@@ -331,8 +331,13 @@ class ModelSelectionRequest(BaseModel):
     user_tier: UserTier = Field(..., description="User subscription tier")
 
     # Content details
-    estimated_tokens: int = Field(
-        ..., description="Estimated token count for cost calculation"
+    content: Optional[Union[str, List[Dict[str, Any]]]] = Field(
+        None,
+        description="Prompt text or chat messages; when given, tokens are "
+        "estimated server-side and estimated_tokens is ignored",
+    )
+    estimated_tokens: Optional[int] = Field(
+        None, description="Estimated token count for cost calculation"
     )
     priority: ModelPriority = Field(default=ModelPriority.MEDIUM)
 
@@ -362,6 +367,12 @@ class ModelSelectionRequest(BaseModel):
         default=False, description="Use user's own API keys if available"
     )
 
+    @validator("estimated_tokens", always=True)
+    def _require_token_source(cls, v: Optional[int], values: Dict[str, Any]) -> Optional[int]:  # noqa: N805
+        if v is None and values.get("content") is None:
+            raise ValueError("Either content or estimated_tokens must be provided")
+        return v
+
 
 class ModelSelectionResponse(BaseModel):
     """Response with selected model and security/cost information."""
@@ -456,7 +467,7 @@ class UsageStatsResponse(BaseModel):
 # -----------------------------------------------------------
 _NameStr = constr(min_length=3, max_length=50)
 # 20+ url-safe chars (basic sanity check – adjust if stricter format desired)
-_ApiKeyStr = constr(regex=r"^[A-Za-z0-9_\-]{20,}$")
+_ApiKeyStr = constr(pattern=r"^[A-Za-z0-9_\-]{20,}$")
 
 
 class CreateProviderConfigRequest(BaseModel):
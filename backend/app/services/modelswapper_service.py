@@ -22,6 +22,7 @@ Author: Rip Jonesy
 """
 
 import logging
+import math
 from datetime import datetime
 from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple
@@ -37,6 +38,7 @@ from app.models.mswap_models import (
     ModelSelectionResponse,
 )
 from app.core.config import get_settings
+from app.core.token_estimator import get_token_estimator
 
 logger = logging.getLogger("chatchonk.modelswapper")
 
@@ -215,12 +217,13 @@ class ModelSwapperService:
             )
 
     def _calculate_cost(
-        self, model: Model, estimated_tokens: int
+        self, model: Model, estimated_tokens: int, provider_type: Optional[str] = None
     ) -> Tuple[Decimal, Dict[str, Decimal]]:
         """Calculate detailed cost breakdown for a model and token count."""
-        # Assume 70% prompt tokens, 30% completion tokens (typical ratio)
-        prompt_tokens = int(estimated_tokens * 0.7)
-        completion_tokens = int(estimated_tokens * 0.3)
+        # Split by the provider's observed completion share (70/30 until calibrated)
+        completion_share = get_token_estimator().completion_share(provider_type)
+        completion_tokens = int(estimated_tokens * completion_share)
+        prompt_tokens = estimated_tokens - completion_tokens
 
         prompt_cost = (prompt_tokens / 1000) * model.cost_per_1k_prompt_tokens
         completion_cost = (
@@ -238,6 +241,22 @@ class ModelSwapperService:
 
         return total_cost, breakdown
 
+    def _estimate_request_cost(
+        self, model: Model, request: ModelSelectionRequest
+    ) -> Tuple[Decimal, Dict[str, Decimal]]:
+        """Estimate the cost of a selection request on a model without a network call."""
+        provider_type = model.metadata.get("provider_type")
+        if request.content is not None:
+            # Estimate the prompt locally and extrapolate the expected completion
+            estimator = get_token_estimator()
+            prompt_tokens = estimator.estimate_content(request.content, provider_type)
+            estimated_tokens = math.ceil(
+                prompt_tokens / (1.0 - estimator.completion_share(provider_type))
+            )
+        else:
+            estimated_tokens = request.estimated_tokens
+        return self._calculate_cost(model, estimated_tokens, provider_type)
+
     # === Model Selection ===
     async def select_best_model(
         self, request: ModelSelectionRequest
@@ -280,8 +299,8 @@ class ModelSwapperService:
 
             # Step 4: Select best model and calculate costs
             best_model = scored_models[0]
-            estimated_cost, cost_breakdown = self._calculate_cost(
-                best_model, request.estimated_tokens
+            estimated_cost, cost_breakdown = self._estimate_request_cost(
+                best_model, request
             )
 
             # Step 5: Check spending limits BEFORE proceeding
@@ -361,9 +380,7 @@ class ModelSwapperService:
 
             # Check cost limits
             if request.max_cost:
-                estimated_cost, _ = self._calculate_cost(
-                    model, request.estimated_tokens
-                )
+                estimated_cost, _ = self._estimate_request_cost(model, request)
                 if estimated_cost > request.max_cost:
                     continue
 
@@ -389,7 +406,7 @@ class ModelSwapperService:
             score += latency_score
 
             # Cost score (0-30 points, lower cost is better)
-            estimated_cost, _ = self._calculate_cost(model, request.estimated_tokens)
+            estimated_cost, _ = self._estimate_request_cost(model, request)
             max_cost = Decimal("1.00")  # $1 as reference
             cost_score = max(0, 30 - (float(estimated_cost) / float(max_cost) * 30))
             score += cost_score
@@ -424,7 +441,7 @@ class ModelSwapperService:
         reasons.append(f"reliability: {model.reliability}")
         reasons.append(f"avg latency: {model.avg_latency}ms")
 
-        estimated_cost, _ = self._calculate_cost(model, request.estimated_tokens)
+        estimated_cost, _ = self._estimate_request_cost(model, request)
         reasons.append(f"estimated cost: ${estimated_cost}")
 
         if request.priority == ModelPriority.HIGH:
@@ -9,6 +9,7 @@ Author: Rip Jonesy
 
 import logging
 import os
+import sys
 import time
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -28,8 +29,15 @@ from fastapi.staticfiles import StaticFiles
 # Load environment variables from .env file
 load_dotenv()
 
+# Application modules import each other from the "app" package, so the backend
+# directory must be importable however the server is started (the Docker image
+# runs "backend.main:app" from the repository root)
+backend_dir = Path(__file__).parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
 # Import application settings
-from backend.app.core.config import settings
+from app.core.config import settings
 
 # Configure logging
 logging.basicConfig(
@@ -225,9 +233,8 @@ exports_router = APIRouter(prefix=f"{settings.API_V1_STR}/exports", tags=["Expor
 app.include_router(exports_router)
 
 # AI router - handles AI processing
-ai_router = APIRouter(prefix=f"{settings.API_V1_STR}/ai", tags=["AI"])
-# TODO: Implement AI endpoints
-app.include_router(ai_router)
+from app.api.routes.ai import router as ai_router
+app.include_router(ai_router, prefix=settings.API_V1_STR)
 
 
 # Run the application if executed directly
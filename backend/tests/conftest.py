@@ -0,0 +1,169 @@
+"""
+Shared fixtures for the backend tests.
+
+Provides fake providers with scripted latency and failures, and a model
+registry built from them, so routing and AutoModel can be tested without
+calling any provider API.
+
+Author: Rip Jonesy
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+# Tests import the application from the "app" package, as main.py does
+backend_dir = Path(__file__).parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+# Settings refuse to load without a secret key
+os.environ.setdefault("CHONK_SECRET_KEY", "test-secret-key")
+
+from app.automodel import ProviderType, TaskType  # noqa: E402
+from app.automodel.automodel import AutoModel  # noqa: E402
+from app.automodel.metrics_store import MetricsRingBuffer  # noqa: E402
+from app.automodel.model_registry import ModelRegistry  # noqa: E402
+from app.automodel.providers.base import (  # noqa: E402
+    BaseProvider,
+    Model,
+    ProviderResponse,
+)
+from app.automodel.scheduler import RequestScheduler  # noqa: E402
+from app.automodel.session_store import SessionStore  # noqa: E402
+from app.automodel.task_router import TaskRouter  # noqa: E402
+
+
+class FakeProvider(BaseProvider):
+    """Provider with one model that answers after a fixed delay."""
+
+    def __init__(
+        self,
+        provider_type: ProviderType,
+        delay: float = 0.0,
+        error: Optional[Exception] = None,
+        reply: Optional[str] = None,
+        max_tokens: int = 8000,
+        **model_fields: Any,
+    ):
+        """
+        Initialize the provider.
+
+        Args:
+            provider_type: Provider type to pose as
+            delay: Seconds each call takes
+            error: Exception each call raises after the delay, if any
+            reply: Fixed response content; by default the content is echoed
+            max_tokens: Context size of the provider's model
+            **model_fields: Further fields of the provider's model
+        """
+        super().__init__(api_key="test-key")
+        self._provider_type = provider_type
+        self.delay = delay
+        self.error = error
+        self.reply = reply
+        self.calls: List[Dict[str, Any]] = []
+        self.cancelled = 0
+        self._is_initialized = True
+
+        fields = {"priority_score": 5.0, "supported_tasks": set(TaskType)}
+        fields.update(model_fields)
+        self.model = Model(
+            id=f"{provider_type.value}-model",
+            name=f"{provider_type.value} model",
+            provider=provider_type,
+            max_tokens=max_tokens,
+            **fields,
+        )
+        self._models[self.model.id] = self.model
+
+    @property
+    def provider_type(self) -> ProviderType:
+        return self._provider_type
+
+    @property
+    def name(self) -> str:
+        return self._provider_type.value
+
+    async def initialize(self) -> None:
+        pass
+
+    async def process(self, task_type, model_id, content, **kwargs) -> ProviderResponse:
+        self.calls.append({"task_type": task_type, "content": content, **kwargs})
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return ProviderResponse(
+            content=self.reply if self.reply is not None else f"{self.name}: {content}",
+            model_id=model_id,
+            tokens_used=10,
+        )
+
+
+class FakeCache:
+    """In-memory stand-in for the cache service."""
+
+    def __init__(self):
+        self.entries: Dict[str, Any] = {}
+        self.writes = 0
+
+    async def get(self, key: str) -> Any:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self.writes += 1
+        self.entries[key] = value
+
+
+@pytest.fixture
+def make_registry():
+    """Build an initialized model registry serving the given fake providers."""
+    registries: List[ModelRegistry] = []
+
+    def _make(*providers: FakeProvider, **config: Any) -> ModelRegistry:
+        registry = ModelRegistry(config)
+        for provider in providers:
+            registry._providers[provider.provider_type] = provider
+            registry._register_models(provider)
+            registry._set_provider_health(provider.provider_type, True)
+            # Recently checked, so the health monitor leaves them alone
+            registry._last_health_check[provider.provider_type] = datetime.now()
+        registry._is_initialized = True
+        registries.append(registry)
+        return registry
+
+    yield _make
+
+    for registry in registries:
+        if registry._monitor_task:
+            registry._monitor_task.cancel()
+
+
+@pytest.fixture
+def automodel(make_registry, monkeypatch):
+    """Install fake providers (and optionally a cache) into AutoModel."""
+
+    def _install(*providers: FakeProvider, cache: Optional[FakeCache] = None) -> TaskRouter:
+        registry = make_registry(*providers)
+        router = TaskRouter(registry)
+        monkeypatch.setattr(AutoModel, "_initialized", True)
+        monkeypatch.setattr(AutoModel, "_model_registry", registry)
+        monkeypatch.setattr(AutoModel, "_task_router", router)
+        monkeypatch.setattr(AutoModel, "_cache_service", cache)
+        monkeypatch.setattr(AutoModel, "_semantic_cache", None)
+        monkeypatch.setattr(AutoModel, "_in_flight", {})
+        monkeypatch.setattr(AutoModel, "_scheduler", RequestScheduler())
+        monkeypatch.setattr(AutoModel, "_active_sessions", SessionStore())
+        monkeypatch.setattr(AutoModel, "_performance_metrics", MetricsRingBuffer())
+        return router
+
+    return _install
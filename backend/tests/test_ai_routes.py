@@ -0,0 +1,90 @@
+"""
+Tests for the AI API routes: request priority, server-set request fields and
+batch limits.
+
+Author: Rip Jonesy
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from app.automodel import ModelPriority, ProviderType, TaskType
+from app.automodel.automodel import AutoModel
+from app.models.mswap_models import UserTier
+
+# The routes create the Supabase client through the auth dependencies
+try:
+    from app.api.routes.ai import (
+        MAX_BATCH_SIZE,
+        AIProcessRequest,
+        BatchProcessRequest,
+        _build_request,
+        _provider_concurrency,
+        _request_priority,
+    )
+except (ImportError, ValueError) as e:
+    pytest.skip(f"API routes need a configured Supabase client: {e}", allow_module_level=True)
+
+
+# === Priority ===
+def test_batch_work_runs_at_low_priority():
+    assert _request_priority(UserTier.MEOWTRIX, interactive=False) == ModelPriority.LOW
+
+
+def test_interactive_priority_depends_on_the_tier():
+    assert _request_priority(UserTier.FREE, interactive=True) == ModelPriority.MEDIUM
+    assert _request_priority(UserTier.CLAWBACK, interactive=True) == ModelPriority.HIGH
+
+
+def test_scheduling_fields_come_from_the_session():
+    body = AIProcessRequest(task_type=TaskType.CHAT, content="hi", session_id="s1")
+
+    request = _build_request(body, {"user_id": "u1", "tier": "bigchonk"}, interactive=True)
+
+    assert request.user_id == "u1"
+    assert request.user_tier == UserTier.BIGCHONK
+    assert request.priority == ModelPriority.HIGH
+    assert request.session_id == "u1:s1"
+
+
+def test_unknown_tier_is_treated_as_free():
+    body = AIProcessRequest(task_type=TaskType.CHAT, content="hi")
+
+    request = _build_request(body, {"user_id": "u1", "tier": "platinum"}, interactive=True)
+
+    assert request.user_tier == UserTier.FREE
+    assert request.priority == ModelPriority.MEDIUM
+
+
+
+def test_only_parameters_the_client_sent_are_set():
+    body = AIProcessRequest(task_type=TaskType.CHAT, content="hi", temperature=0.7)
+
+    request = _build_request(body, {"user_id": "u1", "tier": "free"}, interactive=True)
+
+    # Unset parameters are left for templates to fill in
+    assert "temperature" in request.model_fields_set
+    assert "top_p" not in request.model_fields_set
+
+# === Batch limits ===
+def test_provider_concurrency_is_capped_at_the_server_limit():
+    limit = AutoModel.DEFAULT_PROVIDER_CONCURRENCY
+
+    clamped = _provider_concurrency(
+        {ProviderType.OPENAI: 10_000, ProviderType.ANTHROPIC: 2, ProviderType.MISTRAL: 0}
+    )
+
+    assert clamped == {
+        ProviderType.OPENAI: limit,
+        ProviderType.ANTHROPIC: 2,
+        ProviderType.MISTRAL: 1,
+    }
+
+
+def test_max_in_flight_is_bounded():
+    request = AIProcessRequest(task_type=TaskType.CHAT, content="hi")
+
+    with pytest.raises(ValidationError):
+        BatchProcessRequest(requests=[request], max_in_flight=0)
+    with pytest.raises(ValidationError):
+        BatchProcessRequest(requests=[request], max_in_flight=MAX_BATCH_SIZE + 1)
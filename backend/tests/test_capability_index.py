@@ -0,0 +1,167 @@
+"""
+Tests for the bitset capability index.
+
+Author: Rip Jonesy
+"""
+
+import random
+from typing import Any, Dict, List, Optional, Set
+
+import pytest
+
+from app.automodel import ProviderType, TaskType
+from app.automodel.capability_index import CapabilityIndex
+from app.automodel.providers.base import Model
+
+
+def _scan(
+    models: List[Model],
+    healthy: Set[ProviderType],
+    task_type: TaskType,
+    excluded: Set[ProviderType],
+    requirements: Dict[str, Any],
+) -> List[str]:
+    """Reference result: a linear scan with the original requirement checks."""
+    result = []
+    for model in models:
+        if (
+            task_type not in model.supported_tasks
+            or not model.is_available
+            or model.provider not in healthy
+            or model.provider in excluded
+        ):
+            continue
+        meets = True
+        for key, value in requirements.items():
+            if key == "min_max_tokens" and model.max_tokens < value:
+                meets = False
+            elif key == "supports_vision" and value and not model.supports_vision:
+                meets = False
+            elif key == "supports_functions" and value and not model.supports_functions:
+                meets = False
+            elif key == "supports_streaming" and value and not model.supports_streaming:
+                meets = False
+            elif (
+                key == "max_cost_per_1k_tokens"
+                and model.cost_per_1k_tokens
+                and model.cost_per_1k_tokens > value
+            ):
+                meets = False
+        if meets:
+            result.append(model.id)
+    return result
+
+
+def _random_model(rng: random.Random, model_id: str) -> Model:
+    cost: Optional[float] = rng.choice([None, 0.0, 0.5, 1.0, 2.0, 10.0])
+    return Model(
+        id=model_id,
+        name=model_id,
+        provider=rng.choice(list(ProviderType)),
+        max_tokens=rng.choice([2048, 4096, 8192, 32000, 128000]),
+        supports_streaming=rng.random() < 0.6,
+        supports_functions=rng.random() < 0.4,
+        supports_vision=rng.random() < 0.3,
+        cost_per_1k_tokens=cost,
+        supported_tasks=set(rng.sample(list(TaskType), rng.randint(0, len(TaskType)))),
+        is_available=rng.random() < 0.9,
+    )
+
+
+def _random_requirements(rng: random.Random) -> Dict[str, Any]:
+    options = {
+        "min_max_tokens": lambda: rng.choice([1000, 4096, 10000, 100000]),
+        "supports_vision": lambda: rng.random() < 0.5,
+        "supports_functions": lambda: rng.random() < 0.5,
+        "supports_streaming": lambda: rng.random() < 0.5,
+        "max_cost_per_1k_tokens": lambda: rng.choice([0.1, 1.0, 5.0]),
+        "unknown_requirement": lambda: True,
+    }
+    keys = rng.sample(list(options), rng.randint(0, len(options)))
+    return {key: options[key]() for key in keys}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_candidates_match_a_linear_scan(seed):
+    rng = random.Random(seed)
+    index = CapabilityIndex()
+    models = {}
+    healthy: Set[ProviderType] = set()
+
+    for step in range(300):
+        action = rng.random()
+        if action < 0.3 or not models:
+            # Register a new model, or re-register an existing ID
+            model_id = f"m{rng.randint(0, 80)}"
+            model = _random_model(rng, model_id)
+            models[model_id] = model
+            index.add(model)
+        elif action < 0.4:
+            provider_type = rng.choice(list(ProviderType))
+            is_healthy = rng.random() < 0.7
+            (healthy.add if is_healthy else healthy.discard)(provider_type)
+            index.set_provider_health(provider_type, is_healthy)
+        elif action < 0.5:
+            model = models[rng.choice(list(models))]
+            model.is_available = rng.random() < 0.7
+            index.set_model_available(model.id, model.is_available)
+        else:
+            task_type = rng.choice(list(TaskType))
+            excluded = set(rng.sample(list(ProviderType), rng.randint(0, 2)))
+            requirements = _random_requirements(rng)
+
+            expected = _scan(
+                list(models.values()), healthy, task_type, excluded, requirements
+            )
+            actual = [
+                model.id
+                for model in index.candidates(task_type, excluded, requirements)
+            ]
+            # Same models; the index returns them in registration order
+            assert sorted(actual) == sorted(expected), (step, task_type, requirements)
+
+
+def test_version_changes_only_when_results_can_change():
+    index = CapabilityIndex()
+    model = Model(
+        id="m",
+        name="m",
+        provider=ProviderType.OPENAI,
+        supported_tasks={TaskType.SUMMARIZATION},
+    )
+    index.add(model)
+    version = index.version
+
+    index.set_provider_health(ProviderType.OPENAI, True)
+    assert index.version == version + 1
+    index.set_provider_health(ProviderType.OPENAI, True)
+    index.set_model_available("m", True)
+    index.set_model_available("unknown", False)
+    assert index.version == version + 1
+
+    index.set_model_available("m", False)
+    assert index.version == version + 2
+    assert index.candidates(TaskType.SUMMARIZATION) == []
+
+    index.clear()
+    assert index.version == version + 3
+    assert len(index) == 0
+
+
+def test_threshold_masks_follow_re_registered_models():
+    index = CapabilityIndex()
+    index.set_provider_health(ProviderType.OPENAI, True)
+    small = Model(
+        id="m",
+        name="m",
+        provider=ProviderType.OPENAI,
+        max_tokens=4096,
+        supported_tasks={TaskType.SUMMARIZATION},
+    )
+    index.add(small)
+    requirements = {"min_max_tokens": 8000}
+    assert index.candidates(TaskType.SUMMARIZATION, requirements=requirements) == []
+
+    large = small.model_copy(update={"max_tokens": 16000})
+    index.add(large)
+    assert index.candidates(TaskType.SUMMARIZATION, requirements=requirements) == [large]
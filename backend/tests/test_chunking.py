@@ -0,0 +1,111 @@
+"""
+Tests for chunking: token-budgeted splitting, content-defined boundaries and
+the helpers of the reduce pass.
+
+Author: Rip Jonesy
+"""
+
+from app.automodel import TaskType
+from app.automodel.chunking import (
+    build_reduce_prompt,
+    estimate_content_tokens,
+    group_partial_results,
+    is_chunkable,
+    split_content,
+)
+
+
+def _messages(count: int, words: int = 40, tag: str = "m"):
+    return [
+        {
+            "role": "user" if index % 2 == 0 else "assistant",
+            "content": f"{tag}{index} " + " ".join(f"w{index}x{word}" for word in range(words)),
+        }
+        for index in range(count)
+    ]
+
+
+# === Splitting ===
+def test_text_is_split_on_paragraphs_within_budget():
+    paragraphs = [f"p{index} " + "word " * 50 for index in range(30)]
+    content = "\n\n".join(paragraphs)
+
+    chunks = split_content(content, 300)
+
+    assert len(chunks) > 1
+    assert all(estimate_content_tokens(chunk) <= 300 for chunk in chunks)
+    assert "\n\n".join(chunks).split("\n\n") == [p for p in paragraphs]
+
+
+def test_chunks_keep_the_shape_of_the_content():
+    messages = _messages(30)
+
+    list_chunks = split_content(messages, 300)
+    dict_chunks = split_content({"messages": messages, "title": "t"}, 300)
+
+    assert [message for chunk in list_chunks for message in chunk] == messages
+    assert all(chunk["title"] == "t" for chunk in dict_chunks)
+    assert [m for chunk in dict_chunks for m in chunk["messages"]] == messages
+
+
+def test_oversized_messages_are_split_into_pieces():
+    message = {"role": "user", "content": "word " * 2000}
+
+    chunks = split_content([message], 200)
+
+    assert len(chunks) > 1
+    # Pieces are cut by characters, so a word cut in two may add a token
+    assert all(estimate_content_tokens(chunk) <= 205 for chunk in chunks)
+    assert "".join(m["content"] for chunk in chunks for m in chunk) == message["content"]
+    assert all(m["role"] == "user" for chunk in chunks for m in chunk)
+
+
+def test_non_message_items_are_chunked_as_user_messages():
+    content = {"messages": [{"role": "user", "content": "hi"}, 42, ["a", "b"], "plain"]}
+
+    assert is_chunkable(content)
+    [chunk] = split_content(content, 1000)
+
+    assert chunk["messages"][1:] == [
+        {"role": "user", "content": "42"},
+        {"role": "user", "content": "['a', 'b']"},
+        {"role": "user", "content": "plain"},
+    ]
+    assert estimate_content_tokens(content) > 0
+
+
+def test_only_text_and_chat_content_is_chunkable():
+    assert is_chunkable("text")
+    assert is_chunkable([{"role": "user", "content": "hi"}])
+    assert not is_chunkable({"prompt": "no messages"})
+
+
+def test_an_edit_only_changes_the_chunks_around_it():
+    messages = _messages(400, words=3)
+    before = split_content(messages, 1000)
+
+    edited = list(messages)
+    edited[200] = {"role": "user", "content": "an edited message"}
+    after = split_content(edited, 1000)
+
+    unchanged = [chunk for chunk in after if chunk in before]
+    assert len(before) > 5
+    assert len(unchanged) >= len(before) - 2
+
+
+# === Reduce helpers ===
+def test_partial_results_are_grouped_within_budget():
+    results = ["word " * 40 for _ in range(10)]
+
+    batches = group_partial_results(results, 120)
+
+    assert [result for batch in batches for result in batch] == results
+    assert all(len(batch) == 2 for batch in batches)
+
+
+def test_reduce_prompt_numbers_the_parts():
+    prompt = build_reduce_prompt(TaskType.TOPIC_EXTRACTION, ["a", {"topics": ["b"]}])
+
+    assert prompt.startswith("The following are topics")
+    assert "## Part 1 of 2\na" in prompt
+    assert '## Part 2 of 2\n{"topics": ["b"]}' in prompt
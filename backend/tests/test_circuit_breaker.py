@@ -0,0 +1,234 @@
+"""
+Tests for the circuit breaker and how routing feeds it.
+
+Author: Rip Jonesy
+"""
+
+import httpx
+import pytest
+
+from app.automodel import ProviderApiError, ProviderType, TaskType
+from app.automodel.circuit_breaker import CircuitBreaker, CircuitState
+from app.automodel.task_router import TaskRouter
+
+from tests.conftest import FakeProvider
+
+
+class _Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        "test",
+        failure_threshold=3,
+        error_rate_threshold=0.5,
+        window_size=10,
+        min_requests=6,
+        open_seconds=10.0,
+        max_open_seconds=35.0,
+        half_open_trials=1,
+        clock=clock,
+    )
+
+
+def _trip(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record(False)
+
+
+# === State machine ===
+def test_consecutive_failures_open_the_circuit(breaker):
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record(False)
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.available()
+    assert not breaker.acquire()
+
+
+def test_success_resets_the_consecutive_failure_count(breaker):
+    for success in (False, False, True, False, False):
+        breaker.record(success)
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.get_stats()["consecutive_failures"] == 2
+
+
+def test_error_rate_opens_the_circuit_after_min_requests(breaker):
+    for success in (True, False, True, False, True):
+        breaker.record(success)
+    assert breaker.state == CircuitState.CLOSED
+
+    # Sixth outcome: 3 of 6 failed, at the 50% threshold
+    breaker.record(False)
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_error_rate_below_threshold_keeps_the_circuit_closed(breaker):
+    for success in (True, True, False) * 4:
+        breaker.record(success)
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_open_circuit_turns_half_open_after_the_open_period(breaker, clock):
+    _trip(breaker)
+    assert breaker.retry_after() == pytest.approx(10.0)
+
+    clock.now += 9.9
+    assert breaker.state == CircuitState.OPEN
+    clock.now += 0.1
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.retry_after() is None
+
+
+def test_half_open_allows_limited_trials(breaker, clock):
+    _trip(breaker)
+    clock.now += 10
+
+    assert breaker.acquire()
+    assert not breaker.available()
+    assert not breaker.acquire()
+
+    # A trial that ends without an outcome gives its slot back
+    breaker.release()
+    assert breaker.acquire()
+
+
+def test_successful_trial_closes_the_circuit(breaker, clock):
+    _trip(breaker)
+    clock.now += 10
+    assert breaker.acquire()
+
+    breaker.record(True)
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.get_stats()["consecutive_failures"] == 0
+    assert breaker.get_stats()["recent_error_rate"] == 0.0
+
+
+def test_failed_trial_reopens_with_backoff_up_to_the_maximum(breaker, clock):
+    _trip(breaker)
+    durations = []
+    for _ in range(4):
+        clock.now += breaker.retry_after()
+        assert breaker.acquire()
+        breaker.record(False)
+        assert breaker.state == CircuitState.OPEN
+        durations.append(breaker.retry_after())
+
+    assert durations == [20.0, 35.0, 35.0, 35.0]
+    assert breaker.get_stats()["times_opened"] == 5
+
+
+def test_backoff_resets_once_closed(breaker, clock):
+    _trip(breaker)
+    clock.now += 10
+    breaker.acquire()
+    breaker.record(False)
+    clock.now += 20
+    breaker.acquire()
+    breaker.record(True)
+
+    _trip(breaker)
+    assert breaker.retry_after() == pytest.approx(10.0)
+
+
+def test_outcomes_arriving_while_open_are_ignored(breaker, clock):
+    _trip(breaker)
+    breaker.record(True)
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now += 10
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+# === Routing ===
+def _http_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://provider.test")
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(status_code, request=request)
+    )
+
+
+def _attempt(provider, model):
+    return provider.process(
+        task_type=TaskType.SUMMARIZATION, model_id=model.id, content="hello"
+    )
+
+
+@pytest.fixture
+def circuit_config():
+    return {"failure_threshold": 2, "min_requests": 100, "open_seconds": 60.0}
+
+
+@pytest.mark.asyncio
+async def test_provider_failures_open_the_circuit(make_registry, circuit_config):
+    failing = FakeProvider(ProviderType.OPENAI, error=_http_error(503))
+    fallback = FakeProvider(ProviderType.ANTHROPIC)
+    registry = make_registry(failing, fallback, circuit_breaker=circuit_config)
+    router = TaskRouter(registry)
+    models = [failing.model, fallback.model]
+
+    for _ in range(2):
+        await router.execute_with_failover(TaskType.SUMMARIZATION, models, _attempt)
+    assert len(failing.calls) == 2
+    assert not registry.is_circuit_closed(failing.model)
+
+    # The open circuit is skipped without calling the provider
+    await router.execute_with_failover(TaskType.SUMMARIZATION, models, _attempt)
+    assert len(failing.calls) == 2
+    assert failing.model not in registry.get_models_for_task(TaskType.SUMMARIZATION)
+
+
+@pytest.mark.asyncio
+async def test_rejected_requests_do_not_open_the_circuit(make_registry, circuit_config):
+    rejecting = FakeProvider(ProviderType.OPENAI, error=_http_error(400))
+    registry = make_registry(rejecting, circuit_breaker=circuit_config)
+    router = TaskRouter(registry)
+
+    for _ in range(5):
+        with pytest.raises(ProviderApiError):
+            await router.execute_with_failover(
+                TaskType.SUMMARIZATION, [rejecting.model], _attempt
+            )
+
+    assert registry.is_circuit_closed(rejecting.model)
+    assert registry.get_latency_stats(rejecting.model.id) is None
+
+
+@pytest.mark.asyncio
+async def test_half_open_trial_slot_is_released_without_an_outcome(
+    make_registry, circuit_config
+):
+    rejecting = FakeProvider(ProviderType.OPENAI, error=_http_error(400))
+    registry = make_registry(
+        rejecting, circuit_breaker={**circuit_config, "open_seconds": 0.0}
+    )
+    router = TaskRouter(registry)
+    for _ in range(2):
+        registry.update_model_metrics(rejecting.model.id, success=False, response_time=1.0)
+
+    # Half-open: a rejected trial says nothing about the model and frees its slot
+    for _ in range(3):
+        with pytest.raises(ProviderApiError):
+            await router.execute_with_failover(
+                TaskType.SUMMARIZATION, [rejecting.model], _attempt
+            )
+    assert len(rejecting.calls) == 3
+    assert registry.is_circuit_closed(rejecting.model)
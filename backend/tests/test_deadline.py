@@ -0,0 +1,167 @@
+"""
+Tests for per-request deadlines: nested scopes, enforcement, inheritance by
+tasks, and one budget shared by the cache lookup, failover and the
+provider's HTTP timeout.
+
+Author: Rip Jonesy
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.automodel import DeadlineExceededError, ProviderType, TaskType
+from app.automodel import deadline
+from app.automodel.automodel import AutoModel
+
+from tests.conftest import FakeCache, FakeProvider
+
+
+class _SlowCache(FakeCache):
+    """Cache whose lookups hang."""
+
+    async def get(self, key):
+        await asyncio.sleep(1.0)
+
+
+class _TimedProvider(FakeProvider):
+    """Provider that records the HTTP timeout it would use."""
+
+    def __init__(self, provider_type, **kwargs):
+        super().__init__(provider_type, **kwargs)
+        self.timeouts = []
+
+    async def process(self, task_type, model_id, content, **kwargs):
+        self.timeouts.append(self._request_timeout())
+        return await super().process(task_type, model_id, content, **kwargs)
+
+
+def _http_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://provider.test")
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(status_code, request=request)
+    )
+
+
+# === Scopes ===
+def test_no_deadline_by_default():
+    assert deadline.remaining() is None
+    deadline.check("anything")
+    assert deadline.http_timeout(30) == 30
+
+
+def test_nested_scopes_can_only_shorten_the_deadline():
+    with deadline.scope(0.5) as outer:
+        with deadline.scope(10.0) as inner:
+            assert inner == outer
+        with deadline.scope(None) as kept:
+            assert kept == outer
+        with deadline.scope(0.1):
+            assert deadline.remaining() <= 0.1
+        assert 0.1 < deadline.remaining() <= 0.5
+
+    assert deadline.remaining() is None
+
+
+def test_http_timeout_is_capped_by_the_deadline():
+    with deadline.scope(2.0):
+        assert deadline.http_timeout(60) <= 2.0
+        assert deadline.http_timeout(0.5) == 0.5
+        assert deadline.http_timeout(httpx.USE_CLIENT_DEFAULT) <= 2.0
+
+    with deadline.scope(0.0):
+        with pytest.raises(DeadlineExceededError):
+            deadline.http_timeout(60)
+
+
+# === Enforcement ===
+@pytest.mark.asyncio
+async def test_wait_cancels_work_past_the_deadline():
+    started = time.monotonic()
+
+    with deadline.scope(0.05):
+        with pytest.raises(DeadlineExceededError, match="during sleeping"):
+            await deadline.wait(asyncio.sleep(1.0), "sleeping")
+
+    assert time.monotonic() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_never_starts_the_work():
+    coroutine = asyncio.sleep(1.0)
+
+    with deadline.scope(0.0):
+        with pytest.raises(DeadlineExceededError, match="before sleeping"):
+            await deadline.wait(coroutine, "sleeping")
+
+    assert coroutine.cr_frame is None
+
+
+@pytest.mark.asyncio
+async def test_timeouts_raised_by_the_block_are_not_deadline_errors():
+    with deadline.scope(1.0):
+        with pytest.raises(TimeoutError):
+            async with deadline.enforce("call"):
+                raise TimeoutError()
+
+
+@pytest.mark.asyncio
+async def test_tasks_inherit_the_deadline_unless_detached():
+    async def seen():
+        return deadline.remaining()
+
+    with deadline.scope(1.0):
+        inherited = await asyncio.create_task(seen())
+        detached = await asyncio.create_task(
+            seen(), context=deadline.detached_context()
+        )
+
+    assert 0 < inherited <= 1.0
+    assert detached is None
+
+
+# === Propagation ===
+@pytest.mark.asyncio
+async def test_cache_lookup_is_bounded_by_the_request_deadline(automodel):
+    provider = FakeProvider(ProviderType.OPENAI)
+    automodel(provider, cache=_SlowCache())
+
+    with pytest.raises(DeadlineExceededError, match="cache lookup"):
+        await AutoModel.process(TaskType.SUMMARIZATION, "hello", timeout=0.05)
+
+    assert provider.calls == []
+
+
+@pytest.mark.asyncio
+async def test_failover_shares_one_budget(automodel):
+    failing = FakeProvider(ProviderType.OPENAI, delay=0.06, error=_http_error(503))
+    slow = FakeProvider(ProviderType.ANTHROPIC, delay=1.0)
+    router = automodel(failing, slow)
+    router.set_fallback_chain(
+        TaskType.SUMMARIZATION, [ProviderType.OPENAI, ProviderType.ANTHROPIC]
+    )
+    started = time.monotonic()
+
+    with pytest.raises(DeadlineExceededError):
+        await AutoModel.process(
+            TaskType.SUMMARIZATION, "hello", timeout=0.1, use_cache=False
+        )
+
+    # The fallback only gets what the first attempt left over
+    assert time.monotonic() - started < 0.3
+    assert len(slow.calls) == 1
+    assert slow.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_provider_http_timeout_follows_the_remaining_budget(automodel):
+    provider = _TimedProvider(ProviderType.OPENAI)
+    automodel(provider)
+
+    await AutoModel.process(TaskType.SUMMARIZATION, "hello", timeout=0.5, use_cache=False)
+
+    [timeout] = provider.timeouts
+    assert 0 < timeout <= 0.5
+    assert deadline.remaining() is None
@@ -0,0 +1,170 @@
+"""
+Tests for time-decayed latency statistics.
+
+Author: Rip Jonesy
+"""
+
+import math
+import random
+
+import pytest
+
+from app.automodel import ProviderType, TaskType
+from app.automodel.latency_stats import LatencyStats, _bucket, _bucket_bound
+
+from tests.conftest import FakeProvider
+
+
+class _Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def stats(clock):
+    return LatencyStats(half_life=10.0, window_seconds=60.0, window_slots=6, clock=clock)
+
+
+# === Decay ===
+def test_empty_statistics(stats):
+    assert stats.latency is None
+    assert stats.error_rate == 0.0
+    assert stats.percentile(50) is None
+    assert stats.get_stats()["p95"] is None
+
+
+def test_averages_without_elapsed_time(stats):
+    stats.record(1.0, True)
+    stats.record(3.0, True)
+    stats.record(10.0, False)
+
+    # Failures count towards the error rate but not the latency
+    assert stats.latency == pytest.approx(2.0)
+    assert stats.error_rate == pytest.approx(1 / 3)
+
+
+def test_observation_weight_halves_every_half_life(stats, clock):
+    stats.record(1.0, True)
+    clock.now += 10.0
+    stats.record(4.0, True)
+
+    # Weights 0.5 and 1
+    assert stats.latency == pytest.approx((0.5 * 1.0 + 4.0) / 1.5)
+
+
+def test_burst_of_failures_dominates_a_long_healthy_history(stats, clock):
+    for _ in range(1000):
+        stats.record(0.5, True)
+        clock.now += 1.0
+
+    for _ in range(10):
+        stats.record(0.5, False)
+
+    # A cumulative rate would be 1%; the decayed rate is past the degraded threshold
+    assert stats.error_rate > 0.25
+
+
+def test_error_rate_recovers_as_failures_age(stats, clock):
+    for _ in range(10):
+        stats.record(0.5, False)
+    clock.now += 60.0
+    for _ in range(10):
+        stats.record(0.5, True)
+
+    assert stats.error_rate == pytest.approx(1 / (1 + 2**6), rel=1e-6)
+
+
+# === Percentiles ===
+def test_bucket_bounds_contain_their_latencies():
+    for latency in (0.001, 0.01, 0.0101, 0.25, 1.0, 7.3, 120.0):
+        index = _bucket(latency)
+        assert latency <= _bucket_bound(index) * (1 + 1e-9)
+        if index:
+            assert latency > _bucket_bound(index - 1)
+
+
+def test_percentiles_match_sorted_samples_within_bucket_resolution(stats):
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(-1.0, 0.8) for _ in range(2000)]
+    for latency in samples:
+        stats.record(latency, True)
+
+    samples.sort()
+    for percentile in (50, 95, 99):
+        exact = samples[math.ceil(percentile / 100 * len(samples)) - 1]
+        estimate = stats.percentile(percentile)
+        # The estimate is the upper bound of the exact value's bucket
+        assert exact <= estimate <= exact * 1.2 + 1e-9
+
+
+def test_percentile_requires_min_samples(stats):
+    for _ in range(9):
+        stats.record(1.0, True)
+
+    assert stats.percentile(95, min_samples=10) is None
+    stats.record(1.0, True)
+    assert stats.percentile(95, min_samples=10) is not None
+
+
+def test_old_requests_leave_the_window(stats, clock):
+    for _ in range(100):
+        stats.record(5.0, True)
+    clock.now += 30.0
+    for _ in range(10):
+        stats.record(0.1, True)
+
+    assert stats.percentile(50) == pytest.approx(5.0, rel=0.2)
+
+    clock.now += 40.0
+    stats.record(0.1, True)
+    assert stats.get_stats()["window_requests"] == 11
+    assert stats.percentile(99) == pytest.approx(0.1, rel=0.2)
+
+
+def test_recycled_slot_forgets_its_previous_window(stats, clock):
+    stats.record(5.0, True)
+    clock.now += 60.0
+    stats.record(0.1, True)
+
+    assert stats.get_stats()["window_requests"] == 1
+
+
+# === Registry ===
+def test_registry_tracks_models_per_task(make_registry):
+    provider = FakeProvider(ProviderType.OPENAI)
+    registry = make_registry(provider)
+    model_id = provider.model.id
+
+    for _ in range(10):
+        registry.update_model_metrics(
+            model_id, True, 0.2, task_type=TaskType.SUMMARIZATION
+        )
+        registry.update_model_metrics(
+            model_id, False, 0.2, task_type=TaskType.TOPIC_EXTRACTION
+        )
+
+    assert registry.get_latency_stats(model_id, TaskType.SUMMARIZATION).error_rate == 0.0
+    assert registry.is_degraded(model_id, TaskType.TOPIC_EXTRACTION)
+    assert not registry.is_degraded(model_id, TaskType.SUMMARIZATION)
+    # Outcomes decay with time, so the interleaved ones are only about even
+    assert registry.get_latency_stats(model_id).error_rate == pytest.approx(0.5, abs=0.01)
+    # Tasks without requests fall back to the model's overall statistics
+    assert registry.get_latency_stats(
+        model_id, TaskType.SENSEMAKING
+    ) is registry.get_latency_stats(model_id)
+    assert registry.get_performance_factor(
+        model_id, TaskType.TOPIC_EXTRACTION
+    ) < registry.get_performance_factor(model_id, TaskType.SUMMARIZATION)
+    assert registry.get_latency_percentile(
+        model_id, 95, task_type=TaskType.SUMMARIZATION
+    ) == pytest.approx(0.2, rel=0.2)
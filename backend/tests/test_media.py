@@ -0,0 +1,141 @@
+"""
+Tests for media handling: incremental digests, chunked base64 encoding,
+streamed JSON bodies and blob-aware cache keys in process_media.
+
+Author: Rip Jonesy
+"""
+
+import base64
+import hashlib
+import json
+
+import httpx
+import pytest
+
+from app.automodel import ProviderType
+from app.automodel.automodel import AutoModel
+from app.automodel.media import (
+    MediaContent,
+    json_request_kwargs,
+    media_digest,
+    stream_json_body,
+)
+
+from tests.conftest import FakeCache, FakeProvider
+
+IMAGE = bytes(range(256)) * 41
+
+
+async def _join(body) -> bytes:
+    if isinstance(body, bytes):
+        return body
+    return b"".join([chunk async for chunk in body])
+
+
+# === Digests and encoding ===
+def test_digest_is_computed_in_slices():
+    assert media_digest(IMAGE, chunk_size=1000) == hashlib.sha256(IMAGE).hexdigest()
+    assert media_digest(memoryview(IMAGE)[10:]) == hashlib.sha256(IMAGE[10:]).hexdigest()
+
+
+def test_media_references_the_callers_buffer():
+    buffer = bytearray(b"before")
+    media = MediaContent("image/png", buffer)
+
+    buffer[:] = b"after!"
+
+    assert bytes(media.data) == b"after!"
+    assert media.cache_token() == (
+        f"image/png:6:sha256:{hashlib.sha256(b'after!').hexdigest()}"
+    )
+
+
+def test_base64_chunks_concatenate_to_the_full_encoding():
+    media = MediaContent("image/png", IMAGE)
+
+    # Rounded down to a multiple of 3, so no chunk carries padding
+    chunks = list(media.iter_base64(chunk_size=1000))
+
+    assert len(chunks) > 1
+    assert b"".join(chunks) == base64.b64encode(IMAGE)
+
+
+# === Request bodies ===
+def test_payload_without_media_is_encoded_at_once():
+    body = stream_json_body({"model": "m", "n": 1})
+
+    assert json.loads(body) == {"model": "m", "n": 1}
+
+
+@pytest.mark.asyncio
+async def test_media_fields_are_streamed_into_the_body():
+    media = MediaContent("image/png", IMAGE)
+    payload = {
+        "raw": media.as_base64(),
+        "messages": [{"image_url": {"url": media.as_data_url()}}],
+    }
+
+    body = json.loads(await _join(stream_json_body(payload)))
+
+    encoded = base64.b64encode(IMAGE).decode("ascii")
+    assert body["raw"] == encoded
+    assert body["messages"][0]["image_url"]["url"] == f"data:image/png;base64,{encoded}"
+
+
+@pytest.mark.asyncio
+async def test_streamed_body_is_sent_as_json():
+    media = MediaContent("image/png", IMAGE)
+    received = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received["type"] = request.headers["content-type"]
+        received["body"] = json.loads(request.content)
+        return httpx.Response(200, json={})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        await client.post(
+            "https://provider.test", **json_request_kwargs({"image": media.as_base64()})
+        )
+
+    assert received["type"] == "application/json"
+    assert base64.b64decode(received["body"]["image"]) == IMAGE
+
+
+# === process_media ===
+@pytest.mark.asyncio
+async def test_media_is_passed_to_the_provider_by_reference(automodel):
+    provider = FakeProvider(ProviderType.OPENAI, reply="a picture")
+    automodel(provider)
+
+    await AutoModel.process_media("image/png", IMAGE, prompt="describe", use_cache=False)
+
+    [call] = provider.calls
+    media = call["content"]["media"]
+    assert media.data.obj is IMAGE
+    assert media.prompt == "describe"
+
+
+@pytest.mark.asyncio
+async def test_media_cache_keys_follow_the_content(automodel):
+    provider = FakeProvider(ProviderType.OPENAI, reply="a picture")
+    automodel(provider, cache=FakeCache())
+    other = bytes(reversed(IMAGE))
+
+    await AutoModel.process_media("image/png", IMAGE)
+    await AutoModel.process_media("image/png", bytearray(IMAGE))
+    await AutoModel.process_media("image/png", other)
+
+    # Equal bytes share a key; different bytes of the same size do not
+    assert [call["content"]["media"].data.obj for call in provider.calls] == [
+        IMAGE,
+        other,
+    ]
+
+
+def test_media_cache_key_does_not_embed_the_data():
+    media = MediaContent("image/png", IMAGE)
+
+    material = AutoModel._cache_key_default(media)
+
+    assert material == media.cache_token()
+    assert len(material) < 100
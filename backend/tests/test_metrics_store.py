@@ -0,0 +1,129 @@
+"""
+Tests for MetricsRingBuffer: wrap-around, filtered queries and cached
+percentile summaries.
+
+Author: Rip Jonesy
+"""
+
+import pytest
+
+from app.automodel import ProviderType, TaskType
+from app.automodel.metrics_store import MetricsRingBuffer
+
+OPENAI = ProviderType.OPENAI
+ANTHROPIC = ProviderType.ANTHROPIC
+SUMMARY = TaskType.SUMMARIZATION
+
+
+def _record(buffer, count, provider=OPENAI, success=True, start=0):
+    for index in range(start, start + count):
+        buffer.append(
+            provider,
+            f"{provider.value}-model",
+            SUMMARY,
+            success,
+            float(index),
+            tokens_used=index,
+            error=None if success else f"error {index}",
+            timestamp=1000.0 + index,
+        )
+
+
+# === Ring buffer ===
+def test_oldest_rows_are_overwritten():
+    buffer = MetricsRingBuffer(capacity=5)
+
+    _record(buffer, 8)
+
+    assert len(buffer) == 5
+    rows = buffer.query(limit=10)
+    assert [row["processing_time"] for row in rows] == [7.0, 6.0, 5.0, 4.0, 3.0]
+
+
+def test_rows_round_trip():
+    buffer = MetricsRingBuffer()
+    buffer.append(OPENAI, "m", SUMMARY, False, 0.5, error="boom", timestamp=5.0)
+
+    [row] = buffer.query()
+
+    assert row == {
+        "provider": OPENAI,
+        "model_id": "m",
+        "task_type": SUMMARY,
+        "success": False,
+        "processing_time": 0.5,
+        "tokens_used": None,
+        "error": "boom",
+        "timestamp": 5.0,
+    }
+
+
+def test_clear_drops_every_row():
+    buffer = MetricsRingBuffer(capacity=3)
+    _record(buffer, 3)
+
+    buffer.clear()
+
+    assert len(buffer) == 0
+    assert buffer.query() == []
+    assert buffer.summary() == {}
+
+
+# === Queries ===
+def test_query_filters_and_limits_newest_first():
+    buffer = MetricsRingBuffer()
+    _record(buffer, 4)
+    _record(buffer, 3, provider=ANTHROPIC, success=False, start=4)
+
+    failures = buffer.query(provider=ANTHROPIC, success=False, limit=2)
+
+    assert [row["processing_time"] for row in failures] == [6.0, 5.0]
+    assert buffer.query(provider=OPENAI, success=False) == []
+
+
+def test_query_for_an_unknown_label_is_empty():
+    buffer = MetricsRingBuffer()
+    _record(buffer, 2)
+
+    assert buffer.query(model_id="never-used") == []
+
+
+# === Summary ===
+def test_summary_has_percentiles_of_successful_requests():
+    buffer = MetricsRingBuffer()
+    _record(buffer, 100, start=1)
+    _record(buffer, 25, success=False, start=1000)
+
+    [entry] = buffer.summary().values()
+
+    assert entry["requests"] == 125
+    assert entry["failed"] == 25
+    assert entry["error_rate"] == pytest.approx(0.2)
+    # Failed requests do not count towards the latency percentiles
+    assert (entry["p50"], entry["p95"], entry["p99"]) == (50.0, 95.0, 99.0)
+
+
+def test_summary_is_grouped_by_provider_model_and_task():
+    buffer = MetricsRingBuffer()
+    _record(buffer, 2)
+    _record(buffer, 1, provider=ANTHROPIC, success=False)
+
+    summary = buffer.summary()
+
+    assert set(summary) == {
+        "openai/openai-model/summarization",
+        "anthropic/anthropic-model/summarization",
+    }
+    assert summary["anthropic/anthropic-model/summarization"]["p50"] is None
+
+
+def test_summary_is_cached_until_the_next_append():
+    buffer = MetricsRingBuffer()
+    _record(buffer, 3)
+
+    first = buffer.summary()
+    assert buffer.summary() is first
+
+    _record(buffer, 1, start=3)
+    assert buffer.summary() is not first
+    assert buffer.summary()["openai/openai-model/summarization"]["requests"] == 4
@@ -0,0 +1,228 @@
+"""
+Tests for ModelRegistry provider lifecycle: concurrent and lazy
+initialization at startup, and passive background health monitoring.
+
+Author: Rip Jonesy
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app.automodel import DeadlineExceededError, ProviderType
+from app.automodel import deadline
+from app.automodel.model_registry import ModelRegistry
+
+from tests.conftest import FakeProvider
+
+
+def _probed(provider: FakeProvider, status_code: int = 200) -> list:
+    """Serve the provider's probe endpoint and record the requested paths."""
+    paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        return httpx.Response(status_code, json={"data": []})
+
+    provider._client = httpx.AsyncClient(
+        base_url="https://provider.test", transport=httpx.MockTransport(handler)
+    )
+    return paths
+
+
+class _SlowStartProvider(FakeProvider):
+    """Provider whose initialization takes a while and may fail."""
+
+    def __init__(self, provider_type, init_delay=0.0, init_error=None, **kwargs):
+        super().__init__(provider_type, **kwargs)
+        self.init_delay = init_delay
+        self.init_error = init_error
+        self.initializations = 0
+
+    async def initialize(self) -> None:
+        self.initializations += 1
+        await asyncio.sleep(self.init_delay)
+        if self.init_error:
+            raise self.init_error
+
+
+@pytest.fixture
+def registry():
+    """Build a registry over configured, not yet initialized providers."""
+    registries = []
+
+    def _make(*providers, **config):
+        config.setdefault("lazy_providers", [])
+        registry = ModelRegistry(config)
+        registry._create_providers = lambda: None
+        for provider in providers:
+            registry._configured[provider.provider_type] = provider
+        registries.append(registry)
+        return registry
+
+    yield _make
+
+    for registry in registries:
+        tasks = [registry._monitor_task, *registry._init_tasks.values()]
+        for task in tasks:
+            if task:
+                task.cancel()
+
+
+# === Startup ===
+@pytest.mark.asyncio
+async def test_providers_are_initialized_concurrently(registry):
+    providers = [
+        _SlowStartProvider(provider_type, init_delay=0.1)
+        for provider_type in (ProviderType.OPENAI, ProviderType.ANTHROPIC, ProviderType.MISTRAL)
+    ]
+    models = registry(*providers)
+    started = time.monotonic()
+
+    await models.initialize()
+
+    assert time.monotonic() - started < 0.25
+    assert set(models.get_available_providers()) == {
+        ProviderType.OPENAI,
+        ProviderType.ANTHROPIC,
+        ProviderType.MISTRAL,
+    }
+
+
+@pytest.mark.asyncio
+async def test_slow_providers_finish_after_startup(registry):
+    fast = _SlowStartProvider(ProviderType.OPENAI)
+    slow = _SlowStartProvider(ProviderType.ANTHROPIC, init_delay=0.2)
+    models = registry(fast, slow, startup_timeout=0.05)
+
+    await models.initialize()
+
+    assert models.get_provider(ProviderType.OPENAI) is fast
+    assert models.get_provider(ProviderType.ANTHROPIC) is None
+    assert models.get_registry_stats()["pending_providers"] == {"anthropic": "initializing"}
+
+    await asyncio.sleep(0.25)
+    assert models.get_provider(ProviderType.ANTHROPIC) is slow
+
+
+@pytest.mark.asyncio
+async def test_hanging_initialization_is_abandoned(registry):
+    hanging = _SlowStartProvider(ProviderType.OPENAI, init_delay=10.0)
+    models = registry(hanging, startup_timeout=1.0, provider_init_timeout=0.05)
+
+    await models.initialize()
+
+    assert models.get_provider(ProviderType.OPENAI) is None
+    assert models.get_registry_stats()["pending_providers"] == {"openai": "failed"}
+
+
+# === Lazy providers ===
+@pytest.mark.asyncio
+async def test_lazy_providers_start_on_first_use(registry):
+    lazy = _SlowStartProvider(ProviderType.OPENROUTER, init_delay=0.02)
+    models = registry(lazy, lazy_providers=[ProviderType.OPENROUTER])
+
+    await models.initialize()
+    assert lazy.initializations == 0
+    assert models.get_registry_stats()["pending_providers"] == {"openrouter": "lazy"}
+
+    # Concurrent requests share one initialization
+    first, second = await asyncio.gather(
+        models.ensure_provider(ProviderType.OPENROUTER),
+        models.ensure_provider(ProviderType.OPENROUTER),
+    )
+
+    assert first is second is lazy
+    assert lazy.initializations == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_initialization_is_not_retried_at_once(registry):
+    broken = _SlowStartProvider(ProviderType.OPENAI, init_error=RuntimeError("down"))
+    models = registry(broken, lazy_providers=[ProviderType.OPENAI])
+    await models.initialize()
+
+    assert await models.ensure_provider(ProviderType.OPENAI) is None
+    assert await models.ensure_provider(ProviderType.OPENAI) is None
+    assert await models.ensure_all_providers() is False
+
+    assert broken.initializations == 1
+
+
+@pytest.mark.asyncio
+async def test_waiting_request_keeps_its_deadline(registry):
+    slow = _SlowStartProvider(ProviderType.OPENAI, init_delay=0.1)
+    models = registry(slow, lazy_providers=[ProviderType.OPENAI])
+    await models.initialize()
+
+    with deadline.scope(0.02):
+        with pytest.raises(DeadlineExceededError):
+            await models.ensure_provider(ProviderType.OPENAI)
+
+    # The shared initialization was not cut short by the request
+    await asyncio.sleep(0.15)
+    assert models.get_provider(ProviderType.OPENAI) is slow
+
+
+# === Health monitoring ===
+@pytest.mark.asyncio
+async def test_only_idle_providers_are_probed(make_registry):
+    busy = FakeProvider(ProviderType.OPENAI)
+    idle = FakeProvider(ProviderType.ANTHROPIC)
+    models = make_registry(busy, idle)
+    busy_probes, idle_probes = _probed(busy), _probed(idle)
+    models._last_health_check[idle.provider_type] -= timedelta(minutes=10)
+    models._last_health_check[busy.provider_type] -= timedelta(minutes=10)
+
+    # Real traffic counts as a health check
+    models.update_model_metrics(busy.model.id, True, 0.1)
+    await models._probe_idle_providers()
+
+    assert busy_probes == []
+    assert idle_probes == ["/models"]
+    assert idle.calls == []
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_marks_the_provider_unhealthy(make_registry):
+    provider = FakeProvider(ProviderType.OPENAI)
+    models = make_registry(provider)
+    _probed(provider, status_code=401)
+    models._last_health_check[provider.provider_type] = datetime.min
+
+    await models._probe_idle_providers()
+
+    assert models.get_available_providers() == []
+    assert "Health probe failed" in provider.last_error
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_providers_are_probed_sooner(make_registry):
+    provider = FakeProvider(ProviderType.OPENAI)
+    models = make_registry(provider)
+    probes = _probed(provider)
+    models._set_provider_health(provider.provider_type, False)
+    models._last_health_check[provider.provider_type] -= timedelta(minutes=1)
+
+    await models._probe_idle_providers()
+
+    # Probed after the recovery interval, well before the regular one
+    assert probes == ["/models"]
+    assert models.get_available_providers() == [ProviderType.OPENAI]
+
+
+@pytest.mark.asyncio
+async def test_health_monitor_is_started_once_without_the_deadline(make_registry):
+    models = make_registry(FakeProvider(ProviderType.OPENAI))
+
+    with deadline.scope(0.01):
+        models.start_health_monitor()
+        monitor = models._monitor_task
+        models.start_health_monitor()
+
+    assert models._monitor_task is monitor
+    await asyncio.sleep(0.05)
+    assert not monitor.done()
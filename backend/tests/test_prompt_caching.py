@@ -0,0 +1,140 @@
+"""
+Tests for provider prompt-prefix caching: prefix-stable message layout,
+Claude cache breakpoints and cached token reporting.
+
+Author: Rip Jonesy
+"""
+
+from app.automodel import ProviderType, TaskType
+from app.automodel.providers.anthropic import AnthropicProvider
+
+from tests.conftest import FakeProvider
+
+
+def _history(turns: int, words: int = 5):
+    return {
+        "messages": [
+            {
+                "role": "user" if index % 2 == 0 else "assistant",
+                "content": " ".join(f"turn{index}word{word}" for word in range(words)),
+            }
+            for index in range(turns)
+        ]
+    }
+
+
+def _payload(provider, content, session_context=None, model_id="claude-3-5-sonnet"):
+    return provider._build_message_payload(
+        model_id, TaskType.CHAT, content, None, 0.7, 0.95, None, session_context
+    )
+
+
+# === Layout ===
+def test_stable_parts_of_the_prompt_come_first():
+    provider = FakeProvider(ProviderType.OPENAI)
+    content = {
+        "messages": [
+            {"role": "system", "content": "template"},
+            {"role": "user", "content": "new"},
+        ]
+    }
+
+    messages = provider._layout_chat_messages("task", content, _history(2))
+
+    assert [message["content"] for message in messages] == [
+        "task",
+        "template",
+        "turn0word0 turn0word1 turn0word2 turn0word3 turn0word4",
+        "turn1word0 turn1word1 turn1word2 turn1word3 turn1word4",
+        "new",
+    ]
+
+
+def test_cached_tokens_are_read_from_either_usage_format():
+    openai = {"prompt_tokens": 100, "prompt_tokens_details": {"cached_tokens": 64}}
+    deepseek = {"prompt_tokens": 100, "prompt_cache_hit_tokens": 32}
+
+    assert FakeProvider._chat_usage_metadata(openai) == {
+        "prompt_tokens": 100,
+        "cached_tokens": 64,
+    }
+    assert FakeProvider._chat_usage_metadata(deepseek)["cached_tokens"] == 32
+    assert FakeProvider._chat_usage_metadata({})["cached_tokens"] == 0
+
+
+# === Claude breakpoints ===
+def test_long_history_gets_a_cache_breakpoint():
+    provider = AnthropicProvider(api_key="test-key")
+
+    payload = _payload(provider, "new question", _history(40, words=60))
+
+    marked = [
+        index
+        for index, message in enumerate(payload["messages"])
+        if isinstance(message["content"], list)
+        and message["content"][-1].get("cache_control")
+    ]
+    assert marked == [39]
+    assert payload["messages"][-1] == {"role": "user", "content": "new question"}
+
+
+def test_short_prompts_are_sent_without_breakpoints():
+    provider = AnthropicProvider(api_key="test-key")
+
+    payload = _payload(provider, "new question", _history(2))
+
+    assert all(isinstance(message["content"], str) for message in payload["messages"])
+    assert isinstance(payload.get("system", ""), str)
+
+
+def test_long_system_prompt_is_cached():
+    provider = AnthropicProvider(api_key="test-key")
+    instructions = " ".join(f"rule{index}" for index in range(3000))
+    content = {
+        "messages": [
+            {"role": "system", "content": instructions},
+            {"role": "user", "content": "new"},
+        ]
+    }
+
+    payload = _payload(provider, content)
+
+    [block] = payload["system"]
+    assert block["text"].endswith(instructions)
+    assert block["cache_control"] == {"type": "ephemeral"}
+
+
+def test_haiku_needs_a_longer_prefix():
+    provider = AnthropicProvider(api_key="test-key")
+    history = _history(6, words=60)
+
+    sonnet = _payload(provider, "new", history)
+    haiku = _payload(provider, "new", history, model_id="claude-3-5-haiku")
+
+    assert any(isinstance(message["content"], list) for message in sonnet["messages"])
+    assert not any(isinstance(message["content"], list) for message in haiku["messages"])
+
+
+def test_building_a_payload_leaves_the_session_untouched():
+    provider = AnthropicProvider(api_key="test-key")
+    history = _history(41, words=60)
+    before = [dict(message) for message in history["messages"]]
+
+    # The new user message is merged into the last (user) history message
+    _payload(provider, "new question", history)
+
+    assert history["messages"] == before
+
+
+def test_claude_usage_counts_cached_input_as_prompt():
+    usage = AnthropicProvider._usage_metadata(
+        {
+            "input_tokens": 10,
+            "output_tokens": 5,
+            "cache_creation_input_tokens": 100,
+            "cache_read_input_tokens": 1000,
+        }
+    )
+
+    assert usage["prompt_tokens"] == 1110
+    assert usage["cached_tokens"] == 1000
@@ -0,0 +1,210 @@
+"""
+Tests for RequestScheduler: priority order, weighted fair queuing between
+tenants, the interactive reserve and cancelled waiters.
+
+Author: Rip Jonesy
+"""
+
+import asyncio
+
+import pytest
+
+from app.automodel import ModelPriority, ProviderType
+from app.automodel.scheduler import RequestScheduler
+from app.models.mswap_models import UserTier
+
+PROVIDER = ProviderType.OPENAI
+
+
+class _Holder:
+    """Keeps scheduler slots busy until released."""
+
+    def __init__(self, scheduler, count=1, priority=ModelPriority.LOW):
+        self.release = asyncio.Event()
+        self.tasks = [
+            asyncio.ensure_future(self._hold(scheduler, priority)) for _ in range(count)
+        ]
+
+    async def _hold(self, scheduler, priority):
+        async with scheduler.slot(PROVIDER, priority):
+            await self.release.wait()
+
+    async def finish(self):
+        self.release.set()
+        await asyncio.gather(*self.tasks)
+
+
+def _enqueue(scheduler, admitted, label, **kwargs):
+    """Queue a request that records its label once it gets a slot."""
+
+    async def request():
+        async with scheduler.slot(PROVIDER, **kwargs):
+            admitted.append(label)
+
+    return asyncio.ensure_future(request())
+
+
+async def _settle():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def _provider_stats(scheduler):
+    return scheduler.get_stats()[PROVIDER.value]
+
+
+@pytest.mark.asyncio
+async def test_free_capacity_is_granted_without_queueing():
+    scheduler = RequestScheduler(default_capacity=2)
+
+    async with scheduler.slot(PROVIDER) as queue_time:
+        assert queue_time == 0.0
+        assert _provider_stats(scheduler)["active"] == 1
+
+    assert _provider_stats(scheduler)["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_waiting_requests_are_served_by_priority():
+    scheduler = RequestScheduler(default_capacity=1)
+    holder = _Holder(scheduler)
+    await _settle()
+
+    admitted = []
+    tasks = [
+        _enqueue(scheduler, admitted, priority.name, priority=priority)
+        for priority in (
+            ModelPriority.LOW,
+            ModelPriority.MEDIUM,
+            ModelPriority.CRITICAL,
+            ModelPriority.HIGH,
+        )
+    ]
+    await _settle()
+    assert _provider_stats(scheduler)["waiting"] == 4
+
+    await holder.finish()
+    await asyncio.gather(*tasks)
+
+    assert admitted == ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+
+
+@pytest.mark.asyncio
+async def test_tenants_of_a_tier_take_turns():
+    scheduler = RequestScheduler(default_capacity=1)
+    holder = _Holder(scheduler)
+    await _settle()
+
+    admitted = []
+    tasks = [
+        _enqueue(scheduler, admitted, user, user_id=user, user_tier=UserTier.FREE)
+        for user in ("a", "a", "a", "b", "b", "b")
+    ]
+    await _settle()
+    await holder.finish()
+    await asyncio.gather(*tasks)
+
+    assert admitted == ["a", "b", "a", "b", "a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_capacity_is_shared_by_tier_weight():
+    scheduler = RequestScheduler(default_capacity=1)
+    holder = _Holder(scheduler)
+    await _settle()
+
+    admitted = []
+    tasks = [
+        _enqueue(scheduler, admitted, "free", user_id="free", user_tier=UserTier.FREE)
+        for _ in range(6)
+    ] + [
+        _enqueue(
+            scheduler, admitted, "lilbean", user_id="lilbean", user_tier=UserTier.LILBEAN
+        )
+        for _ in range(6)
+    ]
+    await _settle()
+    await holder.finish()
+    await asyncio.gather(*tasks)
+
+    first_turns = admitted[:6]
+    assert first_turns.count("lilbean") == 2 * first_turns.count("free")
+
+
+@pytest.mark.asyncio
+async def test_reserved_capacity_is_kept_for_interactive_requests():
+    scheduler = RequestScheduler(default_capacity=4, interactive_reserve=0.25)
+    holder = _Holder(scheduler, count=3, priority=ModelPriority.LOW)
+    await _settle()
+
+    admitted = []
+    batch = _enqueue(scheduler, admitted, "batch", priority=ModelPriority.LOW)
+    await _settle()
+    assert admitted == []
+
+    interactive = _enqueue(scheduler, admitted, "interactive", priority=ModelPriority.HIGH)
+    await interactive
+    assert admitted == ["interactive"]
+
+    await holder.finish()
+    await batch
+    assert admitted == ["interactive", "batch"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiters_do_not_hold_slots():
+    scheduler = RequestScheduler(default_capacity=1)
+    holder = _Holder(scheduler)
+    await _settle()
+
+    admitted = []
+    cancelled = _enqueue(scheduler, admitted, "cancelled", priority=ModelPriority.HIGH)
+    waiting = _enqueue(scheduler, admitted, "waiting", priority=ModelPriority.LOW)
+    await _settle()
+    cancelled.cancel()
+    await _settle()
+    assert _provider_stats(scheduler)["waiting"] == 1
+
+    await holder.finish()
+    await waiting
+
+    assert admitted == ["waiting"]
+    assert _provider_stats(scheduler)["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slot_granted_to_a_cancelled_waiter_is_passed_on():
+    scheduler = RequestScheduler(default_capacity=1)
+    held = scheduler.slot(PROVIDER)
+    await held.__aenter__()
+
+    admitted = []
+    first = _enqueue(scheduler, admitted, "first")
+    second = _enqueue(scheduler, admitted, "second")
+    await _settle()
+
+    # Hand the slot to the first waiter, then cancel it before it resumes
+    await held.__aexit__(None, None, None)
+    first.cancel()
+    await second
+
+    assert admitted == ["second"]
+    assert _provider_stats(scheduler)["active"] == 0
+    assert _provider_stats(scheduler)["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_times_are_recorded_per_priority():
+    scheduler = RequestScheduler(default_capacity=1)
+    holder = _Holder(scheduler)
+    await _settle()
+
+    queued = _enqueue(scheduler, [], "queued", priority=ModelPriority.HIGH)
+    await asyncio.sleep(0.02)
+    await holder.finish()
+    await queued
+
+    priorities = _provider_stats(scheduler)["priorities"]
+    assert priorities["low"]["queue_time_max"] == 0.0
+    assert priorities["high"]["started"] == 1
+    assert priorities["high"]["queue_time_max"] >= 0.01
@@ -0,0 +1,127 @@
+"""
+Tests for the semantic cache: hashed embeddings, nearest-neighbour lookup
+per namespace, LRU eviction and near-duplicate hits in AutoModel.
+
+Author: Rip Jonesy
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.automodel import ProviderType, TaskType  # noqa: E402
+from app.automodel.automodel import AutoModel  # noqa: E402
+from app.automodel.semantic_cache import (  # noqa: E402
+    SemanticCache,
+    content_text,
+    embed_text,
+)
+
+from tests.conftest import FakeCache, FakeProvider  # noqa: E402
+
+TEXT = " ".join(f"sentence {index} about note taking and review" for index in range(60))
+
+
+# === Embeddings ===
+def test_small_edits_keep_texts_similar():
+    vector = embed_text(TEXT)
+    edited = embed_text(TEXT + " one more line")
+    unrelated = embed_text("a recipe for sourdough bread with a long rise")
+
+    assert float(vector @ vector) == pytest.approx(1.0)
+    assert float(vector @ edited) > 0.97
+    assert float(vector @ unrelated) < 0.5
+
+
+def test_only_text_content_is_embedded():
+    messages = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "yo"}]
+
+    assert content_text(messages) == "user: hi\nassistant: yo"
+    assert content_text({"messages": messages}) == "user: hi\nassistant: yo"
+    assert content_text({"media": object()}) is None
+    assert content_text([{"role": "user", "content": [{"type": "image"}]}]) is None
+
+
+# === Index ===
+def test_lookup_respects_threshold_and_namespace():
+    cache = SemanticCache(threshold=0.97)
+    cache.add("summaries", cache.embed(TEXT), "key-1")
+
+    assert cache.lookup("summaries", cache.embed(TEXT + " more"))[0] == "key-1"
+    assert cache.lookup("summaries", cache.embed("something else entirely")) is None
+    assert cache.lookup("topics", cache.embed(TEXT)) is None
+    assert cache.get_stats()["hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = SemanticCache(max_entries=2)
+    texts = ["first text about cats", "second text about dogs", "third text about owls"]
+    cache.add("ns", cache.embed(texts[0]), "k0")
+    cache.add("ns", cache.embed(texts[1]), "k1")
+
+    # A hit refreshes the first entry, so the second one is evicted
+    assert cache.lookup("ns", cache.embed(texts[0]))[0] == "k0"
+    cache.add("ns", cache.embed(texts[2]), "k2")
+
+    assert cache.lookup("ns", cache.embed(texts[1])) is None
+    assert cache.lookup("ns", cache.embed(texts[0]))[0] == "k0"
+    assert cache.lookup("ns", cache.embed(texts[2]))[0] == "k2"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_removing_an_entry_keeps_the_others_findable():
+    cache = SemanticCache()
+    texts = [f"text number {word} with its own words" for word in ("one", "two", "three")]
+    for index, text in enumerate(texts):
+        cache.add("ns", cache.embed(text), f"k{index}")
+
+    cache.invalidate("k0")
+
+    assert cache.lookup("ns", cache.embed(texts[0])) is None
+    assert cache.lookup("ns", cache.embed(texts[2]))[0] == "k2"
+    assert cache.get_stats()["entries"] == 2
+
+
+# === AutoModel ===
+@pytest.fixture
+def semantic(automodel, monkeypatch):
+    provider = FakeProvider(ProviderType.OPENAI, delay=0.01)
+    cache = FakeCache()
+    automodel(provider, cache=cache)
+    monkeypatch.setattr(AutoModel, "_semantic_cache", SemanticCache())
+    return provider, cache
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_request_is_served_from_cache(semantic):
+    provider, _ = semantic
+
+    await AutoModel.process(TaskType.SUMMARIZATION, TEXT)
+    response = await AutoModel.process(TaskType.SUMMARIZATION, TEXT + " one more line")
+
+    assert len(provider.calls) == 1
+    assert response.content == f"openai: {TEXT}"
+    assert response.metadata["semantic_similarity"] > 0.97
+
+
+@pytest.mark.asyncio
+async def test_near_duplicates_with_other_parameters_are_not_matched(semantic):
+    provider, _ = semantic
+
+    await AutoModel.process(TaskType.SUMMARIZATION, TEXT)
+    await AutoModel.process(TaskType.SUMMARIZATION, TEXT + " one more line", temperature=0.1)
+    await AutoModel.process(TaskType.TOPIC_EXTRACTION, TEXT + " one more line")
+
+    assert len(provider.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_expired_responses_are_dropped_from_the_index(semantic):
+    provider, cache = semantic
+
+    await AutoModel.process(TaskType.SUMMARIZATION, TEXT)
+    cache.entries.clear()
+    await AutoModel.process(TaskType.SUMMARIZATION, TEXT + " one more line")
+
+    assert len(provider.calls) == 2
+    assert AutoModel.get_semantic_cache_stats()["stale"] == 1
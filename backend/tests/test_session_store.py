@@ -0,0 +1,129 @@
+"""
+Tests for the bounded session store.
+
+Author: Rip Jonesy
+"""
+
+import pytest
+
+from app.automodel import session_store
+from app.automodel.session_store import SessionStore
+
+
+class _Clock:
+    """Settable stand-in for the time module."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(session_store, "time", clock)
+    return clock
+
+
+def _turn(text: str):
+    return [{"role": "user", "content": text}, {"role": "assistant", "content": text}]
+
+
+def test_least_recently_used_session_is_evicted(clock):
+    store = SessionStore(max_sessions=2)
+    store.set("a", {"n": 1})
+    store.set("b", {"n": 2})
+    store.get("a")
+    store.set("c", {"n": 3})
+
+    assert "a" in store and "c" in store
+    assert "b" not in store
+    assert store.get_stats()["evicted_lru"] == 1
+
+
+def test_sessions_are_evicted_to_stay_under_the_byte_limit(clock):
+    store = SessionStore(max_total_bytes=100)
+    for index in range(10):
+        store.set(f"s{index}", {"text": "x" * 30})
+
+    stats = store.get_stats()
+    assert stats["total_bytes"] <= 100
+    assert stats["sessions"] == len(store) < 10
+    assert "s9" in store
+
+
+def test_idle_sessions_expire(clock):
+    store = SessionStore(ttl_seconds=60)
+    store.set("idle", {"n": 1})
+    store.set("active", {"n": 2})
+
+    clock.now += 45
+    store.get("active")
+    clock.now += 30
+
+    assert store.get("idle") is None
+    assert store.get("active") == {"n": 2}
+    assert store.get_stats()["evicted_ttl"] == 1
+
+
+def test_expired_sessions_are_dropped_on_write(clock):
+    store = SessionStore(ttl_seconds=60)
+    for index in range(5):
+        store.set(f"s{index}", {"n": index})
+
+    clock.now += 120
+    store.set("new", {})
+
+    assert len(store) == 1
+    assert store.get_stats()["total_bytes"] == store._measure({})
+
+
+def test_oversized_context_is_rejected(clock):
+    store = SessionStore(max_session_bytes=50)
+    store.set("s", {"n": 1})
+
+    assert not store.set("s", {"text": "x" * 100})
+    assert store.get("s") == {"n": 1}
+    assert store.get_stats()["rejected_oversize"] == 1
+
+
+def test_byte_accounting_follows_replacements_and_deletes(clock):
+    store = SessionStore()
+    store.set("s", {"text": "x" * 100})
+    store.set("s", {"text": "x" * 10})
+    store.set("t", {})
+
+    assert store.get_stats()["total_bytes"] == (
+        store._measure({"text": "x" * 10}) + store._measure({})
+    )
+    store.delete("s")
+    store.delete("t")
+    assert store.get_stats()["total_bytes"] == 0
+
+
+def test_append_messages_extends_the_history(clock):
+    store = SessionStore()
+    store.create("s")
+    store.append_messages("s", _turn("one"))
+    store.append_messages("s", _turn("two"))
+
+    assert [message["content"] for message in store.get("s")["messages"]] == [
+        "one",
+        "one",
+        "two",
+        "two",
+    ]
+
+
+def test_append_messages_drops_the_oldest_turns_over_the_limit(clock):
+    store = SessionStore(max_session_bytes=400)
+    for index in range(20):
+        assert store.append_messages("s", _turn(f"turn {index:02d} " + "x" * 20))
+
+    context = store.get("s")
+    assert store._measure(context) <= 400
+    assert context["messages"][0]["role"] == "user"
+    assert context["messages"][-1]["content"].startswith("turn 19")
+    assert store.get_stats()["rejected_oversize"] == 0
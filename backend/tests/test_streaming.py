@@ -0,0 +1,221 @@
+"""
+Tests for streaming: SSE parsing of provider streams, failover before the
+first chunk, the first-chunk deadline and caching of streamed responses.
+
+Author: Rip Jonesy
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.automodel import (
+    DeadlineExceededError,
+    ProviderApiError,
+    ProviderType,
+    TaskType,
+)
+from app.automodel.automodel import AutoModel
+from app.automodel.providers.base import StreamChunk
+
+from tests.conftest import FakeCache, FakeProvider
+
+
+class _StreamingProvider(FakeProvider):
+    """Provider that streams a fixed reply word by word."""
+
+    def __init__(self, provider_type, words=("one ", "two ", "three"), gap=0.0, **kwargs):
+        super().__init__(provider_type, **kwargs)
+        self.words = words
+        self.gap = gap
+
+    async def stream(self, task_type, model_id, content, **kwargs):
+        self.calls.append({"task_type": task_type, "content": content, **kwargs})
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        for word in self.words:
+            yield StreamChunk(content=word, model_id=model_id)
+            await asyncio.sleep(self.gap)
+        yield StreamChunk(model_id=model_id, finish_reason="stop", tokens_used=7)
+
+
+def _http_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://provider.test")
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(status_code, request=request)
+    )
+
+
+async def _collect(**kwargs):
+    kwargs.setdefault("use_cache", False)
+    return [
+        chunk
+        async for chunk in AutoModel.stream(TaskType.SUMMARIZATION, "hello", **kwargs)
+    ]
+
+
+@pytest.fixture
+def two_providers(automodel):
+    """A preferred provider and a streaming fallback."""
+
+    def _install(preferred):
+        fallback = _StreamingProvider(ProviderType.ANTHROPIC)
+        router = automodel(preferred, fallback)
+        router.set_fallback_chain(
+            TaskType.SUMMARIZATION, [ProviderType.OPENAI, ProviderType.ANTHROPIC]
+        )
+        return fallback
+
+    return _install
+
+
+# === SSE parsing ===
+@pytest.mark.asyncio
+async def test_chat_completion_stream_is_parsed_into_chunks():
+    body = (
+        ": keep-alive\n\n"
+        'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'
+        "event: ping\n\n"
+        "data: not json\n\n"
+        'data: {"choices": [{"delta": {"content": "lo"}, "finish_reason": "stop"}]}\n\n'
+        'data: {"choices": [], "usage": {"prompt_tokens": 3, "total_tokens": 5}}\n\n'
+        "data: [DONE]\n\n"
+        'data: {"choices": [{"delta": {"content": "ignored"}}]}\n\n'
+    )
+    provider = FakeProvider(ProviderType.OPENAI)
+    provider._client = httpx.AsyncClient(
+        base_url="https://provider.test",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, text=body)),
+    )
+
+    chunks = [
+        chunk
+        async for chunk in provider._stream_chat_completion("m", {"stream": True})
+    ]
+    await provider._client.aclose()
+
+    assert [chunk.content for chunk in chunks] == ["Hel", "lo", ""]
+    assert chunks[-1].finish_reason == "stop"
+    assert chunks[-1].tokens_used == 5
+    assert chunks[-1].metadata["prompt_tokens"] == 3
+
+
+@pytest.mark.asyncio
+async def test_chat_completion_stream_raises_http_errors():
+    provider = FakeProvider(ProviderType.OPENAI)
+    provider._client = httpx.AsyncClient(
+        base_url="https://provider.test",
+        transport=httpx.MockTransport(lambda request: httpx.Response(503)),
+    )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        async for _ in provider._stream_chat_completion("m", {"stream": True}):
+            pass
+    await provider._client.aclose()
+
+
+# === Streaming ===
+@pytest.mark.asyncio
+async def test_chunks_are_streamed_then_finished(automodel):
+    automodel(_StreamingProvider(ProviderType.OPENAI))
+
+    chunks = await _collect()
+
+    assert [chunk.content for chunk in chunks[:-1]] == ["one ", "two ", "three"]
+    final = chunks[-1]
+    assert final.finish_reason == "stop"
+    assert final.tokens_used == 7
+    assert final.metadata["provider"] == "openai"
+    assert final.metadata["cached"] is False
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_is_cached(automodel):
+    provider = _StreamingProvider(ProviderType.OPENAI)
+    automodel(provider, cache=FakeCache())
+
+    await _collect(use_cache=True)
+    cached = await _collect(use_cache=True)
+
+    assert len(provider.calls) == 1
+    assert len(cached) == 1
+    assert cached[0].content == "one two three"
+    assert cached[0].metadata["cached"] is True
+
+
+# === Failover ===
+@pytest.mark.asyncio
+async def test_stream_fails_over_before_the_first_chunk(two_providers):
+    failing = _StreamingProvider(ProviderType.OPENAI, error=_http_error(503))
+    fallback = two_providers(failing)
+
+    chunks = await _collect()
+
+    assert len(failing.calls) == 1
+    assert len(fallback.calls) == 1
+    assert chunks[-1].metadata["provider"] == "anthropic"
+    [failure] = await AutoModel.get_performance_metrics(success=False)
+    assert failure.provider == ProviderType.OPENAI
+
+
+@pytest.mark.asyncio
+async def test_stream_does_not_fail_over_rejected_requests(two_providers):
+    rejected = _StreamingProvider(ProviderType.OPENAI, error=_http_error(400))
+    fallback = two_providers(rejected)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await _collect()
+
+    assert fallback.calls == []
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_when_every_candidate_failed(automodel):
+    automodel(
+        _StreamingProvider(ProviderType.OPENAI, error=_http_error(503)),
+        _StreamingProvider(ProviderType.ANTHROPIC, error=_http_error(429)),
+    )
+
+    with pytest.raises(ProviderApiError):
+        await _collect()
+
+
+@pytest.mark.asyncio
+async def test_mid_stream_failures_are_not_retried(two_providers):
+    class _BreaksMidStream(_StreamingProvider):
+        async def stream(self, task_type, model_id, content, **kwargs):
+            self.calls.append({"content": content})
+            yield StreamChunk(content="partial", model_id=model_id)
+            raise _http_error(503)
+
+    breaking = _BreaksMidStream(ProviderType.OPENAI)
+    fallback = two_providers(breaking)
+
+    received = []
+    with pytest.raises(httpx.HTTPStatusError):
+        async for chunk in AutoModel.stream(TaskType.SUMMARIZATION, "hello", use_cache=False):
+            received.append(chunk.content)
+
+    assert received == ["partial"]
+    assert fallback.calls == []
+
+
+# === Deadline ===
+@pytest.mark.asyncio
+async def test_deadline_covers_the_wait_for_the_first_chunk(automodel):
+    automodel(_StreamingProvider(ProviderType.OPENAI, delay=0.5))
+
+    with pytest.raises(DeadlineExceededError):
+        await _collect(timeout=0.05)
+
+
+@pytest.mark.asyncio
+async def test_started_stream_runs_past_the_deadline(automodel):
+    automodel(_StreamingProvider(ProviderType.OPENAI, gap=0.04))
+
+    chunks = await _collect(timeout=0.05)
+
+    assert "".join(chunk.content for chunk in chunks) == "one two three"
+    assert chunks[-1].finish_reason == "stop"
@@ -0,0 +1,435 @@
+"""
+Tests for TaskRouter: routing cache, load balancing, latency tracking and
+hedged execution.
+
+Author: Rip Jonesy
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.automodel import (
+    DeadlineExceededError,
+    ModelPriority,
+    ProviderApiError,
+    ProviderType,
+    TaskType,
+    deadline,
+)
+from app.automodel.task_router import TaskRouter, is_retryable_error, mark_call_started
+
+from tests.conftest import FakeProvider
+
+
+def _attempt(task_type=TaskType.SUMMARIZATION, content="hello"):
+    async def attempt(provider, model):
+        return await provider.process(task_type=task_type, model_id=model.id, content=content)
+
+    return attempt
+
+
+def _queued_attempt(queue_time, task_type=TaskType.SUMMARIZATION):
+    """Attempt that waits for capacity before calling the provider."""
+
+    async def attempt(provider, model):
+        await asyncio.sleep(queue_time)
+        mark_call_started()
+        return await provider.process(task_type=task_type, model_id=model.id, content="hello")
+
+    return attempt
+
+
+def _server_error() -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://provider.test")
+    return httpx.HTTPStatusError(
+        "server error", request=request, response=httpx.Response(503, request=request)
+    )
+
+
+def _bad_request() -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://provider.test")
+    return httpx.HTTPStatusError(
+        "bad request", request=request, response=httpx.Response(400, request=request)
+    )
+
+
+@pytest.fixture
+def providers():
+    return (
+        FakeProvider(ProviderType.OPENAI, delay=0.5),
+        FakeProvider(ProviderType.ANTHROPIC, delay=0.01),
+        FakeProvider(ProviderType.MISTRAL, delay=0.01),
+    )
+
+
+@pytest.fixture
+def router(make_registry, providers):
+    router = TaskRouter(make_registry(*providers))
+    router.default_hedge_delay = 0.05
+    return router
+
+
+def _models(providers):
+    return [provider.model for provider in providers]
+
+
+def _rank(router, task_type=TaskType.SUMMARIZATION, **kwargs):
+    return router._get_candidate_models(
+        task_type,
+        kwargs.get("priority", ModelPriority.MEDIUM),
+        kwargs.get("preferred_providers"),
+        kwargs.get("excluded_providers"),
+        kwargs.get("model_requirements"),
+    )
+
+
+@pytest.fixture
+def scans(router, monkeypatch):
+    """Count the candidate scans of the router's registry."""
+    registry = router.model_registry
+    calls = []
+    get_models_for_task = registry.get_models_for_task
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return get_models_for_task(*args, **kwargs)
+
+    monkeypatch.setattr(registry, "get_models_for_task", counting)
+    return calls
+
+
+# === Routing cache ===
+def test_rankings_are_reused(router, scans):
+    first = _rank(router)
+    second = _rank(router)
+
+    assert [model.id for model in first] == [model.id for model in second]
+    assert len(scans) == 1
+
+
+def test_rankings_are_cached_per_routing_key(router, scans):
+    _rank(router)
+    _rank(router, priority=ModelPriority.HIGH)
+    _rank(router, excluded_providers={ProviderType.OPENAI})
+    _rank(router, model_requirements={"min_max_tokens": 1000})
+    _rank(router, model_requirements={"min_max_tokens": 1000})
+
+    assert len(scans) == 4
+
+
+def test_health_change_invalidates_rankings_at_once(router, providers, scans):
+    router.routing_cache_ttl = 3600
+    _rank(router)
+
+    router.model_registry._set_provider_health(ProviderType.OPENAI, False)
+    ranked = _rank(router)
+
+    assert providers[0].model not in ranked
+    assert len(scans) == 2
+
+
+def test_metrics_changes_re_rank_after_the_ttl(router, providers, scans):
+    router.routing_cache_ttl = 3600
+    _rank(router)
+    router.model_registry.update_model_metrics(providers[1].model.id, True, 0.1)
+    _rank(router)
+    assert len(scans) == 1
+
+    router.routing_cache_ttl = 0
+    _rank(router)
+    assert len(scans) == 2
+
+    # Unchanged metrics keep the ranking however old it is
+    _rank(router)
+    assert len(scans) == 2
+
+
+def test_open_circuits_are_filtered_from_cached_rankings(router, providers, scans):
+    _rank(router)
+    circuit = router.model_registry._model_circuit(providers[1].model.id)
+    circuit._open(60.0)
+
+    ranked = _rank(router)
+
+    assert providers[1].model not in ranked
+    assert len(scans) == 1
+
+
+def test_fallback_chain_change_re_ranks(router, providers):
+    router.set_fallback_chain(
+        TaskType.SUMMARIZATION, [ProviderType.MISTRAL, ProviderType.OPENAI]
+    )
+    router.balance_tolerance = 0.0
+    assert _rank(router)[0].provider == ProviderType.MISTRAL
+
+    router.set_fallback_chain(
+        TaskType.SUMMARIZATION, [ProviderType.OPENAI, ProviderType.MISTRAL]
+    )
+    assert _rank(router)[0].provider == ProviderType.OPENAI
+
+
+def test_routing_cache_is_bounded(router):
+    router.routing_cache_size = 3
+    for max_tokens in range(10):
+        _rank(router, model_requirements={"min_max_tokens": max_tokens})
+
+    assert len(router._routing_cache) == 3
+
+
+def test_unhashable_requirements_are_ranked_without_caching(router, scans):
+    requirements = {"tags": ["a", "b"]}
+    _rank(router, model_requirements=requirements)
+    _rank(router, model_requirements=requirements)
+
+    assert len(scans) == 2
+    assert router._routing_cache == {}
+
+
+# === Load balancing ===
+def test_equivalent_models_share_concurrent_requests(router, providers):
+    first = _rank(router)[0]
+    router._start_request(first)
+
+    second = _rank(router)[0]
+    router._start_request(second)
+    third = _rank(router)[0]
+
+    assert len({first.id, second.id, third.id}) == 3
+
+
+def test_busy_best_model_is_kept_over_a_clearly_worse_one(make_registry):
+    best = FakeProvider(ProviderType.OPENAI, priority_score=9.0)
+    worse = FakeProvider(ProviderType.ANTHROPIC, priority_score=5.0)
+    router = TaskRouter(make_registry(best, worse))
+    router.set_fallback_chain(
+        TaskType.SUMMARIZATION, [ProviderType.OPENAI, ProviderType.ANTHROPIC]
+    )
+
+    for _ in range(5):
+        router._start_request(best.model)
+
+    assert _rank(router)[0] == best.model
+
+
+def test_idle_models_keep_their_ranking(router):
+    assert _rank(router) == _rank(router)
+
+
+def test_slower_model_is_expected_to_finish_later(router, providers):
+    registry = router.model_registry
+    for _ in range(10):
+        registry.update_model_metrics(providers[0].model.id, True, 2.0)
+        registry.update_model_metrics(providers[1].model.id, True, 0.2)
+    router._start_request(providers[0].model)
+    router._start_request(providers[1].model)
+
+    slow = router._expected_completion_time(providers[0].model, TaskType.SUMMARIZATION)
+    fast = router._expected_completion_time(providers[1].model, TaskType.SUMMARIZATION)
+    assert fast < slow
+
+
+@pytest.mark.asyncio
+async def test_in_flight_counts_return_to_zero(router, providers):
+    slow, fast, spare = providers
+    failing = FakeProvider(ProviderType.HUGGINGFACE, error=_server_error())
+    router.model_registry._providers[failing.provider_type] = failing
+
+    pending = asyncio.ensure_future(
+        router.execute_with_failover(TaskType.SUMMARIZATION, [slow.model], _attempt())
+    )
+    await asyncio.sleep(0.01)
+    assert router.get_routing_stats()["in_flight"]["openai"] == 1
+
+    await router.execute_with_failover(
+        TaskType.SUMMARIZATION, [failing.model, fast.model], _attempt()
+    )
+    await pending
+
+    assert not any(router._in_flight.values())
+    assert not any(router.get_routing_stats()["in_flight"].values())
+
+
+# === Latency ===
+def _recorded_latency(router, model):
+    return router.model_registry.get_latency_percentile(
+        model.id, 100.0, min_samples=1, task_type=TaskType.SUMMARIZATION
+    )
+
+
+@pytest.mark.asyncio
+async def test_queue_time_is_not_recorded_as_latency(router, providers):
+    slow, fast, spare = providers
+
+    await router.execute_with_failover(
+        TaskType.SUMMARIZATION, [fast.model], _queued_attempt(0.2)
+    )
+
+    assert _recorded_latency(router, fast.model) < 0.1
+
+
+@pytest.mark.asyncio
+async def test_hedged_attempts_exclude_queue_time(router, providers):
+    slow, fast, spare = providers
+
+    await router.execute_hedged(TaskType.SUMMARIZATION, [fast.model], _queued_attempt(0.2))
+
+    assert _recorded_latency(router, fast.model) < 0.1
+
+
+@pytest.mark.asyncio
+async def test_attempts_are_timed_from_their_start_by_default(router, providers):
+    slow, fast, spare = providers
+
+    await router.execute_with_failover(TaskType.SUMMARIZATION, [slow.model], _attempt())
+
+    assert _recorded_latency(router, slow.model) >= 0.5
+
+
+# === Hedging ===
+@pytest.mark.asyncio
+async def test_hedge_fires_after_delay_and_cancels_loser(router, providers):
+    slow, fast, spare = providers
+
+    response = await router.execute_hedged(
+        TaskType.SUMMARIZATION, _models(providers), _attempt(), hedge_budget=1
+    )
+
+    assert response.content == "anthropic: hello"
+    await asyncio.sleep(0)  # let the cancellation land
+    assert slow.cancelled == 1
+    assert spare.calls == []
+    assert router._hedge_stats == {"hedged_requests": 1, "hedges_fired": 1, "hedge_wins": 1}
+    # Cancelled attempts leave nothing in flight
+    assert not any(router._in_flight.values())
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_primary_is_fast(router, providers):
+    slow, fast, spare = providers
+
+    response = await router.execute_hedged(
+        TaskType.SUMMARIZATION, [fast.model, spare.model], _attempt(), hedge_budget=1
+    )
+
+    assert response.content == "anthropic: hello"
+    assert spare.calls == []
+    assert router._hedge_stats["hedges_fired"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_budget_bounds_extra_attempts(router):
+    slow = [
+        FakeProvider(ProviderType.OPENAI, delay=0.3),
+        FakeProvider(ProviderType.ANTHROPIC, delay=0.3),
+        FakeProvider(ProviderType.MISTRAL, delay=0.3),
+    ]
+    for provider in slow:
+        router.model_registry._providers[provider.provider_type] = provider
+
+    await router.execute_hedged(
+        TaskType.SUMMARIZATION, _models(slow), _attempt(), hedge_budget=1
+    )
+
+    assert [len(provider.calls) for provider in slow] == [1, 1, 0]
+    assert router._hedge_stats["hedges_fired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_zero_budget_waits_for_deadline_without_hedging(router, providers):
+    slow, fast, spare = providers
+
+    with deadline.scope(0.1):
+        with pytest.raises(DeadlineExceededError):
+            await router.execute_hedged(
+                TaskType.SUMMARIZATION, _models(providers), _attempt(), hedge_budget=0
+            )
+
+    await asyncio.sleep(0)
+    assert fast.calls == []
+    assert spare.calls == []
+    assert slow.cancelled == 1
+    assert not any(router._in_flight.values())
+
+
+@pytest.mark.asyncio
+async def test_spent_budget_waits_for_deadline_without_hedging(router):
+    slow = [
+        FakeProvider(ProviderType.OPENAI, delay=1.0),
+        FakeProvider(ProviderType.ANTHROPIC, delay=1.0),
+        FakeProvider(ProviderType.MISTRAL, delay=1.0),
+    ]
+    for provider in slow:
+        router.model_registry._providers[provider.provider_type] = provider
+
+    with deadline.scope(0.2):
+        with pytest.raises(DeadlineExceededError):
+            await router.execute_hedged(
+                TaskType.SUMMARIZATION, _models(slow), _attempt(), hedge_budget=1
+            )
+
+    await asyncio.sleep(0)
+    assert [len(provider.calls) for provider in slow] == [1, 1, 0]
+    assert [provider.cancelled for provider in slow] == [1, 1, 0]
+
+
+@pytest.mark.asyncio
+async def test_hedge_is_not_fired_past_the_deadline(router, providers):
+    router.default_hedge_delay = 5.0
+
+    with deadline.scope(0.1):
+        with pytest.raises(DeadlineExceededError):
+            await router.execute_hedged(
+                TaskType.SUMMARIZATION, _models(providers), _attempt(), hedge_budget=1
+            )
+
+    assert router._hedge_stats["hedges_fired"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failures_fail_over_without_using_the_budget(router):
+    failing = FakeProvider(ProviderType.OPENAI, error=_server_error())
+    fast = FakeProvider(ProviderType.ANTHROPIC, delay=0.01)
+    for provider in (failing, fast):
+        router.model_registry._providers[provider.provider_type] = provider
+
+    response = await router.execute_hedged(
+        TaskType.SUMMARIZATION, [failing.model, fast.model], _attempt(), hedge_budget=0
+    )
+
+    assert response.content == "anthropic: hello"
+    assert router._hedge_stats["hedges_fired"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rejected_request_is_raised_at_once(router):
+    rejecting = FakeProvider(ProviderType.OPENAI, error=_bad_request())
+    fast = FakeProvider(ProviderType.ANTHROPIC, delay=0.01)
+    for provider in (rejecting, fast):
+        router.model_registry._providers[provider.provider_type] = provider
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await router.execute_hedged(
+            TaskType.SUMMARIZATION,
+            [rejecting.model, fast.model],
+            _attempt(),
+            should_failover=is_retryable_error,
+        )
+
+    assert fast.calls == []
+    # A rejected request is not held against the model
+    assert router.model_registry.is_circuit_closed(rejecting.model)
+
+
+@pytest.mark.asyncio
+async def test_every_candidate_failing_raises_provider_error(router):
+    failing = [
+        FakeProvider(ProviderType.OPENAI, error=_server_error()),
+        FakeProvider(ProviderType.ANTHROPIC, error=_server_error()),
+    ]
+    for provider in failing:
+        router.model_registry._providers[provider.provider_type] = provider
+
+    with pytest.raises(ProviderApiError):
+        await router.execute_hedged(TaskType.SUMMARIZATION, _models(failing), _attempt())
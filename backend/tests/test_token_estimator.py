@@ -0,0 +1,87 @@
+"""
+Tests for the token estimator: text estimates and per-provider calibration.
+
+Author: Rip Jonesy
+"""
+
+import pytest
+
+from app.automodel import ProviderType
+from app.core.token_estimator import (
+    CALIBRATION_ALPHA,
+    DEFAULT_COMPLETION_SHARE,
+    MAX_SCALE,
+    MESSAGE_OVERHEAD_TOKENS,
+    REPLY_PRIMING_TOKENS,
+    TokenEstimator,
+)
+
+
+@pytest.fixture
+def estimator():
+    return TokenEstimator()
+
+
+# === Estimates ===
+def test_short_words_are_one_token_each(estimator):
+    assert estimator.estimate_text("the cat sat on the mat") == 6
+
+
+def test_cjk_characters_are_one_token_each(estimator):
+    assert estimator.estimate_text("你好世界") == 4
+
+
+def test_messages_include_chat_overhead(estimator):
+    messages = [
+        {"role": "system", "content": "be calm"},
+        {"role": "user", "content": "hi you"},
+    ]
+
+    assert estimator.estimate_messages(messages) == (
+        4 + 2 * MESSAGE_OVERHEAD_TOKENS + REPLY_PRIMING_TOKENS
+    )
+
+
+def test_content_shapes_agree(estimator):
+    messages = [{"role": "user", "content": "hello world"}]
+
+    assert estimator.estimate_content({"messages": messages}) == (
+        estimator.estimate_content(messages)
+    )
+
+
+# === Calibration ===
+def test_first_sample_sets_the_scale(estimator):
+    estimator.observe(ProviderType.OPENAI, estimated_prompt_tokens=100, actual_prompt_tokens=150)
+
+    assert estimator.scale(ProviderType.OPENAI) == pytest.approx(1.5)
+    assert estimator.scale(ProviderType.ANTHROPIC) == 1.0
+    assert estimator.estimate_text("one two", ProviderType.OPENAI) == 3
+
+
+def test_later_samples_move_the_scale_gradually(estimator):
+    estimator.observe("openai", estimated_prompt_tokens=100, actual_prompt_tokens=100)
+    estimator.observe("openai", estimated_prompt_tokens=100, actual_prompt_tokens=200)
+
+    assert estimator.scale("openai") == pytest.approx(1.0 + CALIBRATION_ALPHA * 1.0)
+
+
+def test_scale_is_bounded(estimator):
+    estimator.observe("openai", estimated_prompt_tokens=100, actual_prompt_tokens=10_000)
+
+    assert estimator.scale("openai") == MAX_SCALE
+
+
+def test_small_samples_do_not_calibrate(estimator):
+    estimator.observe("openai", estimated_prompt_tokens=5, actual_prompt_tokens=50)
+
+    assert estimator.scale("openai") == 1.0
+
+
+def test_completion_share_tracks_reported_usage(estimator):
+    estimator.observe("openai", actual_prompt_tokens=100, completion_tokens=100)
+
+    assert estimator.completion_share("openai") == pytest.approx(
+        DEFAULT_COMPLETION_SHARE + CALIBRATION_ALPHA * (0.5 - DEFAULT_COMPLETION_SHARE)
+    )
+    assert estimator.get_calibration()["openai"]["samples"] == 0